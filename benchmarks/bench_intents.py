@@ -0,0 +1,146 @@
+"""Memory and event throughput for each intents profile.
+
+Usage: python benchmarks/bench_intents.py [--members 10000] [--events 50000]
+
+Feeds a synthetic guild and gateway event stream straight into discord.py's
+ConnectionState parsers, without a network connection. The gateway only sends
+the events a bot has intents for, so each profile processes just its share of
+the stream. Reports memory held per 10k members and how fast the full incoming
+stream is processed.
+"""
+import argparse
+import gc
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+import discord
+
+from utils.intents import PROFILES, get_profile
+
+GUILD_ID = 1 << 40
+CHANNEL_ID = GUILD_ID + 1
+SELF_ID = GUILD_ID + 2
+
+# Gateway event -> intent the bot needs to receive it
+EVENT_INTENTS = {
+    "MESSAGE_CREATE": "guild_messages",
+    "PRESENCE_UPDATE": "presences",
+    "TYPING_START": "guild_typing",
+    "GUILD_MEMBER_UPDATE": "members",
+}
+# Rough mix seen on a large community server
+EVENT_MIX = {"PRESENCE_UPDATE": 0.55, "TYPING_START": 0.2, "MESSAGE_CREATE": 0.2, "GUILD_MEMBER_UPDATE": 0.05}
+
+
+def user(user_id):
+    return {"id": str(user_id), "username": f"user{user_id}", "discriminator": "0",
+            "global_name": None, "avatar": None}
+
+
+def member(user_id):
+    return {"user": user(user_id), "roles": [], "joined_at": "2024-01-01T00:00:00+00:00",
+            "deaf": False, "mute": False, "flags": 0}
+
+
+def presence(user_id, status="online"):
+    return {"user": {"id": str(user_id)}, "guild_id": str(GUILD_ID), "status": status,
+            "activities": [{"name": "a game", "type": 0}], "client_status": {"desktop": status}}
+
+
+def guild_payload(member_ids, with_members, with_presences):
+    return {
+        "id": str(GUILD_ID), "name": "bench", "owner_id": str(SELF_ID), "member_count": len(member_ids),
+        "roles": [{"id": str(GUILD_ID), "name": "@everyone", "permissions": "0", "position": 0,
+                   "color": 0, "hoist": False, "managed": False, "mentionable": False}],
+        "channels": [{"id": str(CHANNEL_ID), "type": 0, "name": "general", "position": 0,
+                      "permission_overwrites": []}],
+        "members": [member(i) for i in member_ids] if with_members else [member(SELF_ID)],
+        "presences": [presence(i) for i in member_ids] if with_presences else [],
+        "large": True, "emojis": [], "stickers": [], "features": [], "threads": [],
+        "voice_states": [], "stage_instances": [], "guild_scheduled_events": [],
+    }
+
+
+def event_payload(kind, user_id, n):
+    if kind == "MESSAGE_CREATE":
+        return {"id": str(n), "channel_id": str(CHANNEL_ID), "guild_id": str(GUILD_ID), "author": user(user_id),
+                "member": {k: v for k, v in member(user_id).items() if k != "user"}, "content": "hello there",
+                "timestamp": "2024-01-01T00:00:00+00:00", "edited_timestamp": None, "tts": False,
+                "mention_everyone": False, "mentions": [], "mention_roles": [], "attachments": [],
+                "embeds": [], "pinned": False, "type": 0}
+    if kind == "PRESENCE_UPDATE":
+        return presence(user_id, random.choice(("online", "idle", "dnd")))
+    if kind == "TYPING_START":
+        return {"channel_id": str(CHANNEL_ID), "guild_id": str(GUILD_ID), "user_id": str(user_id),
+                "timestamp": 0, "member": member(user_id)}
+    return {**member(user_id), "guild_id": str(GUILD_ID), "nick": f"nick{n}"}
+
+
+def make_state(profile):
+    client = discord.Client(**profile.as_options())
+    state = client._connection
+    state.user = discord.ClientUser(state=state, data=user(SELF_ID))
+    return client, state
+
+
+def load(profile, member_ids):
+    client, state = make_state(profile)
+    state._add_guild_from_data(guild_payload(
+        member_ids, with_members=profile.chunk_guilds_at_startup, with_presences=profile.intents.presences
+    ))
+    return client, state
+
+
+def measure(name, member_ids, stream):
+    profile = get_profile(name)
+    delivered = [(kind, data) for kind, data in stream if getattr(profile.intents, EVENT_INTENTS[kind])]
+
+    # Memory: startup cache plus what the delivered events leave behind
+    gc.collect()
+    tracemalloc.start()
+    client, state = load(profile, member_ids)
+    for kind, data in delivered:
+        state.parsers[kind](data)
+    held, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    cached = len(client.get_guild(GUILD_ID).members)
+    del client, state
+
+    # Throughput on a fresh state, without tracemalloc overhead
+    client, state = load(profile, member_ids)
+    parsers = [(state.parsers[kind], data) for kind, data in delivered]
+    gc.collect()
+    start = time.perf_counter()
+    for parser, data in parsers:
+        parser(data)
+    elapsed = time.perf_counter() - start
+
+    per_10k = held / len(member_ids) * 10_000
+    print(f"{name:>9} {cached:>8,} {per_10k / 2**20:>13.1f} {len(delivered):>10,} "
+          f"{len(stream) / elapsed:>13,.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--members", type=int, default=10_000)
+    parser.add_argument("--events", type=int, default=50_000)
+    args = parser.parse_args()
+
+    random.seed(0)
+    member_ids = list(range(10, 10 + args.members))
+    kinds, weights = zip(*EVENT_MIX.items())
+    stream = [(kind, event_payload(kind, random.choice(member_ids), n))
+              for n, kind in enumerate(random.choices(kinds, weights, k=args.events))]
+
+    print(f"{'profile':>9} {'cached':>8} {'MiB/10k mem':>13} {'delivered':>10} {'stream ev/s':>13}")
+    for name in PROFILES:
+        measure(name, member_ids, stream)
+
+
+if __name__ == "__main__":
+    main()
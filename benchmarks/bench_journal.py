@@ -0,0 +1,105 @@
+"""Query latency of the action journal over millions of entries.
+
+Usage: python benchmarks/bench_journal.py [--entries 1000000] [--guilds 50]
+
+Fills a temporary journal with synthetic actions spread over a year, then
+times one page of each kind of !modlog query, on the first page and after
+paging deep into the results with the keyset cursor.
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from utils.journal import ActionJournal, JournalQuery
+
+ACTIONS = ["Warning", "Mute", "Unmute", "Kick", "Ban", "Auto-Timeout", "Filtered Message", "Purge"]
+WORDS = ["spam", "raid", "slur", "nsfw", "links", "advertising", "harassment", "alt", "evasion", "flood",
+         "scam", "phishing", "toxicity", "impersonation", "doxxing"]
+YEAR = 365 * 86400
+
+
+def fill(path, entries, guilds, members, moderators, now):
+    rng = random.Random(0)
+    journal = ActionJournal(path)
+    conn = journal._connect()
+    batch = []
+    for n in range(entries):
+        batch.append((
+            rng.randrange(guilds),
+            now - YEAR + YEAR * n / entries,
+            rng.choice(ACTIONS),
+            rng.randrange(moderators),
+            rng.randrange(members),
+            " ".join(rng.choices(WORDS, k=rng.randint(1, 4))),
+        ))
+        if len(batch) == 50_000:
+            with conn:
+                conn.executemany("INSERT INTO journal (guild_id, created_at, action, moderator_id, target_id, reason) "
+                                 "VALUES (?, ?, ?, ?, ?, ?)", batch)
+            batch.clear()
+    with conn:
+        conn.executemany("INSERT INTO journal (guild_id, created_at, action, moderator_id, target_id, reason) "
+                         "VALUES (?, ?, ?, ?, ?, ?)", batch)
+    journal.close()
+
+
+async def measure(journal, filters, pages):
+    """Milliseconds for the first page and for page ``pages``"""
+    start = time.perf_counter()
+    entries, more = await journal.query(0, filters)
+    first = time.perf_counter() - start
+    for _ in range(pages - 1):
+        if not more:
+            break
+        entries, more = await journal.query(0, filters, before=entries[-1].cursor)
+    start = time.perf_counter()
+    if entries:
+        await journal.query(0, filters, before=entries[-1].cursor)
+    return first * 1e3, (time.perf_counter() - start) * 1e3
+
+
+async def run(path, now, pages):
+    journal = ActionJournal(path)
+    queries = {
+        "everything": "",
+        "user:": "user:17",
+        "mod:": "mod:3",
+        "action:": "action:ban",
+        "since:7d": "since:7d",
+        "since:90d until:30d": "since:90d until:30d",
+        "search:": "search:phishing",
+        "user: action: since:": "user:17 action:warning since:180d",
+    }
+    print(f"{'query':<24} {'page 1 ms':>10} {f'page {pages} ms':>12}")
+    for name, text in queries.items():
+        first, deep = await measure(journal, JournalQuery.parse(text, now), pages)
+        print(f"{name:<24} {first:>10.2f} {deep:>12.2f}")
+    await journal.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, default=1_000_000)
+    parser.add_argument("--guilds", type=int, default=50)
+    parser.add_argument("--members", type=int, default=20_000, help="distinct targets per run")
+    parser.add_argument("--moderators", type=int, default=40)
+    parser.add_argument("--pages", type=int, default=50, help="page timed after the first")
+    args = parser.parse_args()
+
+    now = time.time()
+    with tempfile.TemporaryDirectory(prefix="modbot-journal-") as tmp:
+        path = os.path.join(tmp, "journal.db")
+        start = time.perf_counter()
+        fill(path, args.entries, args.guilds, args.members, args.moderators, now)
+        print(f"{args.entries:,} entries over {args.guilds} guilds written in {time.perf_counter() - start:.1f}s")
+        asyncio.run(run(path, now, args.pages))
+
+
+if __name__ == "__main__":
+    main()
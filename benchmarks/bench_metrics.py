@@ -0,0 +1,60 @@
+"""Per-call overhead of the built-in instrumentation.
+
+Usage: python benchmarks/bench_metrics.py [--iterations 500000]
+
+Times an empty block bare, wrapped in ``Metrics.timer`` with metrics on and
+off, and a bare ``inc``. For end-to-end numbers compare
+``MODBOT_METRICS=0 python -m harness`` with the default run.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from utils import Metrics
+
+
+def bench(label, fn, iterations, baseline=None):
+    start = time.perf_counter()
+    fn(iterations)
+    per_call = (time.perf_counter() - start) / iterations * 1e9
+    overhead = f"{per_call - baseline:>+8.0f} ns over bare" if baseline is not None else ""
+    print(f"{label:<24} {per_call:>8.0f} ns/call {overhead}")
+    return per_call
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=500_000)
+    args = parser.parse_args()
+
+    def bare(n):
+        for _ in range(n):
+            pass
+
+    def timed(metrics):
+        def run(n):
+            timer = metrics.timer
+            for _ in range(n):
+                with timer("automod_seconds", stage="spam"):
+                    pass
+        return run
+
+    def counted(metrics):
+        def run(n):
+            inc = metrics.inc
+            for _ in range(n):
+                inc("messages_total", guild="1234")
+        return run
+
+    baseline = bench("bare loop", bare, args.iterations)
+    bench("timer, metrics on", timed(Metrics(enabled=True)), args.iterations, baseline)
+    bench("timer, metrics off", timed(Metrics(enabled=False)), args.iterations, baseline)
+    bench("inc, metrics on", counted(Metrics(enabled=True)), args.iterations, baseline)
+    bench("inc, metrics off", counted(Metrics(enabled=False)), args.iterations, baseline)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Micro-benchmark for the spam-detection rate limiter.
+
+Usage: python benchmarks/bench_ratelimit.py [--users 100000] [--messages 1000000]
+
+Reports messages/sec through ``SlidingWindowLimiter.hit`` and the memory held
+with every user active inside the window, then after a sweep once they go quiet.
+"""
+import argparse
+import gc
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from utils import SlidingWindowLimiter
+
+
+def rss_mb():
+    """Current resident set size in MiB (Linux), or 0.0 when unavailable"""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError, IndexError):
+        return 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--messages", type=int, default=1_000_000)
+    parser.add_argument("--guilds", type=int, default=50)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    keys = [(rng.randrange(args.guilds), user) for user in range(args.users)]
+    stream = [keys[rng.randrange(args.users)] for _ in range(args.messages)]
+
+    limiter = SlidingWindowLimiter(limit=5, window=5.0)
+    hit = limiter.hit
+    # Synthetic clock: the whole stream lands inside one window
+    now = 1000.0
+    step = 4.0 / args.messages
+
+    gc.collect()
+    start = time.perf_counter()
+    for key in stream:
+        now += step
+        hit(key, now)
+    elapsed = time.perf_counter() - start
+    print(f"hit():        {args.messages / elapsed:,.0f} messages/sec "
+          f"({elapsed / args.messages * 1e9:.0f} ns/message)")
+
+    # Memory with every user active at once
+    limiter = SlidingWindowLimiter(limit=5, window=5.0)
+    gc.collect()
+    rss_before = rss_mb()
+    tracemalloc.start()
+    for i, key in enumerate(keys):
+        for _ in range(5):
+            limiter.hit(key, 1000.0 + i * 1e-6)
+    traced, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"active keys:  {len(limiter):,}")
+    print(f"traced:       {traced / 2**20:.1f} MiB ({traced / len(limiter):.0f} B/key)")
+    print(f"rss delta:    {rss_mb() - rss_before:.1f} MiB")
+
+    start = time.perf_counter()
+    dropped = limiter.sweep(now=1000.0 + 60.0)
+    elapsed = time.perf_counter() - start
+    print(f"sweep:        dropped {dropped:,} idle keys in {elapsed * 1e3:.1f} ms, "
+          f"{len(limiter):,} left")
+
+
+if __name__ == "__main__":
+    main()
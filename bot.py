@@ -1,31 +1,181 @@
 import discord
-from discord.ext import commands
+from discord.ext import commands, tasks
 import asyncio
 from datetime import datetime, timedelta, timezone
 import json
 import re
 from typing import Optional, Union
 import logging
-from collections import defaultdict
 import os
+import time
+from utils import ActionDispatcher, ActionJournal, CopypastaDetector, LockdownStore, MemberIndex, Metrics, ModLogPipeline, MutedRoleManager, RaidDetector, Scheduler, SettingsStore, SlidingWindowLimiter, WarningStore, run_bounded
+from utils.intents import get_profile
+from utils.journal import JournalQuery
+from utils.lockdown import lock_guild, unlock_guild
+from utils.logs import setup_queue_logging
+from utils.member_index import MemberSelector
+from utils.members import get_or_fetch_member
+from utils.purge import PurgeFilter, purge_channel
+from utils.settings import CHOICES as SETTING_CHOICES, DEFAULTS as SETTING_DEFAULTS, format_ladder, parse_ladder, parse_value
+from utils.sharding import ShardConfig
+from utils.wordfilter import WordFilter
+
+DATABASE_PATH = 'modbot.db'
+# Repeats of an automatic action for the same member inside this many seconds are dropped
+AUTOMOD_COOLDOWN = 30.0
+COGS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cogs')
+# Most members one !massban or !masskick may hit, and Discord's cap per bulk ban request
+MASS_ACTION_LIMIT = 1000
+BULK_BAN_SIZE = 200
+
+class ModBot(commands.AutoShardedBot):
+    STATUSES = [
+        "Keeping the chaos in check | Type !help 🎮",
+        "Moderating the server | Stay cool 😎",
+        "Kicking troublemakers | 😈",
+        "Type !help to see what I can do!"
+    ]
 
-class ModBot(commands.Bot):
     def __init__(self):
-        intents = discord.Intents.all()
-        super().__init__(command_prefix='!', intents=intents, help_command=None)
-        self.warning_counts = defaultdict(int)
-        self.spam_detection = defaultdict(list)
-        self.raid_detection = defaultdict(list)
-        self.auto_mod_settings = {}
-        self.muted_roles = {}
+        # MODBOT_INTENTS picks full, standard or minimal, see utils/intents.py
+        self.intents_profile = get_profile(os.getenv('MODBOT_INTENTS', 'standard'))
+        # MODBOT_SHARD_IDS/MODBOT_SHARD_COUNT are set per worker by cluster.py
+        self.shard_config = ShardConfig.from_env(os.environ)
+        super().__init__(
+            command_prefix='!',
+            help_command=None,
+            **self.intents_profile.as_options(),
+            **self.shard_config.as_options()
+        )
+        self.warnings = WarningStore(DATABASE_PATH)
+        self.spam_detection = SlidingWindowLimiter(limit=5, window=5.0)
+        self.raid_detection = RaidDetector()
+        self.copypasta = CopypastaDetector()
+        self.member_index = MemberIndex()
+        self.settings = SettingsStore('guild_settings')
+        self.muted_roles = MutedRoleManager()
+        self.scheduler = Scheduler(DATABASE_PATH)
+        self.modlog = ModLogPipeline(self)
+        self.lockdowns = LockdownStore(DATABASE_PATH)
+        self.journal = ActionJournal(DATABASE_PATH)
+        # MODBOT_METRICS=0 turns every timer and counter into a no-op
+        self.metrics = Metrics(enabled=os.getenv('MODBOT_METRICS', '1') != '0')
+        self.actions = ActionDispatcher(metrics=self.metrics)
         self.setup_logging()
 
     def setup_logging(self):
+        """Log to mod_logs.log from a background thread
+
+        MODBOT_LOG_FORMAT picks `json` (default) or `text` lines and
+        MODBOT_LOG_COMPRESS=0 keeps rotated files uncompressed. Cluster
+        workers each write their own mod_logs.<cluster>.log.
+        """
         self.logger = logging.getLogger('mod_bot')
         self.logger.setLevel(logging.INFO)
-        handler = logging.FileHandler('mod_logs.log', encoding='utf-8')
-        handler.setFormatter(logging.Formatter('%(asctime)s:%(levelname)s:%(name)s: %(message)s'))
-        self.logger.addHandler(handler)
+        self.log_listener = setup_queue_logging(
+            self.logger,
+            self.shard_config.suffix('mod_logs.log'),
+            structured=os.getenv('MODBOT_LOG_FORMAT', 'json') != 'text',
+            compress=os.getenv('MODBOT_LOG_COMPRESS', '1') != '0'
+        )
+
+    async def setup_hook(self):
+        """One-shot startup, runs once before connecting (unlike on_ready, which fires on every reconnect)"""
+        started = time.perf_counter()
+        if self.metrics.enabled:
+            self.instrument_http()
+        self.metrics.start(self.shard_config.suffix(os.getenv('MODBOT_METRICS_FILE', 'metrics.prom')))
+        self.spam_detection.start()
+        self.settings.start()
+        self.warnings.start()
+        self.journal.start()
+        await self.scheduler.start(before_start=self.wait_until_ready, owns=self.owns_guild)
+        await self.load_cogs()
+        self.cycle_status.start()
+        self.logger.info(f"Startup finished in {time.perf_counter() - started:.2f}s")
+
+    async def load_cogs(self):
+        """Load every extension in cogs/ concurrently and report how long each took"""
+        names = sorted(f"cogs.{filename[:-3]}" for filename in os.listdir(COGS_DIR) if filename.endswith(".py"))
+
+        async def load(name):
+            started = time.perf_counter()
+            try:
+                await self.load_extension(name)
+            except Exception as e:
+                print(f"❌ Failed to load {name}: {e}")
+                self.logger.error(f"Failed to load {name}: {e}")
+                return
+            elapsed = time.perf_counter() - started
+            self.metrics.observe("cog_load_seconds", elapsed, cog=name)
+            print(f"✅ Loaded {name} in {elapsed * 1e3:.0f}ms")
+
+        await asyncio.gather(*(load(name) for name in names))
+
+    async def reload_cog(self, name):
+        """Reload an extension, carrying state over through the optional cog hooks.
+
+        Cogs can define ``cog_export_state()`` returning anything worth
+        keeping and ``cog_import_state(state)`` to take it back after the new
+        code loads. If the new code fails to load, the old cog stays in place.
+        """
+        states = {
+            cog_name: cog.cog_export_state()
+            for cog_name, cog in self.cogs.items()
+            if type(cog).__module__ == name and hasattr(cog, 'cog_export_state')
+        }
+        await self.reload_extension(name)
+        for cog_name, state in states.items():
+            cog = self.get_cog(cog_name)
+            if cog is not None and hasattr(cog, 'cog_import_state'):
+                cog.cog_import_state(state)
+        return len(states)
+
+    @tasks.loop(seconds=30)
+    async def cycle_status(self):
+        activity = self.STATUSES[self.cycle_status.current_loop % len(self.STATUSES)]
+        self.actions.submit("presence", 0, 0, lambda: self.change_presence(activity=discord.Game(name=activity)))
+
+    @cycle_status.before_loop
+    async def before_cycle_status(self):
+        await self.wait_until_ready()
+
+    def owns_guild(self, guild_id):
+        """True if this process's shards receive the guild's events"""
+        return self.shard_config.owns(guild_id)
+
+    def instrument_http(self):
+        """Time every REST call by method and route template"""
+        request = self.http.request
+
+        async def timed_request(route, **kwargs):
+            with self.metrics.timer("rest_seconds", method=route.method, route=route.path):
+                return await request(route, **kwargs)
+
+        self.http.request = timed_request
+
+    async def invoke(self, ctx):
+        if ctx.command is None or not self.metrics.enabled:
+            return await super().invoke(ctx)
+        guild = str(ctx.guild.id) if ctx.guild else "dm"
+        self.metrics.inc("commands_total", guild=guild, command=ctx.command.qualified_name)
+        with self.metrics.timer("command_seconds", command=ctx.command.qualified_name):
+            await super().invoke(ctx)
+
+    async def close(self):
+        self.cycle_status.cancel()
+        self.actions.stop()
+        self.metrics.stop()
+        self.spam_detection.stop()
+        self.settings.stop()
+        self.scheduler.stop()
+        self.modlog.stop()
+        self.muted_roles.stop()
+        self.lockdowns.close()
+        await self.warnings.stop()
+        await self.journal.stop()
+        await super().close()
+        self.log_listener.stop()
 
     @commands.has_permissions(kick_members=True)
     async def kick(self, ctx, member: Optional[discord.Member] = None, *, reason="No reason provided"):
@@ -45,7 +195,7 @@ class ModBot(commands.Bot):
             await ctx.send("❌ You cannot kick members with equal or higher role!")
             return
 
-        await member.kick(reason=reason)
+        await self.actions.submit("kick", ctx.guild.id, member.id, lambda: member.kick(reason=reason))
         await log_action(ctx.guild, "Kick", ctx.author, member, reason)
         await ctx.send(f"✅ {member.mention} has been kicked. Reason: {reason}")
 
@@ -56,43 +206,65 @@ def get_current_time():
     """Get current UTC time in timezone-aware format"""
     return datetime.now(timezone.utc)
 
-async def create_muted_role(guild):
-    """Create and set up muted role"""
-    muted_role = await guild.create_role(name="Muted", reason="Auto-created muted role")
-    for channel in guild.channels:
-        await channel.set_permissions(muted_role, 
-                                    send_messages=False,
-                                    add_reactions=False,
-                                    speak=False)
-    return muted_role
-
 async def get_muted_role(guild):
-    """Get or create muted role"""
-    role = discord.utils.get(guild.roles, name="Muted")
-    if not role:
-        role = await create_muted_role(guild)
-    return role
+    """Get or create muted role, channel overwrites are applied in the background"""
+    return await bot.muted_roles.get(guild)
+
+async def expire_mute(job):
+    """Lift a timed mute once its scheduled job comes due"""
+    guild = bot.get_guild(job.guild_id)
+    if not guild:
+        return
+    muted_role = await bot.muted_roles.get(guild, create=False)
+    member = await get_or_fetch_member(guild, job.user_id) if muted_role else None
+    if not muted_role or not member or muted_role not in member.roles:
+        return
+
+    await bot.actions.submit("role", guild.id, member.id, lambda: member.remove_roles(muted_role, reason="Mute duration expired"), tag="unmute")
+    channel = guild.get_channel(job.payload.get("channel_id"))
+    if channel:
+        bot.actions.submit("notice", guild.id, member.id, lambda: channel.send(f"✅ {member.mention} has been automatically unmuted"), tag="unmute")
+
+bot.scheduler.register("unmute", expire_mute)
 
 async def log_action(guild: discord.Guild, action: str, moderator: discord.Member, user: discord.Member, reason: str):
-    """Log moderation actions"""
-    log_channel = discord.utils.get(guild.channels, name="mod-logs")
-    if not log_channel:
-        overwrites = {
-            guild.default_role: discord.PermissionOverwrite(read_messages=False),
-            guild.me: discord.PermissionOverwrite(read_messages=True)
-        }
-        log_channel = await guild.create_text_channel('mod-logs', overwrites=overwrites)
+    """Log moderation actions, the embed is delivered in the background by bot.modlog"""
+    with bot.metrics.timer("log_action_seconds"):
+        embed = discord.Embed(
+            title=f"Moderation Action: {action}",
+            description=f"**Target:** {user.mention} ({user.id})\n"
+                       f"**Moderator:** {moderator.mention}\n"
+                       f"**Reason:** {reason}",
+            color=discord.Color.red(),
+            timestamp=get_current_time()
+        )
+        bot.modlog.enqueue(guild, embed)
+        bot.journal.record(guild.id, action, moderator.id, user.id, reason)
+        bot.logger.info(
+            f"{action}: {user.name} ({user.id}) by {moderator.name} for {reason}",
+            extra={"guild": guild.id, "action": action, "target": user.id, "moderator": moderator.id}
+        )
 
-    embed = discord.Embed(
-        title=f"Moderation Action: {action}",
-        description=f"**Target:** {user.mention} ({user.id})\n"
-                   f"**Moderator:** {moderator.mention}\n"
-                   f"**Reason:** {reason}",
-        color=discord.Color.red(),
-        timestamp=get_current_time()
-    )
-    await log_channel.send(embed=embed)
-    bot.logger.info(f"{action}: {user.name} ({user.id}) by {moderator.name} for {reason}")
+async def log_bulk_action(guild: discord.Guild, action: str, moderator: discord.Member, user_ids, reason: str):
+    """Log a mass action as one embed per 50 targets instead of one per member"""
+    with bot.metrics.timer("log_action_seconds"):
+        for start in range(0, len(user_ids), 50):
+            chunk = user_ids[start:start + 50]
+            embed = discord.Embed(
+                title=f"Moderation Action: {action} ({len(user_ids)} members)",
+                description=f"**Targets:** {' '.join(f'<@{user_id}>' for user_id in chunk)}\n"
+                           f"**Moderator:** {moderator.mention}\n"
+                           f"**Reason:** {reason}",
+                color=discord.Color.red(),
+                timestamp=get_current_time()
+            )
+            bot.modlog.enqueue(guild, embed)
+        for user_id in user_ids:
+            bot.journal.record(guild.id, action, moderator.id, user_id, reason)
+        bot.logger.info(
+            f"{action}: {len(user_ids)} members by {moderator.name} for {reason}",
+            extra={"guild": guild.id, "action": action, "targets": list(user_ids), "moderator": moderator.id}
+        )
 
 # Help Command
 @bot.group(invoke_without_command=True)
@@ -105,9 +277,9 @@ async def help(ctx):
     )
     
     command_groups = {
-        "Basic Moderation": ["warn", "mute", "unmute", "timeout", "kick", "ban", "unban", "purge"],
-        "Auto-Moderation": ["raid_protect", "set_filter", "lockdown", "unlock"],
-        "Information": ["userinfo", "serverinfo", "warnings"]
+        "Basic Moderation": ["warn", "mute", "unmute", "timeout", "kick", "ban", "unban", "purge", "massban", "masskick"],
+        "Auto-Moderation": ["config", "raid_protect", "set_filter", "lockdown", "unlock"],
+        "Information": ["userinfo", "serverinfo", "warnings", "modlog"]
     }
     
     for group, commands_list in command_groups.items():
@@ -143,17 +315,34 @@ async def warn(ctx, member: Optional[discord.Member] = None, *, reason="No reaso
         await ctx.send("❌ You cannot warn members with equal or higher role!")
         return
 
-    bot.warning_counts[member.id] += 1
-    warning_count = bot.warning_counts[member.id]
+    settings = await bot.settings.get(ctx.guild.id)
+    limits = settings['warnings']
+    records, score = await bot.warnings.add(
+        ctx.guild.id, member.id, ctx.author.id, reason,
+        points=limits['points'], half_life=limits['half_life_days'] * 86400
+    )
+    warning_count = len(records)
     
-    # Warning escalation system
+    # Warning escalation system, the ladder comes from !config and is
+    # checked against the decayed score so old warnings weigh less
+    step = settings.escalation(score)
     escalation_msg = ""
-    if warning_count >= 5:
-        await member.ban(reason=f"Exceeded warning limit: {reason}")
+    if step is None:
+        pass
+    elif step.action == "ban":
+        await bot.actions.submit("ban", ctx.guild.id, member.id, lambda: member.ban(reason=f"Exceeded warning limit: {reason}"))
         escalation_msg = "User has been banned for exceeding warning limit."
-    elif warning_count >= 3:
-        await member.timeout(timedelta(hours=24), reason=f"Multiple warnings: {reason}")
-        escalation_msg = "User has been timed out for 24 hours."
+    elif step.action == "kick":
+        await bot.actions.submit("kick", ctx.guild.id, member.id, lambda: member.kick(reason=f"Exceeded warning limit: {reason}"))
+        escalation_msg = "User has been kicked for exceeding warning limit."
+    else:
+        duration = timedelta(hours=step.hours)
+        # Tagged with the command so an automod timeout cooling down can't stand in for it
+        await bot.actions.submit("timeout", ctx.guild.id, member.id, lambda: member.timeout(duration, reason=f"Multiple warnings: {reason}"),
+                                 tag=ctx.message.id)
+        escalation_msg = f"User has been timed out for {step.hours:g} hours."
+    upcoming = settings.next_step(score)
+    points = f"{score:.1f}" + (f" (next: {upcoming.action} at {upcoming.at:g})" if upcoming else "")
 
     await log_action(ctx.guild, "Warning", ctx.author, member, reason)
     
@@ -164,16 +353,17 @@ async def warn(ctx, member: Optional[discord.Member] = None, *, reason="No reaso
         color=discord.Color.orange()
     )
     warn_embed.add_field(name="Reason", value=reason)
-    warn_embed.add_field(name="Warning Count", value=f"{warning_count}/5")
+    warn_embed.add_field(name="Warning Points", value=points)
     if escalation_msg:
         warn_embed.add_field(name="Action Taken", value=escalation_msg, inline=False)
     
     try:
+        # Sent directly: the command must not wait behind an automod backlog in the dispatcher
         await member.send(embed=warn_embed)
     except discord.Forbidden:
         await ctx.send("Note: Could not DM user about the warning.")
 
-    await ctx.send(f"✅ {member.mention} has been warned. Warning count: {warning_count}/5\n{escalation_msg}")
+    await ctx.send(f"✅ {member.mention} has been warned. Warning count: {warning_count}, points: {points}\n{escalation_msg}")
 
 @bot.command()
 @commands.has_permissions(kick_members=True)
@@ -210,16 +400,15 @@ async def mute(ctx, member: Optional[discord.Member] = None, duration: Optional[
         return
 
     muted_role = await get_muted_role(ctx.guild)
-    await member.add_roles(muted_role, reason=reason)
+    await bot.actions.submit("role", ctx.guild.id, member.id, lambda: member.add_roles(muted_role, reason=reason), tag="mute")
+    setup = bot.muted_roles.progress(ctx.guild.id)
+    if setup:
+        await ctx.send(f"⏳ Setting up the Muted role: {setup[0]}/{setup[1]} channels done")
     
     # Schedule unmute
+    await bot.scheduler.schedule("unmute", ctx.guild.id, member.id, seconds, channel_id=ctx.channel.id)
     await log_action(ctx.guild, "Mute", ctx.author, member, f"{duration} - {reason}")
     await ctx.send(f"✅ {member.mention} has been muted for {duration}")
-    
-    await asyncio.sleep(seconds)
-    if muted_role in member.roles:
-        await member.remove_roles(muted_role, reason="Mute duration expired")
-        await ctx.send(f"✅ {member.mention} has been automatically unmuted")
 
 @bot.command()
 @commands.has_permissions(kick_members=True)
@@ -244,12 +433,217 @@ async def unmute(ctx, member: Optional[discord.Member] = None):
         await ctx.send(f"❌ {member.mention} is not muted!")
         return
 
-    await member.remove_roles(muted_role, reason="Unmute command issued")
+    await bot.actions.submit("role", ctx.guild.id, member.id, lambda: member.remove_roles(muted_role, reason="Unmute command issued"), tag="unmute")
+    await bot.scheduler.cancel("unmute", ctx.guild.id, member.id)
     await log_action(ctx.guild, "Unmute", ctx.author, member, "Manual unmute")
     await ctx.send(f"✅ {member.mention} has been unmuted.")
 
-# Running the bot
-bot.run('YOUR_BOT_TOKEN')
+@bot.command()
+@commands.has_permissions(manage_messages=True)
+async def purge(ctx, amount: Optional[int] = None, *, filters: str = ""):
+    """
+    Bulk delete messages in this channel
+    Usage: !purge <amount> [bots] [attachments] [links] [user:@member] [regex:pattern]
+    Example: !purge 500 user:@user links
+    """
+    if not amount or amount < 1:
+        embed = discord.Embed(
+            title="Command Help: Purge",
+            description="Delete recent messages, optionally only the ones matching filters",
+            color=discord.Color.blue()
+        )
+        embed.add_field(name="Usage", value="!purge <amount> [filters]")
+        embed.add_field(name="Example", value="!purge 500 user:@user links")
+        embed.add_field(name="Filters", value="`bots`, `attachments`, `links`, `user:@member`, `regex:pattern` (must come last)", inline=False)
+        await ctx.send(embed=embed)
+        return
+
+    try:
+        predicate = PurgeFilter.parse(filters)
+    except ValueError as e:
+        await ctx.send(f"❌ {e}")
+        return
+
+    amount = min(amount, 10000)
+    status = await ctx.send(f"🧹 Purging up to {amount} messages...")
+    # One status edit every couple of seconds is plenty and keeps the edit bucket free
+    report = ProgressReporter(status, lambda deleted, scanned: f"🧹 Deleted {deleted} messages, scanned {scanned}...")
+
+    result = await purge_channel(
+        ctx.channel,
+        amount,
+        predicate,
+        before=ctx.message,
+        scan_limit=min(amount * 10, 20000) if predicate else amount,
+        progress=report
+    )
+    await ctx.message.delete()
+    note = " Older messages stopped the purge after the single-delete limit." if result["old_limit_reached"] else ""
+    await report.finish(content=f"✅ Deleted {result['deleted']} messages (scanned {result['scanned']}).{note}", delete_after=10)
+    await log_action(ctx.guild, "Purge", ctx.author, ctx.channel, f"{result['deleted']} messages {filters}".strip())
+
+
+async def select_members(ctx, selector):
+    """Resolve a selector to (targets, skipped) with the usual hierarchy checks.
+
+    Every ID that is not cached is fetched, so nobody skips the hierarchy
+    checks. Listed IDs that are not in the server any more come back as
+    plain objects so they can still be banned; unlisted ones (a stale index
+    entry) are dropped.
+    """
+    guild = ctx.guild
+    user_ids = selector.select(await bot.member_index.get(guild), time.time())
+    listed = set(selector.user_ids)
+    resolved = {}
+
+    async def resolve(user_id):
+        resolved[user_id] = await get_or_fetch_member(guild, user_id)
+
+    failures = await run_bounded([user_id for user_id in user_ids if not guild.get_member(user_id)], resolve)
+    # A failed lookup is not proof the member left, so leave them alone
+    unknown = {user_id for user_id, _ in failures}
+    targets, skipped = [], 0
+    for user_id in user_ids:
+        if user_id in unknown:
+            skipped += 1
+            continue
+        member = guild.get_member(user_id) or resolved.get(user_id)
+        if member is None:
+            if user_id in listed:
+                targets.append(discord.Object(user_id))
+        elif (member.id in (ctx.author.id, guild.owner_id) or member.top_role >= ctx.author.top_role
+              or member.top_role >= guild.me.top_role):
+            skipped += 1
+        else:
+            targets.append(member)
+    return targets, skipped
+
+async def mass_action(ctx, action, text):
+    """Shared body of !massban and !masskick"""
+    verb, past = ("Banning", "Banned") if action == "ban" else ("Kicking", "Kicked")
+    selection, _, reason = text.partition(" -- ")
+    reason = reason.strip() or "No reason provided"
+    try:
+        selector = MemberSelector.parse(selection)
+    except ValueError as e:
+        await ctx.send(f"❌ {e}")
+        return
+    if not selector:
+        await ctx.send("❌ Give at least one selector: IDs, `name:`, `joined:` or `regex:`")
+        return
+    # Checked before resolving, every uncached ID costs a member fetch
+    if len(set(selector.user_ids)) > MASS_ACTION_LIMIT:
+        await ctx.send(f"❌ {len(set(selector.user_ids))} IDs given, list at most {MASS_ACTION_LIMIT}.")
+        return
+
+    targets, skipped = await select_members(ctx, selector)
+    if action == "kick":
+        targets = [target for target in targets if isinstance(target, discord.Member)]
+    if len(targets) > MASS_ACTION_LIMIT:
+        await ctx.send(f"❌ {len(targets)} members matched, narrow the selection to at most {MASS_ACTION_LIMIT}.")
+        return
+    note = f" {skipped} skipped for having an equal or higher role." if skipped else ""
+    if (selector.name or selector.joined or selector.pattern) and not bot.intents_profile.chunk_guilds_at_startup:
+        note += " Only members seen since the bot started were searched."
+    if not targets:
+        await ctx.send(f"❌ No members matched.{note}")
+        return
+
+    if selector.dry_run:
+        shown = "\n".join(f"<@{target.id}> ({target.id})" for target in targets[:20])
+        more = f"\n...and {len(targets) - 20} more" if len(targets) > 20 else ""
+        embed = discord.Embed(
+            title=f"Mass {action.title()} Preview",
+            description=f"{len(targets)} member(s) would be {past.lower()}.{note}\n\n{shown}{more}",
+            color=discord.Color.orange()
+        )
+        embed.set_footer(text="Run the command again without `dry` to apply it")
+        await ctx.send(embed=embed)
+        return
+
+    status = await ctx.send(f"⏳ {verb} {len(targets)} members...")
+    report = progress_reporter(status, past, "members")
+    audit_reason = f"Mass {action} by {ctx.author}: {reason}"
+    done, failed = [], 0
+    if action == "ban":
+        # One bulk request per 200 members, members who already left included
+        for start in range(0, len(targets), BULK_BAN_SIZE):
+            chunk = targets[start:start + BULK_BAN_SIZE]
+            try:
+                result = await bot.actions.submit(
+                    "ban", ctx.guild.id, 0, lambda chunk=chunk: ctx.guild.bulk_ban(chunk, reason=audit_reason),
+                    tag=(ctx.message.id, start)
+                )
+            except discord.HTTPException:
+                failed += len(chunk)
+            else:
+                done.extend(user.id for user in result.banned)
+                failed += len(result.failed)
+            report(start + len(chunk), len(targets))
+    else:
+        async def kick_member(member):
+            await bot.actions.submit("kick", ctx.guild.id, member.id, lambda: member.kick(reason=audit_reason))
+            done.append(member.id)
+
+        # Leave dispatcher workers free for automod while a big kick runs
+        failed = len(await run_bounded(targets, kick_member, limit=max(1, bot.actions.workers // 2), progress=report))
+
+    if done:
+        await log_bulk_action(ctx.guild, f"Mass {action.title()}", ctx.author, done, reason)
+    failures = f" {failed} failed." if failed else ""
+    await report.finish(content=f"✅ {past} {len(done)} members.{note}{failures}")
+
+@bot.command()
+@commands.has_permissions(ban_members=True)
+async def massban(ctx, *, selection: str = ""):
+    """
+    Ban every member matching a selection
+    Usage: !massban <ids|name:text|joined:ago[..ago]|regex:pattern> [dry] [-- reason]
+    Example: !massban joined:30m name:raider -- Raid cleanup
+    """
+    if not selection:
+        embed = discord.Embed(
+            title="Command Help: Mass Ban",
+            description="Ban every member matching all of the given selectors; add `dry` to preview",
+            color=discord.Color.blue()
+        )
+        embed.add_field(name="Usage", value="!massban <selectors> [dry] [-- reason]")
+        embed.add_field(name="Example", value="!massban joined:30m name:raider -- Raid cleanup")
+        embed.add_field(
+            name="Selectors",
+            value="IDs or mentions, `name:text` (similar names), `joined:30m` or `joined:2h..1h`, "
+                  "`regex:pattern` (must come last)",
+            inline=False
+        )
+        await ctx.send(embed=embed)
+        return
+    await mass_action(ctx, "ban", selection)
+
+@bot.command()
+@commands.has_permissions(kick_members=True)
+async def masskick(ctx, *, selection: str = ""):
+    """
+    Kick every member matching a selection
+    Usage: !masskick <ids|name:text|joined:ago[..ago]|regex:pattern> [dry] [-- reason]
+    Example: !masskick joined:2h..1h dry
+    """
+    if not selection:
+        embed = discord.Embed(
+            title="Command Help: Mass Kick",
+            description="Kick every member matching all of the given selectors; add `dry` to preview",
+            color=discord.Color.blue()
+        )
+        embed.add_field(name="Usage", value="!masskick <selectors> [dry] [-- reason]")
+        embed.add_field(name="Example", value="!masskick joined:2h..1h dry")
+        embed.add_field(
+            name="Selectors",
+            value="IDs or mentions, `name:text` (similar names), `joined:30m` or `joined:2h..1h`, "
+                  "`regex:pattern` (must come last)",
+            inline=False
+        )
+        await ctx.send(embed=embed)
+        return
+    await mass_action(ctx, "kick", selection)
 
 
 @commands.command()
@@ -266,12 +660,153 @@ async def kick(self, ctx, member: discord.Member = None, *, reason="No reason pr
         await ctx.send("❌ You cannot kick members with an equal or higher role. Sorry lil bro/sis")
         return
 
-    await member.kick(reason=reason)
+    await bot.actions.submit("kick", ctx.guild.id, member.id, lambda: member.kick(reason=reason))
     await log_action(ctx.guild, "Kick", ctx.author, member, reason)
     await ctx.send(f"✅ {member.mention} has been kicked and you Scored a point +1 Aura")
 
 
 # Information Commands
+@bot.command()
+@commands.has_permissions(kick_members=True)
+async def warnings(ctx, member: Optional[discord.Member] = None):
+    """
+    Show a member's warning history
+    Usage: !warnings @member
+    """
+    if not member:
+        embed = discord.Embed(
+            title="Command Help: Warnings",
+            description="Show the warnings a member has received in this server",
+            color=discord.Color.blue()
+        )
+        embed.add_field(name="Usage", value="!warnings @member")
+        await ctx.send(embed=embed)
+        return
+
+    records = await bot.warnings.get(ctx.guild.id, member.id)
+    limits = (await bot.settings.get(ctx.guild.id))['warnings']
+    score = await bot.warnings.score(ctx.guild.id, member.id, limits['half_life_days'] * 86400, limits['points'])
+    embed = discord.Embed(
+        title=f"Warnings for {member}",
+        description=f"{member.mention} has {len(records)} warning(s), currently worth {score:.1f} point(s).",
+        color=discord.Color.orange(),
+        timestamp=get_current_time()
+    )
+    # Newest ten first, embeds are capped at 25 fields
+    shown = records[-10:]
+    first = len(records) - len(shown) + 1
+    for number, record in reversed(list(enumerate(shown, start=first))):
+        embed.add_field(
+            name=f"Warning #{number}",
+            value=f"**Moderator:** <@{record.moderator_id}>\n"
+                  f"**Reason:** {record.reason}\n"
+                  f"**When:** <t:{int(record.created_at)}:R>",
+            inline=False
+        )
+    await ctx.send(embed=embed)
+
+class ModLogPages(discord.ui.View):
+    """Prev/Next buttons over !modlog results, paging with the journal's keyset cursor"""
+
+    def __init__(self, author, filters, entries, more, page_size=10):
+        super().__init__(timeout=300)
+        self.author = author
+        self.filters = filters
+        self.entries = entries
+        self.page_size = page_size
+        self.page = 1
+        self.message = None
+        self.update_buttons(newer=False, older=more)
+
+    def update_buttons(self, newer, older):
+        self.newer.disabled = not newer
+        self.older.disabled = not older
+
+    def embed(self):
+        embed = discord.Embed(title="Moderation History", color=discord.Color.blue())
+        if not self.entries:
+            embed.description = "No matching actions."
+        for entry in self.entries:
+            embed.add_field(
+                name=f"#{entry.id} {entry.action}",
+                value=f"**Target:** <@{entry.target_id}>\n"
+                      f"**Moderator:** <@{entry.moderator_id}>\n"
+                      f"**Reason:** {entry.reason[:300]}\n"
+                      f"**When:** <t:{int(entry.created_at)}:R>",
+                inline=False
+            )
+        embed.set_footer(text=f"Page {self.page}")
+        return embed
+
+    async def interaction_check(self, interaction):
+        if interaction.user.id != self.author.id:
+            await interaction.response.send_message("❌ Only the moderator who ran !modlog can page it.", ephemeral=True)
+            return False
+        return True
+
+    async def show(self, interaction, before=None, after=None):
+        entries, more = await bot.journal.query(interaction.guild_id, self.filters, before=before,
+                                                after=after, limit=self.page_size)
+        if entries:
+            self.entries = entries
+            self.page += 1 if before else -1
+        # "more" only says whether the direction just paged continues
+        if before:
+            self.update_buttons(newer=True, older=more)
+        else:
+            self.update_buttons(newer=more and self.page > 1, older=True)
+        await interaction.response.edit_message(embed=self.embed(), view=self)
+
+    @discord.ui.button(label="Prev", emoji="◀️", style=discord.ButtonStyle.secondary)
+    async def newer(self, interaction, button):
+        await self.show(interaction, after=self.entries[0].cursor)
+
+    @discord.ui.button(label="Next", emoji="▶️", style=discord.ButtonStyle.secondary)
+    async def older(self, interaction, button):
+        await self.show(interaction, before=self.entries[-1].cursor)
+
+    async def on_timeout(self):
+        if self.message is not None:
+            self.update_buttons(newer=False, older=False)
+            try:
+                await self.message.edit(view=self)
+            except discord.HTTPException:
+                pass
+
+@bot.command()
+@commands.has_permissions(kick_members=True)
+async def modlog(ctx, *, filters: str = ""):
+    """
+    Search this server's moderation history
+    Usage: !modlog [user:@member] [mod:@member] [action:name] [since:30d] [until:1d] [search:words]
+    Example: !modlog user:@user since:30d
+    """
+    if filters.strip().lower() == "help":
+        embed = discord.Embed(
+            title="Command Help: Modlog",
+            description="Show logged moderation actions, newest first, filtered by any combination of options",
+            color=discord.Color.blue()
+        )
+        embed.add_field(name="Usage", value="!modlog [filters]")
+        embed.add_field(name="Example", value="!modlog user:@user since:30d")
+        embed.add_field(
+            name="Filters",
+            value="`user:@member`, `mod:@member`, `action:ban` (`action:mass_ban` for spaces), "
+                  "`since:30d`, `until:1d`, `search:words` (must come last)",
+            inline=False
+        )
+        await ctx.send(embed=embed)
+        return
+
+    try:
+        query = JournalQuery.parse(filters)
+    except ValueError as e:
+        await ctx.send(f"❌ {e}")
+        return
+    entries, more = await bot.journal.query(ctx.guild.id, query)
+    view = ModLogPages(ctx.author, query, entries, more)
+    view.message = await ctx.send(embed=view.embed(), view=view)
+
 @bot.command()
 async def userinfo(ctx, member: Optional[discord.Member] = None):
     """Get information about a user"""
@@ -293,6 +828,69 @@ async def userinfo(ctx, member: Optional[discord.Member] = None):
     
     await ctx.send(embed=embed)
 
+@bot.command()
+@commands.has_permissions(kick_members=True)
+async def stats(ctx):
+    """
+    Show latency and throughput stats for the bot
+    Usage: !stats
+    """
+    metrics = bot.metrics
+    embed = discord.Embed(
+        title="Bot Statistics",
+        color=discord.Color.blue(),
+        timestamp=get_current_time()
+    )
+    if not metrics.enabled:
+        embed.description = "Metrics are disabled (MODBOT_METRICS=0)."
+        await ctx.send(embed=embed)
+        return
+
+    def summary(histogram):
+        return f"{histogram.count} • p50 {histogram.quantile(0.5) * 1e3:g}ms • p99 {histogram.quantile(0.99) * 1e3:g}ms"
+
+    commands_seen = sorted(metrics.histogram("command_seconds").items(), key=lambda item: -item[1].count)
+    embed.add_field(
+        name="Commands",
+        value="\n".join(f"`!{dict(labels)['command']}` {summary(h)}" for labels, h in commands_seen[:8]) or "None yet",
+        inline=False
+    )
+    stages = metrics.histogram("automod_seconds")
+    embed.add_field(
+        name="Auto-Moderation",
+        value="\n".join(f"{dict(labels)['stage']}: {summary(h)}" for labels, h in sorted(stages.items())) or "None yet",
+        inline=False
+    )
+    routes = sorted(metrics.histogram("rest_seconds").items(), key=lambda item: -item[1].count)
+    embed.add_field(
+        name="REST Calls",
+        value="\n".join(f"`{dict(labels)['method']} {dict(labels)['route']}` {summary(h)}" for labels, h in routes[:5]) or "None yet",
+        inline=False
+    )
+
+    guild = str(ctx.guild.id)
+    messages = sum(metrics.counter("messages_total", guild=guild).values())
+    guild_commands = sum(metrics.counter("commands_total", guild=guild).values())
+    embed.add_field(name="This Server", value=f"{messages} messages checked\n{guild_commands} commands run")
+    modlog = bot.modlog.stats()
+    embed.add_field(
+        name="Mod-Log Queue",
+        value=f"{modlog['queue_depth']} queued\n{modlog['sent_embeds']} embeds in {modlog['sent_messages']} messages\n"
+              f"avg flush {modlog['avg_flush_latency']:.2f}s"
+    )
+    actions = bot.actions.stats()
+    embed.add_field(
+        name="Action Dispatcher",
+        value=f"{actions['executed']} calls made, {actions['saved']} saved\n"
+              f"{actions['queued']} queued, {actions['failed']} failed"
+    )
+    uptime = timedelta(seconds=int(time.time() - metrics.started_at))
+    shard = f"Shard {ctx.guild.shard_id}/{bot.shard_count or 1}"
+    if bot.shard_config.cluster is not None:
+        shard += f" on cluster {bot.shard_config.cluster}"
+    embed.set_footer(text=f"{shard} • Uptime {uptime}")
+    await ctx.send(embed=embed)
+
 @bot.command()
 async def serverinfo(ctx):
     """Get information about the server"""
@@ -306,7 +904,7 @@ async def serverinfo(ctx):
     
     embed.set_thumbnail(url=guild.icon.url if guild.icon else None)
     embed.add_field(name="Server ID", value=guild.id)
-    embed.add_field(name="Owner", value=guild.owner.mention)
+    embed.add_field(name="Owner", value=f"<@{guild.owner_id}>")
     embed.add_field(name="Created On", value=guild.created_at.strftime("%Y-%m-%d"))
     embed.add_field(name="Member Count", value=guild.member_count)
     embed.add_field(name="Channel Count", value=len(guild.channels))
@@ -314,7 +912,374 @@ async def serverinfo(ctx):
     
     await ctx.send(embed=embed)
 
+# Auto-Moderation Commands
+@bot.group(invoke_without_command=True)
+@commands.has_permissions(manage_guild=True)
+async def config(ctx):
+    """
+    Show or change this server's moderation thresholds
+    Usage: !config [set <setting> <value>|reset [setting]|ladder [steps|reset]]
+    Example: !config set spam.limit 8
+    """
+    settings = await bot.settings.get(ctx.guild.id)
+    embed = discord.Embed(
+        title="Server Settings",
+        description="Change a value with `!config set <setting> <value>`, undo with `!config reset [setting]`",
+        color=discord.Color.blue()
+    )
+    for section, defaults in SETTING_DEFAULTS.items():
+        changed = settings.overrides.get(section, {})
+        embed.add_field(
+            name=section.title(),
+            value="\n".join(f"`{section}.{name}` {settings[section][name]}{' *' if name in changed else ''}" for name in defaults)
+        )
+    embed.add_field(
+        name="Warning Ladder",
+        value=f"{format_ladder(settings.ladder)}{' *' if 'ladder' in settings.overrides else ''}\n"
+              "Change it with `!config ladder <steps>`",
+        inline=False
+    )
+    embed.set_footer(text="* changed from the default")
+    await ctx.send(embed=embed)
+
+@config.command(name="set")
+@commands.has_permissions(manage_guild=True)
+async def config_set(ctx, key: str, *, value: str):
+    try:
+        parsed = parse_value(key.lower(), value.strip())
+    except ValueError as e:
+        await ctx.send(f"❌ {e}")
+        return
+    await bot.settings.set(ctx.guild.id, key.lower(), parsed)
+    await log_action(ctx.guild, "Config Changed", ctx.author, ctx.author, f"{key.lower()} = {parsed}")
+    await ctx.send(f"✅ `{key.lower()}` set to {parsed}")
+
+@config.command(name="reset")
+@commands.has_permissions(manage_guild=True)
+async def config_reset(ctx, key: Optional[str] = None):
+    try:
+        await bot.settings.reset(ctx.guild.id, key.lower() if key else None)
+    except ValueError as e:
+        await ctx.send(f"❌ {e}")
+        return
+    target = f"`{key.lower()}`" if key else "All settings"
+    await log_action(ctx.guild, "Config Reset", ctx.author, ctx.author, f"{target} reset to default")
+    await ctx.send(f"✅ {target} reset to default.")
+
+@config.command(name="ladder")
+@commands.has_permissions(manage_guild=True)
+async def config_ladder(ctx, *, steps: Optional[str] = None):
+    """
+    Show or change what a warning does once a member's points reach a score
+    Usage: !config ladder [<score> <action> [duration], ...|reset]
+    Example: !config ladder 2 timeout 1h, 4 timeout 1d, 6 kick, 8 ban
+    """
+    settings = await bot.settings.get(ctx.guild.id)
+    if not steps:
+        limits = settings['warnings']
+        embed = discord.Embed(
+            title="Warning Ladder",
+            description="Each warning adds `warnings.points` to a member's score, which halves every "
+                        f"`warnings.half_life_days` ({limits['half_life_days']:g} days). "
+                        "A warning applies the highest step the score has reached.",
+            color=discord.Color.blue()
+        )
+        embed.add_field(name="Steps", value=format_ladder(settings.ladder), inline=False)
+        embed.add_field(name="Usage", value="!config ladder <score> <action> [duration], ...\n!config ladder reset")
+        embed.add_field(name="Example", value="!config ladder 2 timeout 1h, 4 timeout 1d, 6 kick, 8 ban")
+        await ctx.send(embed=embed)
+        return
+
+    if steps.strip().lower() == "reset":
+        settings = await bot.settings.set_ladder(ctx.guild.id, None)
+    else:
+        try:
+            parsed = parse_ladder(steps)
+        except ValueError as e:
+            await ctx.send(f"❌ {e}")
+            return
+        settings = await bot.settings.set_ladder(ctx.guild.id, parsed)
+    ladder = format_ladder(settings.ladder)
+    await log_action(ctx.guild, "Config Changed", ctx.author, ctx.author, f"warning ladder = {ladder}")
+    await ctx.send(f"✅ Warning ladder set to {ladder}")
+
+async def update_filter(guild_id, terms):
+    """Save a guild's filter terms; the matcher is recompiled on next use"""
+    settings = await bot.settings.set_filter(guild_id, terms)
+    return settings.filter
+
+@bot.group(invoke_without_command=True)
+@commands.has_permissions(manage_messages=True)
+async def set_filter(ctx):
+    """
+    Manage the blocked word filter
+    Usage: !set_filter <add|remove|list|clear> [words]
+    Example: !set_filter add badword, another phrase
+    """
+    embed = discord.Embed(
+        title="Command Help: Set Filter",
+        description="Manage the words and phrases deleted by the auto-moderation filter",
+        color=discord.Color.blue()
+    )
+    embed.add_field(name="Usage", value="!set_filter <add|remove|list|clear> [words]")
+    embed.add_field(name="Example", value="!set_filter add badword, another phrase")
+    embed.add_field(name="Matching", value="Case, accents, look-alike letters, leetspeak and hidden characters are ignored", inline=False)
+    await ctx.send(embed=embed)
+
+def parse_terms(words):
+    return [term.strip() for term in words.split(",") if term.strip()]
+
+@set_filter.command(name="add")
+@commands.has_permissions(manage_messages=True)
+async def set_filter_add(ctx, *, words: str):
+    matcher = (await bot.settings.get(ctx.guild.id)).filter
+    matcher = await update_filter(ctx.guild.id, matcher.terms | WordFilter(parse_terms(words)).terms)
+    await ctx.send(f"✅ Filter updated. {len(matcher)} term(s) blocked.")
+
+@set_filter.command(name="remove")
+@commands.has_permissions(manage_messages=True)
+async def set_filter_remove(ctx, *, words: str):
+    matcher = (await bot.settings.get(ctx.guild.id)).filter
+    matcher = await update_filter(ctx.guild.id, matcher.terms - WordFilter(parse_terms(words)).terms)
+    await ctx.send(f"✅ Filter updated. {len(matcher)} term(s) blocked.")
+
+@set_filter.command(name="list")
+@commands.has_permissions(manage_messages=True)
+async def set_filter_list(ctx):
+    matcher = (await bot.settings.get(ctx.guild.id)).filter
+    if not matcher:
+        await ctx.send("The filter is empty.")
+        return
+    terms = ", ".join(f"||{term}||" for term in sorted(matcher.terms))
+    await ctx.send(f"Blocked terms ({len(matcher)}): {terms[:1900]}")
+
+@set_filter.command(name="clear")
+@commands.has_permissions(manage_messages=True)
+async def set_filter_clear(ctx):
+    await update_filter(ctx.guild.id, ())
+    await ctx.send("✅ Filter cleared.")
+
+async def raid_settings(guild_id):
+    return (await bot.settings.get(guild_id))['raid']
+
+@bot.command()
+@commands.has_permissions(manage_guild=True)
+async def raid_protect(ctx, option: Optional[str] = None, *values: str):
+    """
+    Configure join raid protection
+    Usage: !raid_protect [on|off|action|threshold|cluster|end]
+    Example: !raid_protect threshold 10 10
+    """
+    option = (option or "").lower()
+    if option in ("on", "off"):
+        await bot.settings.set(ctx.guild.id, 'raid.enabled', option == "on")
+    elif option == "action" and values and values[0].lower() in SETTING_CHOICES['raid.action']:
+        await bot.settings.set(ctx.guild.id, 'raid.action', values[0].lower())
+    elif option == "threshold" and len(values) == 2:
+        try:
+            threshold, window = max(int(values[0]), 2), max(float(values[1]), 1.0)
+        except ValueError:
+            await ctx.send("❌ Usage: !raid_protect threshold <joins> <seconds>")
+            return
+        await bot.settings.set(ctx.guild.id, 'raid.threshold', threshold)
+        await bot.settings.set(ctx.guild.id, 'raid.window', window)
+    elif option == "cluster" and len(values) == 1:
+        if not values[0].isdigit():
+            await ctx.send("❌ Usage: !raid_protect cluster <joins>")
+            return
+        await bot.settings.set(ctx.guild.id, 'raid.cluster', max(int(values[0]), 2))
+    elif option == "end":
+        bot.raid_detection.end_raid(ctx.guild.id)
+        previous = (await raid_settings(ctx.guild.id)).get('previous_verification')
+        await bot.settings.set_state(ctx.guild.id, 'raid', 'previous_verification', None)
+        if previous is not None:
+            await ctx.guild.edit(verification_level=discord.VerificationLevel(previous), reason="Raid ended")
+        await log_action(ctx.guild, "Raid Ended", ctx.author, ctx.author, "Raid mode ended manually")
+        await ctx.send("✅ Raid mode ended.")
+        return
+    elif option:
+        await ctx.send("❌ Usage: !raid_protect [on|off|action <timeout|kick|lock>|threshold <joins> <seconds>|cluster <joins>|end]")
+        return
+
+    current = await raid_settings(ctx.guild.id)
+    window = bot.raid_detection.stats(ctx.guild.id)
+    embed = discord.Embed(
+        title="Raid Protection",
+        color=discord.Color.red() if bot.raid_detection.is_raiding(ctx.guild.id) else discord.Color.blue()
+    )
+    embed.add_field(name="Status", value="On" if current['enabled'] else "Off (alerts only)")
+    embed.add_field(name="Action", value=current['action'])
+    embed.add_field(name="Threshold", value=f"{current['threshold']} joins in {current['window']:g}s")
+    embed.add_field(name="Name Cluster", value=f"{current['cluster']} similar names in {current['window']:g}s")
+    embed.add_field(name="Raid Active", value="Yes" if bot.raid_detection.is_raiding(ctx.guild.id) else "No")
+    embed.add_field(
+        name="Recent Joins",
+        value=f"{window['joins']} joins, {window['new_accounts']} new accounts, "
+              f"{window['default_avatars']} default avatars, largest name cluster {window['largest_cluster']}",
+        inline=False
+    )
+    await ctx.send(embed=embed)
+
+async def respond_to_raid(guild, member_ids, action, started=False):
+    """Apply the raid response to every target through the action dispatcher.
+
+    The guild-wide part of a lock (verification level and Muted role) only
+    runs for the join that started the raid; later joins just get muted.
+    """
+    members = [m for m in map(guild.get_member, member_ids) if m and m.top_role < guild.me.top_role]
+    if action == "lock":
+        if started and guild.verification_level != discord.VerificationLevel.highest:
+            if (await raid_settings(guild.id)).get('previous_verification') is None:
+                await bot.settings.set_state(guild.id, 'raid', 'previous_verification', guild.verification_level.value)
+            await guild.edit(verification_level=discord.VerificationLevel.highest, reason="Raid protection")
+        # Resolved once per guild; joins racing the first one share its creation
+        muted_role = await get_muted_role(guild)
+
+    def apply(member):
+        if action == "kick":
+            return bot.actions.submit("kick", guild.id, member.id, lambda: member.kick(reason="Raid protection"))
+        if action == "lock":
+            return bot.actions.submit("role", guild.id, member.id, lambda: member.add_roles(muted_role, reason="Raid protection"), tag="mute")
+        return bot.actions.submit("timeout", guild.id, member.id, lambda: member.timeout(timedelta(hours=1), reason="Raid protection"),
+                                  tag="raid", cooldown=AUTOMOD_COOLDOWN)
+
+    results = await asyncio.gather(*map(apply, members), return_exceptions=True)
+    failed = sum(isinstance(result, Exception) for result in results)
+    if failed:
+        bot.logger.warning(f"Raid {action} failed for {failed}/{len(members)} members", extra={"guild": guild.id, "action": action})
+
+class ProgressReporter:
+    """Progress callback that edits a status message at most every couple of seconds.
+
+    ``render(*progress)`` builds the text, or returns None to skip an update.
+    Only one edit is in flight at a time, and :meth:`finish` waits for it
+    before the final edit so a late progress edit never overwrites the result.
+    """
+
+    def __init__(self, status, render):
+        self.status = status
+        self.render = render
+        self.last_edit = 0.0
+        self.pending = None
+
+    def __call__(self, *progress):
+        now = asyncio.get_running_loop().time()
+        if now - self.last_edit < 2 or (self.pending is not None and not self.pending.done()):
+            return
+        content = self.render(*progress)
+        if content is not None:
+            self.last_edit = now
+            self.pending = asyncio.create_task(self.status.edit(content=content))
+
+    async def finish(self, **kwargs):
+        """Wait for any progress edit, then make the final one"""
+        if self.pending is not None:
+            await asyncio.gather(self.pending, return_exceptions=True)
+        await self.status.edit(**kwargs)
+
+def progress_reporter(status, verb, noun="channels"):
+    """A :class:`ProgressReporter` showing ``done/total`` while work remains"""
+    return ProgressReporter(status, lambda done, total: f"⏳ {verb} {done}/{total} {noun}..." if done < total else None)
+
+@bot.command()
+@commands.has_permissions(manage_channels=True)
+async def lockdown(ctx, *, reason="No reason provided"):
+    """
+    Stop @everyone from talking in every channel
+    Usage: !lockdown [reason]
+    Example: !lockdown Raid in progress
+    """
+    status = await ctx.send("🔒 Locking the server...")
+    report = progress_reporter(status, "Locked")
+    failures = await lock_guild(ctx.guild, bot.lockdowns, f"Lockdown by {ctx.author}: {reason}", progress=report)
+    note = f" {len(failures)} channel(s) could not be locked." if failures else ""
+    await report.finish(content=f"🔒 Server locked down. Use `!unlock` to restore permissions.{note}")
+    await log_action(ctx.guild, "Lockdown", ctx.author, ctx.guild.default_role, reason)
+
+@bot.command()
+@commands.has_permissions(manage_channels=True)
+async def unlock(ctx):
+    """
+    Restore the channel permissions saved by !lockdown
+    Usage: !unlock
+    """
+    status = await ctx.send("🔓 Restoring permissions...")
+    report = progress_reporter(status, "Restored")
+    failures = await unlock_guild(ctx.guild, bot.lockdowns, f"Unlock by {ctx.author}", progress=report)
+    if failures is None:
+        await report.finish(content="❌ The server is not locked down.")
+        return
+    note = f" {len(failures)} channel(s) failed, run `!unlock` again to retry them." if failures else ""
+    await report.finish(content=f"🔓 Server unlocked.{note}")
+    await log_action(ctx.guild, "Unlock", ctx.author, ctx.guild.default_role, "Lockdown lifted")
+
+@bot.command()
+@commands.is_owner()
+async def reload(ctx, cog: Optional[str] = None):
+    """
+    Swap in a cog's new code without restarting
+    Usage: !reload <cog>
+    Example: !reload moderation
+    """
+    if not cog:
+        loaded = ", ".join(sorted(name.removeprefix("cogs.") for name in bot.extensions)) or "none"
+        embed = discord.Embed(
+            title="Command Help: Reload",
+            description="Reload a cog from disk, keeping its in-memory state",
+            color=discord.Color.blue()
+        )
+        embed.add_field(name="Usage", value="!reload <cog>")
+        embed.add_field(name="Loaded", value=loaded)
+        await ctx.send(embed=embed)
+        return
+
+    name = cog if cog.startswith("cogs.") else f"cogs.{cog}"
+    started = time.perf_counter()
+    try:
+        if name in bot.extensions:
+            carried = await bot.reload_cog(name)
+        else:
+            await bot.load_extension(name)
+            carried = 0
+    except commands.ExtensionError as e:
+        await ctx.send(f"❌ Could not reload `{name}`, the old version is still running: {e}")
+        return
+    note = f", state carried over for {carried} cog(s)" if carried else ""
+    await ctx.send(f"✅ Reloaded `{name}` in {(time.perf_counter() - started) * 1e3:.0f}ms{note}")
+
 # Auto-moderation features
+@bot.event
+async def on_member_join(member):
+    bot.member_index.add(member)
+    settings = await raid_settings(member.guild.id)
+    verdict = bot.raid_detection.record(member, settings['threshold'], settings['window'], settings['cluster'])
+    if verdict is None:
+        return
+
+    if verdict.started:
+        response = settings['action'] if settings['enabled'] else "alert only"
+        await log_action(member.guild, "Raid Detected", member.guild.me, member, f"{verdict.reason}, response: {response}")
+    if settings['enabled']:
+        asyncio.create_task(respond_to_raid(member.guild, verdict.targets, settings['action'], verdict.started))
+
+@bot.event
+async def on_raw_member_remove(payload):
+    bot.member_index.remove(payload.guild_id, payload.user.id)
+
+@bot.event
+async def on_member_update(before, after):
+    if before.nick != after.nick:
+        bot.member_index.add(after)
+
+@bot.event
+async def on_user_update(before, after):
+    if before.name != after.name or before.global_name != after.global_name:
+        bot.member_index.rename(after, after.mutual_guilds)
+
+@bot.event
+async def on_guild_remove(guild):
+    bot.member_index.forget(guild.id)
+
 @bot.event
 async def on_message(message):
     if message.author.bot:
@@ -323,27 +1288,90 @@ async def on_message(message):
     # Process commands first
     await bot.process_commands(message)
 
+    if message.guild is None:
+        return
+
+    bot.metrics.inc("messages_total", guild=str(message.guild.id))
+
+    settings = await bot.settings.get(message.guild.id)
+
     # Spam detection
-    current_time = get_current_time()
-    bot.spam_detection[message.author.id].append(current_time)
-    recent_messages = [
-        t for t in bot.spam_detection[message.author.id]
-        if (current_time - t).total_seconds() < 5
-    ]
-    bot.spam_detection[message.author.id] = recent_messages
+    with bot.metrics.timer("automod_seconds", stage="spam"):
+        spam = settings['spam']
+        if bot.spam_detection.hit((message.guild.id, message.author.id), limit=spam['limit'], window=spam['window']):
+            # Every message past the limit lands here; the dispatcher keeps one of each action
+            author, channel, guild = message.author, message.channel, message.guild
+            duration = timedelta(minutes=spam['timeout_minutes'])
+            bot.actions.submit("timeout", guild.id, author.id, lambda: author.timeout(duration, reason="Spam detection"),
+                               tag="spam", cooldown=AUTOMOD_COOLDOWN)
+            bot.actions.submit("notice", guild.id, author.id, lambda: channel.send(
+                embed=discord.Embed(
+                    title="Auto-Moderation",
+                    description=f"{author.mention} has been timed out for spamming.",
+                    color=discord.Color.red()
+                )
+            ), tag="spam", cooldown=AUTOMOD_COOLDOWN)
+            bot.actions.submit("log", guild.id, author.id, lambda: log_action(guild, "Auto-Timeout", bot.user, author, "Spam detection"),
+                               tag="Auto-Timeout", cooldown=AUTOMOD_COOLDOWN)
+
+    # The same text from many accounts
+    with bot.metrics.timer("automod_seconds", stage="copypasta"):
+        copypasta = settings['copypasta']
+        verdict = copypasta['enabled'] and bot.copypasta.check(
+            message.channel.id, message.author.id, message.id, message.content,
+            authors=copypasta['authors'], window=copypasta['window']
+        )
+        if verdict:
+            await handle_copypasta(message, verdict, copypasta['timeout_minutes'])
+            return
+
+    # Bad word filter
+    with bot.metrics.timer("automod_seconds", stage="filter"):
+        matcher = settings.filter
+        # Moderators are exempt, or `!set_filter add <term>` would delete itself
+        if (matcher and matcher.search(message.content)
+                and not message.channel.permissions_for(message.author).manage_messages):
+            author, channel, guild = message.author, message.channel, message.guild
+            bot.actions.submit("delete", guild.id, author.id, message.delete, tag=message.id)
+            bot.actions.submit("notice", guild.id, author.id, lambda: channel.send(
+                f"⛔ {author.mention}, your message was removed by the word filter.",
+                delete_after=10
+            ), tag="filter", cooldown=10)
+            bot.actions.submit("log", guild.id, author.id, lambda: log_action(guild, "Auto-Delete (Filter)", bot.user, author, "Blocked term"),
+                               tag=message.id)
 
-    if len(recent_messages) >= 5:
-        await message.author.timeout(timedelta(minutes=10), reason="Spam detection")
-        await message.channel.send(
+async def handle_copypasta(message, verdict, timeout_minutes):
+    """Remove a copypasta wave's copies and time out the accounts posting it"""
+    channel, guild = message.channel, message.guild
+    copies = [message, *map(discord.Object, verdict.message_ids)]
+    for start in range(0, len(copies), 100):
+        batch = copies[start:start + 100]
+        bot.actions.submit("delete", guild.id, message.author.id,
+                           lambda batch=batch: channel.delete_messages(batch, reason="Copypasta detection"), tag=batch[0].id)
+
+    duration = timedelta(minutes=timeout_minutes)
+    for member in map(guild.get_member, verdict.authors):
+        if member and member.top_role < guild.me.top_role:
+            bot.actions.submit("timeout", guild.id, member.id, lambda member=member: member.timeout(duration, reason="Copypasta detection"),
+                               tag="copypasta", cooldown=AUTOMOD_COOLDOWN)
+    if verdict.started:
+        bot.actions.submit("notice", guild.id, 0, lambda: channel.send(
             embed=discord.Embed(
                 title="Auto-Moderation",
-                description=f"{message.author.mention} has been timed out for spamming.",
+                description=f"Removed a message posted by {len(verdict.authors)} accounts and timed them out.",
                 color=discord.Color.red()
             )
-        )
-        await log_action(message.guild, "Auto-Timeout", bot.user, message.author, "Spam detection")
+        ), tag=("copypasta", channel.id))
+        await log_action(guild, "Auto-Timeout (Copypasta)", bot.user, message.author,
+                         f"{verdict.copies} copies from {len(verdict.authors)} accounts in #{channel.name}")
 
-    # Bad word filter and more can be added here
+@bot.event
+async def on_guild_channel_create(channel):
+    await bot.muted_roles.patch_channel(channel)
+
+@bot.event
+async def on_guild_role_delete(role):
+    bot.muted_roles.forget(role)
 
 @bot.event
 async def on_command_error(ctx, error):
@@ -360,32 +1388,16 @@ async def on_command_error(ctx, error):
             await ctx.send("❌ Invalid argument provided! Use !help for command usage.")
     else:
         await ctx.send(f"❌ An error occurred: {str(error)}")
-        bot.logger.error(f"Command error in {ctx.command}: {str(error)}")
+        bot.logger.error(
+            f"Command error in {ctx.command}: {str(error)}",
+            extra={"guild": ctx.guild.id if ctx.guild else None, "command": str(ctx.command)}
+        )
 
 @bot.event
 async def on_ready():
+    # Fires again after reconnects, so startup work lives in ModBot.setup_hook
     print(f"🎉 {bot.user} is now online and ready to rock Discord!")
-    activities = [
-        "Keeping the chaos in check | Type !help 🎮",
-        "Moderating the server | Stay cool 😎",
-        "Kicking troublemakers | 😈",
-        "Type !help to see what I can do!"
-    ]
-    
-    async def cycle_status():
-        while True:
-            for activity in activities:
-                await bot.change_presence(activity=discord.Game(name=activity))
-                await asyncio.sleep(30)  # Waits 30 seconds before changing
-    
-    bot.loop.create_task(cycle_status())
-    for filename in os.listdir("./cogs"):
-        if filename.endswith(".py"):
-            cog_name = f"cogs.{filename[:-3]}"
-            try:
-               await bot.load_extension(cog_name)
-                print(f"✅ Loaded {cog_name}")
-            except Exception as e:
-                print(f"❌ Failed to load {cog_name}: {e}")
 
-bot.run('')
+# Running the bot
+if __name__ == "__main__":
+    bot.run(os.getenv('DISCORD_TOKEN', ''))
@@ -0,0 +1,242 @@
+"""Run the bot as several worker processes, each owning a range of shards.
+
+    DISCORD_TOKEN=... python cluster.py --clusters 4
+
+The supervisor splits the shards into contiguous ranges and starts one
+``AutoShardedBot`` process per range. Discord routes every guild to exactly
+one shard, so each worker only ever sees its own guilds: spam windows, raid
+windows, settings and the warning cache stay process-local with no locking
+between workers. The shared SQLite file only sees each worker's batched
+background writes, and the scheduler reloads only the jobs of owned guilds.
+
+Workers send a heartbeat from their event loop every few seconds. A worker
+that exits or whose loop stops beating for ``--timeout`` seconds is killed and
+restarted with exponential backoff. SIGINT/SIGTERM shut every worker down
+cleanly so pending warnings are flushed.
+"""
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import os
+import signal
+import time
+from multiprocessing.connection import wait
+from typing import List, Optional
+
+from utils.sharding import format_shard_ids, partition
+
+log = logging.getLogger('mod_bot.cluster')
+
+IDENTIFY_INTERVAL = 5.0  # Discord allows one IDENTIFY per 5s per concurrency bucket
+
+
+def worker_main(cluster: int, shard_ids: List[int], shard_count: int, conn, interval: float):
+    """Entry point of a worker process"""
+    os.environ['MODBOT_CLUSTER'] = str(cluster)
+    os.environ['MODBOT_SHARD_IDS'] = format_shard_ids(shard_ids)
+    os.environ['MODBOT_SHARD_COUNT'] = str(shard_count)
+    import bot as modbot  # builds the ModBot instance for these shards
+
+    asyncio.run(serve(modbot.bot, conn, interval))
+
+
+async def serve(bot, conn, interval: float):
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, lambda: loop.create_task(bot.close()))
+
+    async def heartbeat():
+        while not bot.is_closed():
+            try:
+                conn.send({
+                    'pid': os.getpid(),
+                    'ready': bot.is_ready(),
+                    'guilds': len(bot.guilds),
+                    'latencies': dict(bot.latencies),
+                    'at': time.time(),
+                })
+            except (BrokenPipeError, OSError):
+                await bot.close()  # The supervisor is gone
+                return
+            await asyncio.sleep(interval)
+
+    async with bot:
+        beat = loop.create_task(heartbeat())
+        try:
+            await bot.start(os.environ['DISCORD_TOKEN'])
+        finally:
+            beat.cancel()
+
+
+async def fetch_gateway(token: str):
+    """Recommended shard count and identify concurrency from ``GET /gateway/bot``"""
+    from discord.http import HTTPClient
+
+    http = HTTPClient(asyncio.get_running_loop())
+    try:
+        await http.static_login(token)
+        shards, _, limits = await http.get_bot_gateway()
+        return shards, limits.get('max_concurrency', 1)
+    finally:
+        await http.close()
+
+
+class Worker:
+    def __init__(self, cluster: int, shard_ids: List[int]):
+        self.cluster = cluster
+        self.shard_ids = shard_ids
+        self.process: Optional[multiprocessing.Process] = None
+        self.conn = None
+        self.started_at = 0.0
+        self.last_beat = 0.0
+        self.status: dict = {}
+        self.restarts = 0
+        self.next_start: Optional[float] = None
+
+    @property
+    def name(self) -> str:
+        return f"cluster {self.cluster} (shards {format_shard_ids(self.shard_ids)})"
+
+
+class Supervisor:
+    def __init__(self, shard_count: int, clusters: int, heartbeat: float = 5.0, timeout: float = 60.0,
+                 stagger: float = IDENTIFY_INTERVAL, backoff: float = 5.0, max_backoff: float = 300.0):
+        self.shard_count = shard_count
+        self.heartbeat = heartbeat
+        self.timeout = timeout
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.context = multiprocessing.get_context('spawn')
+        self.workers = [Worker(n, ids) for n, ids in enumerate(partition(shard_count, clusters))]
+        # Clusters identify their shards one after another, so stagger the first start
+        now = time.monotonic()
+        offset = 0.0
+        for worker in self.workers:
+            worker.next_start = now + offset
+            offset += stagger * len(worker.shard_ids)
+        self.stopping = False
+
+    def spawn(self, worker: Worker):
+        parent, child = self.context.Pipe(duplex=False)
+        worker.process = self.context.Process(
+            target=worker_main,
+            args=(worker.cluster, worker.shard_ids, self.shard_count, child, self.heartbeat),
+            name=f"modbot-cluster-{worker.cluster}",
+        )
+        worker.process.start()
+        child.close()
+        worker.conn = parent
+        worker.started_at = worker.last_beat = time.monotonic()
+        worker.next_start = None
+        log.info(f"Started {worker.name} as pid {worker.process.pid}")
+
+    def reap(self, worker: Worker, reason: str):
+        """Stop an unhealthy worker and schedule its restart with backoff"""
+        process = worker.process
+        if process.is_alive():
+            process.terminate()
+            process.join(10)
+            if process.is_alive():
+                process.kill()
+                process.join()
+        worker.conn.close()
+        worker.process = worker.conn = None
+
+        if time.monotonic() - worker.started_at > self.max_backoff:
+            worker.restarts = 0  # It ran long enough to count as healthy
+        delay = min(self.backoff * 2 ** worker.restarts, self.max_backoff)
+        worker.restarts += 1
+        worker.next_start = time.monotonic() + delay
+        log.warning(f"{worker.name} {reason}; restarting in {delay:.0f}s")
+
+    def check(self, worker: Worker, now: float):
+        if worker.process is None:
+            if worker.next_start is not None and now >= worker.next_start:
+                self.spawn(worker)
+            return
+        if not worker.process.is_alive():
+            self.reap(worker, f"exited with code {worker.process.exitcode}")
+        elif now - worker.last_beat > self.timeout:
+            self.reap(worker, f"missed heartbeats for {now - worker.last_beat:.0f}s")
+
+    def receive(self, timeout: float):
+        conns = {worker.conn: worker for worker in self.workers if worker.conn is not None}
+        if not conns:
+            time.sleep(timeout)
+            return
+        for conn in wait(list(conns), timeout):
+            worker = conns[conn]
+            try:
+                while conn.poll():
+                    worker.status = conn.recv()
+                    worker.last_beat = time.monotonic()
+            except (EOFError, OSError):
+                pass  # The process exit is noticed by check()
+
+    def run(self):
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(sig, lambda *_: setattr(self, 'stopping', True))
+        log.info(f"Supervising {len(self.workers)} clusters over {self.shard_count} shards")
+        while not self.stopping:
+            self.receive(1.0)
+            now = time.monotonic()
+            for worker in self.workers:
+                self.check(worker, now)
+        self.shutdown()
+
+    def shutdown(self, grace: float = 30.0):
+        running = [worker for worker in self.workers if worker.process is not None]
+        for worker in running:
+            worker.process.terminate()
+        deadline = time.monotonic() + grace
+        for worker in running:
+            worker.process.join(max(0.0, deadline - time.monotonic()))
+            if worker.process.is_alive():
+                log.warning(f"{worker.name} did not stop in time, killing it")
+                worker.process.kill()
+                worker.process.join()
+        log.info("All clusters stopped")
+
+    def summary(self) -> str:
+        lines = []
+        for worker in self.workers:
+            status = worker.status
+            state = 'ready' if status.get('ready') else 'starting' if worker.process else 'down'
+            lines.append(f"{worker.name}: {state}, {status.get('guilds', 0)} guilds, {worker.restarts} restarts")
+        return "\n".join(lines)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clusters", type=int, default=os.cpu_count() or 1, help="worker processes (default: CPU count)")
+    parser.add_argument("--shards", type=int, help="total shard count (default: Discord's recommendation)")
+    parser.add_argument("--heartbeat", type=float, default=5.0, help="seconds between worker heartbeats")
+    parser.add_argument("--timeout", type=float, default=60.0, help="restart a worker after this many seconds without a heartbeat")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(name)s %(levelname)s %(message)s')
+    token = os.getenv('DISCORD_TOKEN')
+    if not token:
+        raise SystemExit("DISCORD_TOKEN is not set")
+
+    shards, concurrency = asyncio.run(fetch_gateway(token))
+    shard_count = args.shards or shards
+    supervisor = Supervisor(
+        shard_count,
+        args.clusters,
+        heartbeat=args.heartbeat,
+        timeout=args.timeout,
+        stagger=IDENTIFY_INTERVAL / concurrency,
+    )
+    try:
+        supervisor.run()
+    finally:
+        print(supervisor.summary())
+
+
+if __name__ == "__main__":
+    main()
@@ -21,18 +21,30 @@ async def warn(self, ctx, member: discord.Member = None, *, reason="No reason pr
         await ctx.send("❌ You cannot warn members with an equal or higher role.")
         return
 
-    # increment stuff ig
-    self.bot.warning_counts[member.id] = self.bot.warning_counts.get(member.id, 0) + 1
-    warning_count = self.bot.warning_counts[member.id]
+    # increment stuff ig, the store writes it to disk in the background
+    settings = await self.bot.settings.get(ctx.guild.id)
+    limits = settings['warnings']
+    records, score = await self.bot.warnings.add(
+        ctx.guild.id, member.id, ctx.author.id, reason,
+        points=limits['points'], half_life=limits['half_life_days'] * 86400
+    )
 
-    # WARN ESCALATION LOGIC OVER HERE 
+    # WARN ESCALATION LOGIC OVER HERE, the ladder is per server (!config ladder)
+    # and checks the decayed points so old warns count for less
+    step = settings.escalation(score)
     escalation_message = ""
-    if warning_count >= 5:
-        await member.ban(reason=f"Exceeded warning limit: {reason}")
+    if step is None:
+        pass
+    elif step.action == "ban":
+        await self.bot.actions.submit("ban", ctx.guild.id, member.id, lambda: member.ban(reason=f"Exceeded warning limit: {reason}"))
         escalation_message = "User has been banned for exceeding the warning limit."
-    elif warning_count >= 3:
-        await member.timeout(timedelta(hours=24), reason=f"Multiple warnings: {reason}")
-        escalation_message = "User has been timed out for 24 hours."
+    elif step.action == "kick":
+        await self.bot.actions.submit("kick", ctx.guild.id, member.id, lambda: member.kick(reason=f"Exceeded warning limit: {reason}"))
+        escalation_message = "User has been kicked for exceeding the warning limit."
+    else:
+        duration = timedelta(hours=step.hours)
+        await self.bot.actions.submit("timeout", ctx.guild.id, member.id, lambda: member.timeout(duration, reason=f"Multiple warnings: {reason}"), tag=ctx.message.id)
+        escalation_message = f"User has been timed out for {step.hours:g} hours."
 
     await log_action(ctx.guild, "Warn", ctx.author, member, reason)
 
@@ -43,7 +55,7 @@ async def warn(self, ctx, member: discord.Member = None, *, reason="No reason pr
         color=discord.Color.orange()
     )
     warn_embed.add_field(name="Reason", value=reason)
-    warn_embed.add_field(name="Warnings", value=f"{warning_count}/5")
+    warn_embed.add_field(name="Warning Points", value=f"{score:.1f}")
     if escalation_message:
         warn_embed.add_field(name="Action Taken", value=escalation_message)
 
@@ -52,7 +64,7 @@ async def warn(self, ctx, member: discord.Member = None, *, reason="No reason pr
     except discord.Forbidden:
         await ctx.send("❌ Unable to DM the user about the warning.")
 
-    await ctx.send(f"✅ {member.mention} has been warned. Total warnings: {warning_count}/5\n{escalation_message}")
+    await ctx.send(f"✅ {member.mention} has been warned. Total warnings: {len(records)}, points: {score:.1f}\n{escalation_message}")
 
 
 @commands.command()
@@ -81,15 +93,11 @@ async def mute(self, ctx, member: discord.Member = None, duration: str = None, *
 
     muted_role = await get_muted_role(ctx.guild)
     await member.add_roles(muted_role, reason=reason)
+    # Unmutes after duration too :D the scheduler keeps it across restarts
+    await self.bot.scheduler.schedule("unmute", ctx.guild.id, member.id, duration_seconds, channel_id=ctx.channel.id)
     await log_action(ctx.guild, "Mute", ctx.author, member, f"{duration} - {reason}")
     await ctx.send(f"✅ {member.mention} has been muted for {duration}.")
 
-    # Unmutes after duration too :D
-    await asyncio.sleep(duration_seconds)
-    if muted_role in member.roles:
-        await member.remove_roles(muted_role, reason="Mute duration expired.")
-        await ctx.send(f"✅ {member.mention} has been unmuted after {duration}.")
-
 
     @commands.command()
     @commands.has_permissions(kick_members=True)
@@ -138,19 +146,18 @@ async def on_message(self, message):
     if message.author.bot:
         return
 
-    current_time = get_current_time()
-    self.bot.spam_detection.setdefault(message.author.id, []).append(current_time)
-
-    # Keep only messages within the last 5 seconds and vanish boom!
-    self.bot.spam_detection[message.author.id] = [
-        t for t in self.bot.spam_detection[message.author.id]
-        if (current_time - t).total_seconds() < 5
-    ]
+    if message.guild is None:
+        return
 
-    if len(self.bot.spam_detection[message.author.id]) >= 5:
-        await message.author.timeout(timedelta(minutes=10), reason="Spam detection")
-        await message.channel.send(f"⛔ {message.author.mention} has been muted for spamming.")
-        await log_action(message.guild, "Auto-Mute (Spam)", self.bot.user, message.author, "Spam detection")
+    # spam.limit messages inside spam.window seconds trips the limiter, old stamps fall off by themselves
+    spam = (await self.bot.settings.get(message.guild.id))['spam']
+    if self.bot.spam_detection.hit((message.guild.id, message.author.id), limit=spam['limit'], window=spam['window']):
+        # the dispatcher drops the repeats for every message after the limit
+        author, channel, guild = message.author, message.channel, message.guild
+        duration = timedelta(minutes=spam['timeout_minutes'])
+        self.bot.actions.submit("timeout", guild.id, author.id, lambda: author.timeout(duration, reason="Spam detection"), tag="spam", cooldown=30)
+        self.bot.actions.submit("notice", guild.id, author.id, lambda: channel.send(f"⛔ {author.mention} has been muted for spamming."), tag="spam", cooldown=30)
+        self.bot.actions.submit("log", guild.id, author.id, lambda: log_action(guild, "Auto-Mute (Spam)", self.bot.user, author, "Spam detection"), tag="Auto-Mute (Spam)", cooldown=30)
 
 
 
@@ -0,0 +1,10 @@
+"""Offline harness: drive the bot with synthetic or recorded gateway events.
+
+Run ``python -m harness --help`` for the benchmark CLI.
+"""
+
+from .fake import FakeDiscord, RestCall
+from .runner import Harness, ScenarioReport
+from .scenarios import SCENARIOS
+
+__all__ = ["FakeDiscord", "Harness", "RestCall", "SCENARIOS", "ScenarioReport"]
@@ -0,0 +1,57 @@
+import argparse
+import asyncio
+import json
+import os
+
+from .runner import Harness
+from .scenarios import SCENARIOS, replay
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        prog="python -m harness",
+        description="Replay synthetic or recorded gateway events against the bot and report latency, "
+                    "throughput, allocations and outbound REST calls. No Discord connection is used."
+    )
+    parser.add_argument("scenarios", nargs="*", metavar="scenario",
+                        help=f"synthetic scenarios to run (default: all of {', '.join(SCENARIOS)})")
+    parser.add_argument("--events", type=int, default=None, help="events per scenario")
+    parser.add_argument("--users", type=int, default=200, help="regular members in the fake guild")
+    parser.add_argument("--latency", type=float, default=0.0, help="simulated REST round trip in milliseconds")
+    parser.add_argument("--replay", metavar="FILE", help="also replay a JSON-lines file of {\"t\": ..., \"d\": ...} events")
+    parser.add_argument("--record-rest", metavar="FILE", help="write every outbound REST call as JSON lines")
+    parser.add_argument("--intents", choices=["full", "standard", "minimal"], help="intents profile for the bot")
+    parser.add_argument("--trace-allocations", action="store_true", help="also report tracemalloc peak (slower)")
+    parser.add_argument("--settle", type=float, default=1.5, help="seconds to let background work finish")
+    args = parser.parse_args()
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenario(s): {', '.join(sorted(unknown))}")
+    return args
+
+
+async def main():
+    args = parse_args()
+    if args.intents:
+        os.environ["MODBOT_INTENTS"] = args.intents
+
+    harness = await Harness(users=args.users, latency=args.latency / 1e3).start()
+    record = open(args.record_rest, "w", encoding="utf-8") if args.record_rest else None
+    try:
+        runs = [(name, SCENARIOS[name](harness, **({"events": args.events} if args.events else {})))
+                for name in args.scenarios or SCENARIOS]
+        if args.replay:
+            runs.append((f"replay {args.replay}", replay(harness, args.replay)))
+        for name, stream in runs:
+            report = await harness.run(name, stream, settle=args.settle, trace_allocations=args.trace_allocations)
+            print(report.format())
+            if record:
+                for call in harness.fake.calls:
+                    record.write(json.dumps({"scenario": name, **call._asdict()}) + "\n")
+    finally:
+        if record:
+            record.close()
+        await harness.close()
+
+
+asyncio.run(main())
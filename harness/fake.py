@@ -0,0 +1,295 @@
+import asyncio
+import itertools
+import re
+import time
+from collections import deque
+from typing import Any, Dict, List, NamedTuple, Optional
+
+import discord
+from discord.http import Route
+
+# Every object in the fake world gets an ID from here; recent snowflakes so
+# created_at lands near "now" and accounts look new
+_ids = itertools.count(discord.utils.time_snowflake(discord.utils.utcnow()))
+
+ADMINISTRATOR = str(discord.Permissions.all().value)
+
+
+def next_id() -> int:
+    return next(_ids)
+
+
+class RestCall(NamedTuple):
+    at: float
+    method: str
+    path: str
+    params: Dict[str, str]
+    duration: float
+
+
+class FakeResponse:
+    """Just enough of aiohttp.ClientResponse for discord.HTTPException"""
+
+    def __init__(self, status: int, reason: str):
+        self.status = status
+        self.reason = reason
+        self.headers = {}
+
+
+def _route_pattern(path: str) -> re.Pattern:
+    return re.compile("^" + re.sub(r"\{(\w+)\}", r"(?P<\1>[^/]+)", re.escape(path).replace(r"\{", "{").replace(r"\}", "}")) + "$")
+
+
+class FakeDiscord:
+    """Stands in for Discord's REST API and echoes the gateway events it implies.
+
+    ``install`` swaps ``request`` on the bot's HTTPClient, so every REST call
+    discord.py makes is recorded in ``calls`` and answered from an in-memory
+    world of one guild. Calls that change state (role and channel creation,
+    overwrites, member roles, kicks) are echoed back through the connection
+    state's parsers, the way the gateway would. ``latency`` adds a simulated
+    round trip to every call.
+    """
+
+    def __init__(self, state, latency: float = 0.0):
+        self.state = state
+        self.latency = latency
+        self.calls: List[RestCall] = []
+        self.guild: Dict[str, Any] = {}
+        self.members: Dict[int, dict] = {}
+        self.messages: Dict[int, deque] = {}
+        self._patterns: Dict[str, re.Pattern] = {}
+        self._handlers = {
+            ("POST", "/channels/{channel_id}/messages"): self._send_message,
+            ("PATCH", "/channels/{channel_id}/messages/{message_id}"): self._edit_message,
+            ("DELETE", "/channels/{channel_id}/messages/{message_id}"): self._delete_message,
+            ("POST", "/channels/{channel_id}/messages/bulk-delete"): self._bulk_delete,
+            ("GET", "/channels/{channel_id}/messages"): self._history,
+            ("PUT", "/channels/{channel_id}/permissions/{target}"): self._set_overwrite,
+            ("DELETE", "/channels/{channel_id}/permissions/{target}"): self._delete_overwrite,
+            ("POST", "/users/@me/channels"): self._create_dm,
+            ("POST", "/guilds/{guild_id}/roles"): self._create_role,
+            ("POST", "/guilds/{guild_id}/channels"): self._create_channel,
+            ("PATCH", "/guilds/{guild_id}"): self._edit_guild,
+            ("GET", "/guilds/{guild_id}/members/{user_id}"): self._get_member,
+            ("PATCH", "/guilds/{guild_id}/members/{user_id}"): self._edit_member,
+            ("PUT", "/guilds/{guild_id}/members/{user_id}/roles/{role_id}"): self._add_role,
+            ("DELETE", "/guilds/{guild_id}/members/{user_id}/roles/{role_id}"): self._remove_role,
+            ("DELETE", "/guilds/{guild_id}/members/{user_id}"): self._remove_member,
+            ("PUT", "/guilds/{guild_id}/bans/{user_id}"): self._remove_member,
+            ("POST", "/guilds/{guild_id}/bulk-ban"): self._bulk_ban,
+        }
+
+    def install(self, http: discord.http.HTTPClient):
+        http.request = self.request
+
+    # Payload builders
+
+    @staticmethod
+    def user(user_id: int, name: Optional[str] = None, bot: bool = False) -> dict:
+        return {"id": str(user_id), "username": name or f"user{user_id}", "discriminator": "0",
+                "global_name": None, "avatar": None, "bot": bot}
+
+    def member(self, user_id: int, name: Optional[str] = None, roles=(), bot: bool = False) -> dict:
+        return {"user": self.user(user_id, name, bot), "roles": [str(role) for role in roles], "nick": None,
+                "joined_at": discord.utils.utcnow().isoformat(), "deaf": False, "mute": False, "flags": 0,
+                "communication_disabled_until": None}
+
+    @staticmethod
+    def role(role_id: int, name: str, position: int, permissions: str = "0") -> dict:
+        return {"id": str(role_id), "name": name, "permissions": permissions, "position": position,
+                "color": 0, "hoist": False, "managed": False, "mentionable": False, "flags": 0}
+
+    def channel(self, channel_id: int, name: str, position: int = 0, overwrites=()) -> dict:
+        return {"id": str(channel_id), "type": 0, "name": name, "position": position,
+                "guild_id": self.guild.get("id"), "permission_overwrites": list(overwrites), "nsfw": False}
+
+    def message(self, channel_id: int, author: dict, content: str, member: Optional[dict] = None,
+                mentions=(), message_id: Optional[int] = None, **extra) -> dict:
+        payload = {
+            "id": str(message_id or next_id()), "channel_id": str(channel_id), "author": author,
+            "content": content, "timestamp": discord.utils.utcnow().isoformat(), "edited_timestamp": None,
+            "tts": False, "mention_everyone": False, "mentions": list(mentions), "mention_roles": [],
+            "attachments": [], "embeds": [], "pinned": False, "type": 0, **extra,
+        }
+        if member is not None and self.guild:
+            payload["guild_id"] = self.guild["id"]
+            payload["member"] = {k: v for k, v in member.items() if k != "user"}
+        return payload
+
+    def build_guild(self, name: str, owner_id: int, roles: List[dict], channels: List[dict], members: List[dict]) -> dict:
+        guild_id = next_id()
+        # Regular members can chat but not moderate or manage the server
+        permissions = discord.Permissions(view_channel=True, send_messages=True, read_message_history=True,
+                                          embed_links=True, attach_files=True, add_reactions=True,
+                                          external_emojis=True, use_application_commands=True)
+        everyone = self.role(guild_id, "@everyone", 0, str(permissions.value))
+        self.guild = {
+            "id": str(guild_id), "name": name, "owner_id": str(owner_id), "member_count": len(members),
+            "roles": [everyone, *roles], "channels": [], "members": members, "presences": [],
+            "large": False, "emojis": [], "stickers": [], "features": [], "threads": [], "voice_states": [],
+            "stage_instances": [], "guild_scheduled_events": [], "verification_level": 0,
+            "default_message_notifications": 0, "explicit_content_filter": 0, "mfa_level": 0,
+            "premium_tier": 0, "nsfw_level": 0, "preferred_locale": "en-US", "system_channel_flags": 0,
+        }
+        for channel in channels:
+            channel["guild_id"] = self.guild["id"]
+            self.guild["channels"].append(channel)
+        for member in members:
+            self.members[int(member["user"]["id"])] = member
+        return self.guild
+
+    def remember(self, payload: dict):
+        """Keep a message so channel history can return it later"""
+        store = self.messages.setdefault(int(payload["channel_id"]), deque(maxlen=50_000))
+        store.append(payload)
+
+    # Transport
+
+    def _params(self, route: Route) -> Dict[str, str]:
+        pattern = self._patterns.get(route.path)
+        if pattern is None:
+            pattern = self._patterns[route.path] = _route_pattern(route.path)
+        match = pattern.match(route.url[len(Route.BASE):])
+        return match.groupdict() if match else {}
+
+    async def request(self, route: Route, *, files=None, form=None, **kwargs) -> Any:
+        start = time.perf_counter()
+        params = self._params(route)
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        handler = self._handlers.get((route.method, route.path))
+        try:
+            return handler(params, kwargs) if handler else None
+        finally:
+            self.calls.append(RestCall(start, route.method, route.path, params, time.perf_counter() - start))
+
+    def _echo(self, event: str, data: dict):
+        self.state.parsers[event](data)
+
+    def _find_channel(self, channel_id) -> Optional[dict]:
+        return next((c for c in self.guild.get("channels", []) if c["id"] == str(channel_id)), None)
+
+    # Handlers
+
+    def _send_message(self, params, kwargs):
+        body = kwargs.get("json") or {}
+        me = self.state.user
+        payload = self.message(int(params["channel_id"]), self.user(me.id, me.name, bot=True), body.get("content") or "",
+                               embeds=body.get("embeds") or [])
+        if self._find_channel(params["channel_id"]):
+            payload["guild_id"] = self.guild["id"]
+        self.remember(payload)
+        return payload
+
+    def _edit_message(self, params, kwargs):
+        body = kwargs.get("json") or {}
+        me = self.state.user
+        payload = self.message(int(params["channel_id"]), self.user(me.id, me.name, bot=True), body.get("content") or "",
+                               message_id=int(params["message_id"]), embeds=body.get("embeds") or [])
+        if self._find_channel(params["channel_id"]):
+            payload["guild_id"] = self.guild["id"]
+        return payload
+
+    def _delete_message(self, params, kwargs):
+        store = self.messages.get(int(params["channel_id"]))
+        if store:
+            self.messages[int(params["channel_id"])] = deque(
+                (m for m in store if m["id"] != params["message_id"]), maxlen=store.maxlen)
+
+    def _bulk_delete(self, params, kwargs):
+        doomed = set(kwargs["json"]["messages"])
+        store = self.messages.get(int(params["channel_id"]))
+        if store:
+            self.messages[int(params["channel_id"])] = deque(
+                (m for m in store if m["id"] not in doomed), maxlen=store.maxlen)
+
+    def _history(self, params, kwargs):
+        query = kwargs.get("params") or {}
+        before = int(query.get("before") or 1 << 63)
+        limit = int(query.get("limit") or 50)
+        page = []
+        for payload in reversed(self.messages.get(int(params["channel_id"]), ())):
+            if int(payload["id"]) < before:
+                page.append(payload)
+                if len(page) == limit:
+                    break
+        return page
+
+    def _set_overwrite(self, params, kwargs):
+        channel = self._find_channel(params["channel_id"])
+        if channel is None:
+            return
+        body = kwargs.get("json") or {}
+        overwrites = [o for o in channel["permission_overwrites"] if o["id"] != params["target"]]
+        overwrites.append({"id": params["target"], "type": body.get("type", 0),
+                           "allow": str(body.get("allow", 0)), "deny": str(body.get("deny", 0))})
+        channel["permission_overwrites"] = overwrites
+        self._echo("CHANNEL_UPDATE", channel)
+
+    def _delete_overwrite(self, params, kwargs):
+        channel = self._find_channel(params["channel_id"])
+        if channel is None:
+            return
+        channel["permission_overwrites"] = [o for o in channel["permission_overwrites"] if o["id"] != params["target"]]
+        self._echo("CHANNEL_UPDATE", channel)
+
+    def _create_dm(self, params, kwargs):
+        recipient = kwargs["json"]["recipient_id"]
+        return {"id": str(next_id()), "type": 1, "recipients": [self.user(int(recipient))], "last_message_id": None}
+
+    def _create_role(self, params, kwargs):
+        body = kwargs.get("json") or {}
+        role = self.role(next_id(), body.get("name", "new role"), 1, str(body.get("permissions", 0)))
+        self.guild["roles"].append(role)
+        self._echo("GUILD_ROLE_CREATE", {"guild_id": self.guild["id"], "role": role})
+        return role
+
+    def _create_channel(self, params, kwargs):
+        body = kwargs.get("json") or {}
+        channel = self.channel(next_id(), body.get("name", "channel"), len(self.guild["channels"]), [
+            {"id": str(o["id"]), "type": o.get("type", 0), "allow": str(o.get("allow", 0)), "deny": str(o.get("deny", 0))}
+            for o in body.get("permission_overwrites", [])
+        ])
+        self.guild["channels"].append(channel)
+        self._echo("CHANNEL_CREATE", channel)
+        return channel
+
+    def _edit_guild(self, params, kwargs):
+        self.guild.update(kwargs.get("json") or {})
+        self._echo("GUILD_UPDATE", self.guild)
+        return self.guild
+
+    def _get_member(self, params, kwargs):
+        member = self.members.get(int(params["user_id"]))
+        if member is None:
+            raise discord.NotFound(FakeResponse(404, "Not Found"), {"code": 10007, "message": "Unknown Member"})
+        return member
+
+    def _edit_member(self, params, kwargs):
+        member = self._get_member(params, kwargs)
+        body = kwargs.get("json") or {}
+        member.update({k: v for k, v in body.items() if k in ("nick", "roles", "communication_disabled_until")})
+        return member
+
+    def _add_role(self, params, kwargs):
+        member = self._get_member(params, kwargs)
+        if params["role_id"] not in member["roles"]:
+            member["roles"].append(params["role_id"])
+        self._echo("GUILD_MEMBER_UPDATE", {**member, "guild_id": self.guild["id"]})
+
+    def _remove_role(self, params, kwargs):
+        member = self._get_member(params, kwargs)
+        member["roles"] = [role for role in member["roles"] if role != params["role_id"]]
+        self._echo("GUILD_MEMBER_UPDATE", {**member, "guild_id": self.guild["id"]})
+
+    def _remove_member(self, params, kwargs):
+        member = self.members.pop(int(params["user_id"]), None)
+        if member is not None:
+            self._echo("GUILD_MEMBER_REMOVE", {"guild_id": self.guild["id"], "user": member["user"]})
+
+    def _bulk_ban(self, params, kwargs):
+        user_ids = (kwargs.get("json") or {}).get("user_ids", [])
+        for user_id in user_ids:
+            self._remove_member({"user_id": user_id}, kwargs)
+        return {"banned_users": [str(user_id) for user_id in user_ids], "failed_users": []}
@@ -0,0 +1,180 @@
+import asyncio
+import importlib
+import logging
+import os
+import sys
+import tempfile
+import time
+import traceback
+import tracemalloc
+from collections import Counter
+from typing import Iterable, List, Optional
+
+import discord
+
+from .fake import ADMINISTRATOR, FakeDiscord, next_id
+from .scenarios import Event
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+class ScenarioReport:
+    def __init__(self, name: str):
+        self.name = name
+        self.samples = {}
+        self.duration = 0.0
+        self.rest_calls: Counter = Counter()
+        self.errors: List[str] = []
+        self.allocated_blocks = 0
+        self.peak_bytes: Optional[int] = None
+
+    @property
+    def events(self) -> int:
+        return sum(len(samples) for samples in self.samples.values())
+
+    def add(self, event: str, latency: float):
+        self.samples.setdefault(event, []).append(latency)
+
+    def format(self) -> str:
+        lines = [f"== {self.name}: {self.events} events in {self.duration:.2f}s "
+                 f"({self.events / self.duration if self.duration else 0:,.0f} events/s)"]
+        lines.append(f"   {'event':<22} {'count':>7} {'p50 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+        for event, samples in sorted(self.samples.items()):
+            lines.append(f"   {event:<22} {len(samples):>7} {percentile(samples, 50) * 1e3:>9.3f} "
+                         f"{percentile(samples, 99) * 1e3:>9.3f} {max(samples) * 1e3:>9.3f}")
+        allocations = f"   allocations: {self.allocated_blocks:+,} live blocks ({self.allocated_blocks / max(self.events, 1):+.1f}/event)"
+        if self.peak_bytes is not None:
+            allocations += f", traced peak {self.peak_bytes / 2**20:.1f} MiB"
+        lines.append(allocations)
+        lines.append(f"   REST calls: {sum(self.rest_calls.values())}")
+        for (method, path), count in self.rest_calls.most_common():
+            lines.append(f"     {count:>7}  {method:<6} {path}")
+        if self.errors:
+            lines.append(f"   errors: {len(self.errors)}, first one:")
+            lines.append("     " + self.errors[0].strip().replace("\n", "\n     "))
+        return "\n".join(lines)
+
+
+class _ErrorCounter(logging.Handler):
+    def __init__(self, errors: List[str]):
+        super().__init__(logging.ERROR)
+        self.errors = errors
+
+    def emit(self, record):
+        self.errors.append(record.getMessage())
+
+
+class Harness:
+    """Runs the real bot module against :class:`FakeDiscord`, no network needed.
+
+    ``bot.py`` is imported inside a scratch directory so its database and log
+    files stay out of the tree. Events are pushed through discord.py's own
+    gateway parsers, so ``on_message``, the commands and every cog listener
+    run exactly as they would live. An event's latency covers parsing plus
+    every handler task it dispatched; background work it only queued (mod-log
+    delivery, raid responses) is not included.
+    """
+
+    def __init__(self, users: int = 200, latency: float = 0.0, workdir: Optional[str] = None):
+        self.user_count = users
+        self.latency = latency
+        self._tempdir = None if workdir else tempfile.TemporaryDirectory(prefix="modbot-harness-")
+        self.workdir = workdir or self._tempdir.name
+        self._cwd = os.getcwd()
+        self._pending: List[asyncio.Task] = []
+        self._errors: List[str] = []
+
+    async def start(self):
+        os.chdir(self.workdir)
+        if REPO_ROOT not in sys.path:
+            sys.path.insert(0, REPO_ROOT)
+        self.module = importlib.import_module("bot")
+        bot = self.bot = self.module.bot
+        await bot._async_setup_hook()
+
+        self.fake = FakeDiscord(bot._connection, latency=self.latency)
+        self.fake.install(bot.http)
+        me = next_id()
+        bot._connection.user = discord.ClientUser(state=bot._connection, data=self.fake.user(me, "ModBot", bot=True))
+
+        admin_role, bot_role = next_id(), next_id()
+        self.moderator = self.fake.member(next_id(), "moderator", roles=[admin_role])
+        self.users = [self.fake.member(next_id()) for _ in range(self.user_count)]
+        self.general_id = next_id()
+        guild = self.fake.build_guild(
+            "Harness Guild",
+            owner_id=int(self.moderator["user"]["id"]),
+            roles=[self.fake.role(admin_role, "Admin", 10, ADMINISTRATOR),
+                   self.fake.role(bot_role, "ModBot", 20, ADMINISTRATOR)],
+            channels=[self.fake.channel(self.general_id, "general")],
+            members=[self.fake.member(me, "ModBot", roles=[bot_role], bot=True), self.moderator, *self.users],
+        )
+        bot._connection._add_guild_from_data(guild)
+
+        original_schedule = bot._schedule_event
+
+        def schedule_event(*args, **kwargs):
+            task = original_schedule(*args, **kwargs)
+            self._pending.append(task)
+            return task
+
+        bot._schedule_event = schedule_event
+
+        async def on_error(event, *args, **kwargs):
+            self._errors.append(traceback.format_exc())
+
+        bot.on_error = on_error
+        bot.logger.addHandler(_ErrorCounter(self._errors))
+
+        await bot.setup_hook()
+        bot._ready.set()
+        return self
+
+    async def close(self):
+        await self.bot.close()
+        os.chdir(self._cwd)
+        if self._tempdir is not None:
+            self._tempdir.cleanup()
+
+    async def feed(self, event: str, payload: dict) -> float:
+        """Push one gateway event through the bot; return its latency in seconds"""
+        if event == "MESSAGE_CREATE":
+            self.fake.remember(payload)
+        start = time.perf_counter()
+        self.bot._connection.parsers[event](payload)
+        while self._pending:
+            tasks, self._pending = self._pending, []
+            await asyncio.gather(*tasks, return_exceptions=True)
+        return time.perf_counter() - start
+
+    async def run(self, name: str, stream: Iterable[Event], settle: float = 1.5,
+                  trace_allocations: bool = False) -> ScenarioReport:
+        """Feed a whole stream, then wait ``settle`` seconds for background work"""
+        report = ScenarioReport(name)
+        events = list(stream)
+        self.fake.calls.clear()
+        self._errors.clear()
+
+        if trace_allocations:
+            tracemalloc.start()
+        blocks = sys.getallocatedblocks()
+        start = time.perf_counter()
+        for event, payload in events:
+            report.add(event, await self.feed(event, payload))
+        report.duration = time.perf_counter() - start
+        report.allocated_blocks = sys.getallocatedblocks() - blocks
+        if trace_allocations:
+            report.peak_bytes = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+        await asyncio.sleep(settle)
+        report.rest_calls = Counter((call.method, call.path) for call in self.fake.calls)
+        report.errors = list(self._errors)
+        return report
@@ -0,0 +1,92 @@
+"""Synthetic gateway event streams.
+
+Each scenario is a generator of ``(event_name, payload)`` pairs built against
+the harness world, so the IDs line up with the cached guild, channels and
+members.
+"""
+import json
+import random
+from typing import Iterator, Tuple
+
+from .fake import next_id
+
+Event = Tuple[str, dict]
+
+
+def message_flood(harness, events: int = 2000, senders: int = 50) -> Iterator[Event]:
+    """Many users chatting fast in one channel; a few cross the spam limit"""
+    rng = random.Random(1)
+    users = harness.users[:senders]
+    for n in range(events):
+        member = rng.choice(users)
+        yield "MESSAGE_CREATE", harness.fake.message(
+            harness.general_id, member["user"], f"message {n} from {member['user']['username']}", member=member
+        )
+
+
+def join_raid(harness, events: int = 2000) -> Iterator[Event]:
+    """A burst of freshly created accounts with near-identical names joining"""
+    for n in range(events):
+        member = harness.fake.member(next_id(), f"raider_{n % 7}{n}")
+        harness.fake.members[int(member["user"]["id"])] = member
+        yield "GUILD_MEMBER_ADD", {**member, "guild_id": harness.fake.guild["id"]}
+
+
+def command_burst(harness, events: int = 500) -> Iterator[Event]:
+    """A moderator firing warn, mute and info commands at regular members"""
+    rng = random.Random(2)
+    moderator = harness.moderator
+    templates = ["!warn {mention} spamming", "!mute {mention} 10m cool off", "!warnings {mention}",
+                 "!userinfo {mention}", "!serverinfo"]
+    for n in range(events):
+        target = rng.choice(harness.users)
+        mention = dict(target["user"], member={k: v for k, v in target.items() if k != "user"})
+        content = templates[n % len(templates)].format(mention=f"<@{target['user']['id']}>")
+        yield "MESSAGE_CREATE", harness.fake.message(
+            harness.general_id, moderator["user"], content, member=moderator, mentions=[mention]
+        )
+
+
+def copypasta_flood(harness, events: int = 2000, senders: int = 100) -> Iterator[Event]:
+    """Regular chat with many accounts pasting lightly varied copies of one message"""
+    rng = random.Random(3)
+    moderator = harness.moderator
+    # Copypasta detection is opt-in per guild
+    yield "MESSAGE_CREATE", harness.fake.message(
+        harness.general_id, moderator["user"], "!config set copypasta.enabled true", member=moderator
+    )
+    pasta = "copy and paste this message in every channel or your account will be deleted"
+    for n in range(events):
+        member = rng.choice(harness.users[:senders])
+        if n % 3:
+            content = f"message {n} from {member['user']['username']}"
+        else:
+            content = pasta.replace("every", rng.choice(["every", "EVERY", "evеry"])) + " " + "!" * rng.randint(0, 3)
+        yield "MESSAGE_CREATE", harness.fake.message(harness.general_id, member["user"], content, member=member)
+
+
+def raid_cleanup(harness, events: int = 500) -> Iterator[Event]:
+    """A join raid, then a moderator banning every raider with one command"""
+    yield from join_raid(harness, events)
+    moderator = harness.moderator
+    yield "MESSAGE_CREATE", harness.fake.message(
+        harness.general_id, moderator["user"], "!massban joined:10m name:raider -- raid cleanup", member=moderator
+    )
+
+
+def replay(harness, path: str) -> Iterator[Event]:
+    """Events recorded as JSON lines of ``{"t": EVENT_NAME, "d": payload}``"""
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                event = json.loads(line)
+                yield event["t"], event["d"]
+
+
+SCENARIOS = {
+    "flood": message_flood,
+    "raid": join_raid,
+    "commands": command_burst,
+    "copypasta": copypasta_flood,
+    "cleanup": raid_cleanup,
+}
@@ -0,0 +1,88 @@
+import asyncio
+from collections import Counter
+
+import pytest
+
+from harness.fake import next_id
+from harness.runner import Harness
+
+
+@pytest.fixture(scope="module")
+def harness():
+    loop = asyncio.new_event_loop()
+    harness = loop.run_until_complete(Harness(users=5).start())
+    harness.loop = loop
+    yield harness
+    loop.run_until_complete(harness.close())
+    loop.close()
+
+
+def send(harness, member, content):
+    """Run one command as ``member``; return what the bot replied"""
+    payload = harness.fake.message(harness.general_id, member["user"], content, member=member)
+    harness.fake.calls.clear()
+    harness.loop.run_until_complete(harness.feed("MESSAGE_CREATE", payload))
+    return [call for call in harness.fake.calls if call.method == "POST" and call.path.endswith("/messages")]
+
+
+def settings(harness):
+    return harness.loop.run_until_complete(harness.bot.settings.get(int(harness.fake.guild["id"])))
+
+
+def test_config_set_needs_manage_server(harness):
+    send(harness, harness.users[0], "!config set spam.limit 100")
+    send(harness, harness.users[0], "!config reset spam.limit")
+    assert settings(harness)["spam"]["limit"] == 5
+
+    send(harness, harness.moderator, "!config set spam.limit 8")
+    assert settings(harness)["spam"]["limit"] == 8
+    send(harness, harness.users[0], "!config reset")
+    assert settings(harness)["spam"]["limit"] == 8
+
+
+def test_config_ladder_needs_manage_server(harness):
+    send(harness, harness.users[0], "!config ladder 1 ban")
+    assert "ladder" not in settings(harness).overrides
+
+
+def test_set_filter_needs_manage_messages(harness):
+    send(harness, harness.users[0], "!set_filter add hello")
+    assert not settings(harness).filter
+    replies = send(harness, harness.moderator, "!set_filter add hello")
+    assert replies and settings(harness).filter
+
+    send(harness, harness.users[0], "!set_filter clear")
+    assert settings(harness).filter
+    send(harness, harness.moderator, "!set_filter clear")
+
+
+def test_raid_lock_runs_once_per_raid(harness):
+    guild_id = harness.fake.guild["id"]
+    send(harness, harness.moderator, "!raid_protect on")
+    send(harness, harness.moderator, "!raid_protect action lock")
+    harness.fake.latency = 0.02
+    try:
+        harness.fake.calls.clear()
+        for n in range(40):
+            member = harness.fake.member(next_id(), f"raider{n}")
+            harness.fake.members[int(member["user"]["id"])] = member
+            harness.loop.run_until_complete(harness.feed("GUILD_MEMBER_ADD", {**member, "guild_id": guild_id}))
+        harness.loop.run_until_complete(asyncio.sleep(1.5))
+        calls = Counter((call.method, call.path) for call in harness.fake.calls)
+    finally:
+        harness.fake.latency = 0.0
+        send(harness, harness.moderator, "!raid_protect end")
+        send(harness, harness.moderator, "!raid_protect off")
+
+    muted = [role for role in harness.bot.get_guild(int(guild_id)).roles if role.name == "Muted"]
+    assert len(muted) == 1
+    assert calls[("POST", "/guilds/{guild_id}/roles")] == 1
+    assert calls[("PATCH", "/guilds/{guild_id}")] == 1
+    assert calls[("PUT", "/guilds/{guild_id}/members/{user_id}/roles/{role_id}")] >= 35
+
+
+def test_massban_rejects_too_many_ids_before_fetching(harness):
+    ids = " ".join(str(next_id()) for _ in range(1001))
+    send(harness, harness.moderator, f"!massban {ids} -- too many")
+    assert not [call for call in harness.fake.calls if call.method == "GET"]
+    assert not [call for call in harness.fake.calls if "ban" in call.path]
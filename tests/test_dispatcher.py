@@ -0,0 +1,65 @@
+import asyncio
+
+from utils.dispatcher import ActionDispatcher
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_warn_timeout_after_spam_timeout_is_sent():
+    calls = []
+
+    async def timeout(minutes):
+        calls.append(minutes)
+        return minutes
+
+    async def scenario():
+        dispatcher = ActionDispatcher()
+        # on_message spam stage, then !warn reaching a 24h ladder step a few seconds later
+        spam = dispatcher.submit("timeout", 1, 2, lambda: timeout(10), tag="spam", cooldown=30)
+        assert await spam == 10
+        warn = await dispatcher.submit("timeout", 1, 2, lambda: timeout(24 * 60), tag=555)
+        dispatcher.stop()
+        return warn
+
+    assert run(scenario()) == 24 * 60
+    assert calls == [10, 24 * 60]
+
+
+def test_repeat_spam_timeout_is_coalesced():
+    calls = []
+
+    async def timeout():
+        calls.append(1)
+
+    async def scenario():
+        dispatcher = ActionDispatcher()
+        await dispatcher.submit("timeout", 1, 2, timeout, tag="spam", cooldown=30)
+        await dispatcher.submit("timeout", 1, 2, timeout, tag="spam", cooldown=30)
+        saved = dispatcher.stats()["saved_by_reason"]
+        dispatcher.stop()
+        return saved
+
+    assert run(scenario()) == {"cooldown": 1}
+    assert calls == [1]
+
+
+def test_bulk_ban_does_not_cancel_guild_wide_notice():
+    sent = []
+
+    async def notice():
+        sent.append("notice")
+
+    async def bulk_ban():
+        sent.append("ban")
+
+    async def scenario():
+        dispatcher = ActionDispatcher(workers=1)
+        pending = dispatcher.submit("notice", 1, 0, notice, tag=("copypasta", 3))
+        await dispatcher.submit("ban", 1, 0, bulk_ban, tag=(9, 0))
+        await pending
+        dispatcher.stop()
+
+    run(scenario())
+    assert sorted(sent) == ["ban", "notice"]
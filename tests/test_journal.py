@@ -0,0 +1,33 @@
+import asyncio
+import sqlite3
+
+from utils.journal import ActionJournal
+
+
+def test_failed_flush_keeps_entries_in_order(tmp_path):
+    async def main():
+        journal = ActionJournal(str(tmp_path / "journal.db"), flush_interval=0.01)
+        run = journal.run
+        failures = 0
+
+        async def flaky(fn, *args):
+            nonlocal failures
+            if not failures:
+                failures += 1
+                raise sqlite3.OperationalError("database is locked")
+            return await run(fn, *args)
+
+        journal.run = flaky
+        journal.start()
+        journal.record(1, "Warning", 3, 2, "first", created_at=1.0)
+        await asyncio.sleep(0.05)
+        assert failures == 1
+        journal.record(1, "Ban", 3, 2, "second", created_at=2.0)
+        await asyncio.sleep(0.05)
+        assert not journal._queue
+        entries, _ = await journal.query(1)
+        await journal.stop()
+        return entries
+
+    entries = asyncio.run(main())
+    assert [entry.reason for entry in entries] == ["second", "first"]
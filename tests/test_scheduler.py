@@ -0,0 +1,74 @@
+import asyncio
+import sqlite3
+
+from utils.scheduler import Scheduler
+
+
+def pending_rows(path):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute("SELECT COUNT(*) FROM scheduled_jobs").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_jobs_survive_a_restart(tmp_path):
+    path = str(tmp_path / "scheduler.db")
+
+    async def before_restart():
+        scheduler = Scheduler(path)
+        await scheduler.start()
+        await scheduler.schedule("unmute", 1, 2, 0.2, role_id=3)
+        scheduler.stop()
+
+    async def after_restart():
+        fired = []
+
+        async def unmute(job):
+            fired.append(job)
+
+        scheduler = Scheduler(path)
+        scheduler.register("unmute", unmute)
+        await scheduler.start()
+        assert scheduler.pending("unmute", 1, 2) is not None
+        await asyncio.sleep(0.4)
+        scheduler.stop()
+        return fired
+
+    asyncio.run(before_restart())
+    fired = asyncio.run(after_restart())
+    assert [(job.action, job.guild_id, job.user_id, job.payload) for job in fired] == [("unmute", 1, 2, {"role_id": 3})]
+    assert pending_rows(path) == 0
+
+
+def test_failed_delete_is_retried(tmp_path):
+    path = str(tmp_path / "scheduler.db")
+
+    async def main():
+        fired = []
+
+        async def unmute(job):
+            fired.append(job)
+
+        scheduler = Scheduler(path, retry_interval=0.05)
+        scheduler.register("unmute", unmute)
+        run = scheduler.run
+        failures = 0
+
+        async def flaky(fn, *args):
+            nonlocal failures
+            if fired and not failures:
+                failures += 1
+                raise sqlite3.OperationalError("database is locked")
+            return await run(fn, *args)
+
+        scheduler.run = flaky
+        await scheduler.start()
+        await scheduler.schedule("unmute", 1, 2, 0.05)
+        await asyncio.sleep(0.3)
+        assert failures == 1 and len(fired) == 1
+        assert not scheduler._task.done()
+        scheduler.stop()
+
+    asyncio.run(main())
+    assert pending_rows(path) == 0
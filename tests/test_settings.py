@@ -0,0 +1,45 @@
+import asyncio
+
+import pytest
+
+from utils.settings import GuildSettings, SettingsStore, parse_value
+
+
+def test_invalid_overrides_fall_back_to_defaults():
+    settings = GuildSettings(1, {
+        "spam": {"limit": "5", "window": 2.5},
+        "raid": {"action": "nuke", "previous_verification": 2},
+        "copypasta": [],
+    })
+    assert settings["spam"]["limit"] == 5
+    assert settings["spam"]["window"] == 2.5
+    assert settings["raid"]["action"] == "timeout"
+    assert settings["raid"]["previous_verification"] == 2
+    assert "copypasta" not in settings.overrides
+
+
+@pytest.mark.parametrize("key, text", [
+    ("spam.window", "nan"),
+    ("spam.window", "inf"),
+    ("spam.timeout_minutes", "50000"),
+    ("copypasta.timeout_minutes", "40321"),
+])
+def test_parse_value_rejects_non_finite_and_long_timeouts(key, text):
+    with pytest.raises(ValueError):
+        parse_value(key, text)
+
+
+def test_concurrent_writes_keep_both_updates(tmp_path):
+    async def main():
+        store = SettingsStore(str(tmp_path))
+        await asyncio.gather(
+            store.set(1, "spam.limit", 9),
+            store.set_state(1, "raid", "previous_verification", 2),
+            store.set_filter(1, {"scam"}),
+        )
+        return (await SettingsStore(str(tmp_path)).get(1)).overrides
+
+    overrides = asyncio.run(main())
+    assert overrides["spam"] == {"limit": 9}
+    assert overrides["raid"] == {"previous_verification": 2}
+    assert overrides["filter"] == ["scam"]
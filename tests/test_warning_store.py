@@ -0,0 +1,53 @@
+import asyncio
+import sqlite3
+
+from utils.settings import LADDER, GuildSettings
+from utils.warning_store import WarningStore
+
+
+def test_failed_flush_requeues_and_the_writer_keeps_going(tmp_path):
+    async def main():
+        store = WarningStore(str(tmp_path / "warnings.db"), flush_interval=0.01)
+        run = store.run
+        failures = 0
+
+        async def flaky(fn, *args):
+            nonlocal failures
+            if fn.__name__ == "write" and not failures:
+                failures += 1
+                raise sqlite3.OperationalError("disk I/O error")
+            return await run(fn, *args)
+
+        store.run = flaky
+        store.start()
+        await store.add(1, 2, 3, "first")
+        await asyncio.sleep(0.05)
+        assert failures == 1
+        await store.add(1, 2, 3, "second")
+        await asyncio.sleep(0.05)
+        assert not store._queue and not store._unflushed and not store._score_queue
+        await store.stop()
+
+        reopened = WarningStore(str(tmp_path / "warnings.db"))
+        reasons = [record.reason for record in await reopened.get(1, 2)]
+        score = await reopened.score(1, 2, half_life=0)
+        reopened.close()
+        return reasons, score
+
+    reasons, score = asyncio.run(main())
+    assert reasons == ["first", "second"]
+    assert score == 2
+
+
+def test_three_quick_warnings_reach_the_three_point_step(tmp_path):
+    async def main():
+        store = WarningStore(str(tmp_path / "warnings.db"))
+        for _ in range(3):
+            _, score = await store.add(1, 2, 3, "spam", points=1.0, half_life=30 * 86400)
+        await store.stop()
+        return score
+
+    score = asyncio.run(main())
+    settings = GuildSettings(1, {})
+    assert settings.escalation(score) == LADDER[0]
+    assert settings.next_step(score) == LADDER[1]
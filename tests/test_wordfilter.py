@@ -0,0 +1,13 @@
+import pytest
+
+from utils.wordfilter import WordFilter
+
+
+@pytest.mark.parametrize("text", ["I owe you 455 dollars", "my pin is 455", "$55 total", "call 455-1234"])
+def test_plain_numbers_are_not_leetspeak(text):
+    assert WordFilter(["ass"]).search(text) is None
+
+
+@pytest.mark.parametrize("text", ["a55", "@ss", "4ss", "what an ASS", "аss"])
+def test_leetspeak_and_lookalikes_still_match(text):
+    assert WordFilter(["ass"]).search(text) == "ass"
@@ -0,0 +1,42 @@
+"""Shared building blocks used by the bot and its cogs."""
+
+from .concurrency import run_bounded
+from .copypasta import CopypastaDetector, CopypastaVerdict
+from .database import Database, WriteBehindDatabase
+from .dispatcher import ActionDispatcher
+from .journal import ActionJournal, JournalEntry
+from .lockdown import LockdownStore
+from .member_index import MemberIndex
+from .metrics import Metrics
+from .modlog import ModLogPipeline
+from .muted_role import MutedRoleManager
+from .raid import RaidDetector, RaidVerdict
+from .ratelimit import SlidingWindowLimiter
+from .scheduler import ScheduledJob, Scheduler
+from .settings import GuildSettings, SettingsStore
+from .warning_store import WarningRecord, WarningStore
+
+__all__ = [
+    "ActionDispatcher",
+    "ActionJournal",
+    "CopypastaDetector",
+    "CopypastaVerdict",
+    "Database",
+    "GuildSettings",
+    "JournalEntry",
+    "LockdownStore",
+    "MemberIndex",
+    "Metrics",
+    "ModLogPipeline",
+    "MutedRoleManager",
+    "RaidDetector",
+    "RaidVerdict",
+    "ScheduledJob",
+    "Scheduler",
+    "SettingsStore",
+    "SlidingWindowLimiter",
+    "WarningRecord",
+    "WarningStore",
+    "WriteBehindDatabase",
+    "run_bounded",
+]
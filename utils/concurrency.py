@@ -0,0 +1,34 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Iterable, List, Optional, Sized, Tuple
+
+
+async def run_bounded(items: Iterable[Any], func: Callable[[Any], Awaitable[Any]], limit: int = 5,
+                      progress: Optional[Callable[[int, Optional[int]], None]] = None) -> List[Tuple[Any, BaseException]]:
+    """Await ``func(item)`` for every item with at most ``limit`` in flight.
+
+    A fixed pool of workers pulls from one shared iterator and ``items`` is
+    never copied, so a generator is consumed lazily and memory stays flat
+    however many items it yields. discord.py already queues requests per
+    rate-limit bucket; the pool keeps a big fan-out from draining the global
+    budget. ``progress(done, total)`` is called after each item, with a None
+    total when ``items`` has no length. Returns the (item, exception) pairs
+    that failed instead of raising.
+    """
+    total = len(items) if isinstance(items, Sized) else None
+    iterator = iter(items)
+    failures = []
+    done = 0
+
+    async def worker():
+        nonlocal done
+        for item in iterator:
+            try:
+                await func(item)
+            except Exception as e:
+                failures.append((item, e))
+            done += 1
+            if progress is not None:
+                progress(done, total)
+
+    await asyncio.gather(*(worker() for _ in range(limit if total is None else min(limit, total))))
+    return failures
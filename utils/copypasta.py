@@ -0,0 +1,203 @@
+import time
+from array import array
+from collections import OrderedDict, deque
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from .wordfilter import normalize
+
+MAX_CHARS = 400
+# One-permutation MinHash: shingle hashes are split into BINS by their low bits
+# and the smallest hash of each bin is kept; bands of ROWS bins are LSH keys
+BINS = 16
+ROWS = 4
+EMPTY = -1
+_BIN_MASK = BINS - 1
+_HASH_MASK = (1 << 62) - 1
+
+
+class Fingerprint(NamedTuple):
+    exact: int
+    sketch: array
+    keys: Tuple[int, ...]
+
+
+def fingerprint(text: str, min_length: int = 20) -> Optional[Fingerprint]:
+    """Exact hash, MinHash sketch and LSH band keys of a message's folded text.
+
+    Shingles are the words and word pairs, hashed in C with no Python-level
+    loop per character. Messages shorter than ``min_length`` after folding
+    get no fingerprint: "lol" from ten people is a conversation, not a raid.
+    """
+    text = normalize(text[:MAX_CHARS])
+    if len(text) < min_length:
+        return None
+    words = text.split()
+    shingles = {*map(hash, words), *map(hash, zip(words, words[1:]))}
+    # Filling the bins largest hash first leaves each one holding its smallest
+    ordered = sorted(map(_HASH_MASK.__and__, shingles), reverse=True)
+    smallest = dict(zip(map(_BIN_MASK.__and__, ordered), ordered))
+    sketch = array("q", [smallest.get(b, EMPTY) for b in range(BINS)])
+    exact = hash(text)
+    # Partly empty bands come from short messages and would lump them together
+    bands = [hash(band) for band in zip(*[iter(sketch)] * ROWS) if EMPTY not in band]
+    return Fingerprint(exact, sketch, (exact, *bands))
+
+
+def similarity(a: array, b: array) -> float:
+    """Estimated Jaccard similarity of two sketches' shingle sets"""
+    filled = hits = 0
+    for x, y in zip(a, b):
+        if x != EMPTY or y != EMPTY:
+            filled += 1
+            hits += x == y
+    return hits / filled if filled else 0.0
+
+
+class CopypastaVerdict(NamedTuple):
+    started: bool
+    authors: List[int]
+    message_ids: List[int]
+    copies: int
+
+
+class _Entry(NamedTuple):
+    at: float
+    author_id: int
+    message_id: int
+    fingerprint: Fingerprint
+
+
+class _Wave:
+    """A confirmed copypasta still being posted in a channel"""
+
+    __slots__ = ("fingerprint", "authors", "last_seen")
+
+    def __init__(self, fingerprint: Fingerprint, authors: set, now: float):
+        self.fingerprint = fingerprint
+        self.authors = authors
+        self.last_seen = now
+
+
+class ChannelIndex:
+    """A channel's recent fingerprints with the authors behind each band key"""
+
+    __slots__ = ("entries", "buckets", "waves")
+
+    def __init__(self, capacity: int):
+        self.entries: deque = deque(maxlen=capacity)
+        # A list per key is far smaller than a set and is only deduplicated
+        # once it is long enough to matter
+        self.buckets: Dict[int, List[int]] = {}
+        self.waves: List[_Wave] = []
+
+    def _drop(self, entry: _Entry):
+        for key in entry.fingerprint.keys:
+            authors = self.buckets[key]
+            authors.remove(entry.author_id)
+            if not authors:
+                del self.buckets[key]
+
+    def expire(self, cutoff: float):
+        entries = self.entries
+        while entries and entries[0].at <= cutoff:
+            self._drop(entries.popleft())
+        if self.waves:
+            self.waves = [wave for wave in self.waves if wave.last_seen > cutoff]
+
+    def push(self, entry: _Entry):
+        if len(self.entries) == self.entries.maxlen:
+            self._drop(self.entries.popleft())
+        self.entries.append(entry)
+        for key in entry.fingerprint.keys:
+            authors = self.buckets.get(key)
+            if authors is None:
+                self.buckets[key] = [entry.author_id]
+            else:
+                authors.append(entry.author_id)
+
+
+class CopypastaDetector:
+    """Flags the same or nearly the same text posted by many accounts in one channel.
+
+    Each message is folded like the word filter does, then reduced to an exact
+    hash and a 16-bin MinHash sketch over its words and word pairs. The sketch is
+    cut into bands, and every band key counts the distinct authors that
+    posted it within the window, so matching a message is a handful of dict
+    updates no matter how busy the channel is. When a key reaches ``authors``
+    distinct authors the candidates are confirmed by sketch similarity, which
+    weeds out band collisions. A confirmed wave stays active for the window
+    after its last copy, so later copies are caught with one comparison.
+
+    Each channel keeps at most ``capacity`` fingerprints and only the
+    ``max_channels`` most recently active channels are tracked.
+    """
+
+    def __init__(self, capacity: int = 128, max_channels: int = 2000,
+                 min_length: int = 20, threshold: float = 0.6):
+        self.capacity = capacity
+        self.max_channels = max_channels
+        self.min_length = min_length
+        self.threshold = threshold
+        self._channels: "OrderedDict[int, ChannelIndex]" = OrderedDict()
+
+    def __len__(self):
+        return len(self._channels)
+
+    def _index(self, channel_id: int) -> ChannelIndex:
+        index = self._channels.get(channel_id)
+        if index is not None:
+            self._channels.move_to_end(channel_id)
+            return index
+        index = self._channels[channel_id] = ChannelIndex(self.capacity)
+        if len(self._channels) > self.max_channels:
+            self._channels.popitem(last=False)
+        return index
+
+    def _matches(self, a: Fingerprint, b: Fingerprint) -> bool:
+        return a.exact == b.exact or similarity(a.sketch, b.sketch) >= self.threshold
+
+    def check(self, channel_id: int, author_id: int, message_id: int, text: str,
+              authors: int = 4, window: float = 30.0, now: Optional[float] = None) -> Optional[CopypastaVerdict]:
+        """Record a message; return a verdict if it belongs to a copypasta wave.
+
+        ``authors`` lists the accounts to act on that were not flagged for
+        this wave before, and ``message_ids`` their earlier copies still in
+        the window. The message being checked is always part of the wave.
+        """
+        if len(text) < self.min_length:
+            return None
+        fp = fingerprint(text, self.min_length)
+        if fp is None:
+            return None
+        if now is None:
+            now = time.monotonic()
+
+        index = self._index(channel_id)
+        index.expire(now - window)
+        for wave in index.waves:
+            if self._matches(fp, wave.fingerprint):
+                wave.last_seen = now
+                if author_id in wave.authors:
+                    return CopypastaVerdict(False, [], [], 1)
+                wave.authors.add(author_id)
+                return CopypastaVerdict(False, [author_id], [], 1)
+
+        index.push(_Entry(now, author_id, message_id, fp))
+        for key in fp.keys:
+            posted = index.buckets[key]
+            if len(posted) < authors or len(set(posted)) < authors:
+                continue
+            copies = [entry for entry in index.entries if key in entry.fingerprint.keys and self._matches(fp, entry.fingerprint)]
+            flagged = {entry.author_id for entry in copies}
+            if len(flagged) >= authors:
+                index.waves.append(_Wave(fp, flagged, now))
+                return CopypastaVerdict(
+                    True,
+                    sorted(flagged),
+                    [entry.message_id for entry in copies if entry.message_id != message_id],
+                    len(copies),
+                )
+        return None
+
+    def forget(self, channel_id: int):
+        self._channels.pop(channel_id, None)
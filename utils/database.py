@@ -0,0 +1,107 @@
+import asyncio
+import logging
+import sqlite3
+from typing import Any, Callable, List, Optional
+
+log = logging.getLogger('mod_bot')
+
+
+class Database:
+    """Small base for SQLite-backed stores.
+
+    Every query runs on a worker thread through :meth:`run`, serialised by an
+    asyncio lock, so disk I/O never blocks the event loop. Subclasses set
+    ``schema`` to the statements that create their tables.
+    """
+
+    schema = ""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = asyncio.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=5000")
+            if self.schema:
+                conn.executescript(self.schema)
+            self._conn = conn
+        return self._conn
+
+    async def run(self, fn: Callable[..., Any], *args) -> Any:
+        """Run ``fn(connection, *args)`` on a worker thread"""
+        async with self._lock:
+            return await asyncio.to_thread(self._call, fn, *args)
+
+    def _call(self, fn, *args):
+        conn = self._connect()
+        with conn:
+            return fn(conn, *args)
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+class WriteBehindDatabase(Database):
+    """A :class:`Database` whose writes are queued and flushed in batches.
+
+    Subclasses queue rows in ``_queue``, set ``_dirty`` and implement
+    :meth:`flush`, handing each batch to :meth:`_write`. A background task
+    flushes once per ``flush_interval`` after the first queued write, so a
+    burst goes to disk as one transaction. A batch that fails to write goes
+    back to the front of the queue and is retried in the next window.
+    """
+
+    noun = "rows"
+
+    def __init__(self, path: str, flush_interval: float = 1.0):
+        super().__init__(path)
+        self.flush_interval = flush_interval
+        self._queue: List[Any] = []
+        self._dirty = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    async def flush(self):
+        raise NotImplementedError
+
+    async def _write(self, batch: list, fn: Callable[..., Any]):
+        """Run ``fn`` for ``batch``, requeueing the batch if SQLite fails"""
+        try:
+            await self.run(fn)
+        except sqlite3.Error:
+            # Ahead of anything queued meanwhile, so entries stay in order
+            self._queue[:0] = batch
+            self._dirty.set()
+            raise
+
+    async def _flush_forever(self):
+        while True:
+            await self._dirty.wait()
+            # Let a burst pile up so it goes to disk as one batch
+            await asyncio.sleep(self.flush_interval)
+            self._dirty.clear()
+            try:
+                await self.flush()
+            except sqlite3.Error as e:
+                log.warning(f"Could not write {len(self._queue)} queued {self.noun}, retrying: {e}")
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._flush_forever())
+
+    async def stop(self):
+        """Stop the writer, flush what is still queued and close the database"""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        try:
+            await self.flush()
+        except sqlite3.Error as e:
+            log.warning(f"Lost {len(self._queue)} queued {self.noun} on shutdown: {e}")
+        self.close()
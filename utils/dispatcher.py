@@ -0,0 +1,198 @@
+import asyncio
+import itertools
+import logging
+import time
+from collections import Counter
+from typing import Awaitable, Callable, Dict, Hashable, List, Tuple
+
+log = logging.getLogger('mod_bot')
+
+# Lower runs first: punishments before clean-up, clean-up before chatter
+PRIORITIES = {
+    "ban": 0,
+    "kick": 1,
+    "timeout": 2,
+    "role": 3,
+    "delete": 4,
+    "notice": 5,
+    "log": 6,
+    "dm": 7,
+    "presence": 8,
+}
+
+# Pending work for a member that a stronger action makes pointless
+SUPERSEDES = {
+    "ban": ("kick", "timeout", "role", "notice", "dm"),
+    "kick": ("timeout", "role"),
+}
+
+Key = Tuple[str, int, int, Hashable]
+
+# user_id of guild-wide actions (channel notices, bulk bans); never part of superseding
+GUILD_WIDE = 0
+
+
+class _Action:
+    __slots__ = ("kind", "key", "factory", "future", "queued_at", "cancelled")
+
+    def __init__(self, kind: str, key: Key, factory: Callable[[], Awaitable], future: asyncio.Future):
+        self.kind = kind
+        self.key = key
+        self.factory = factory
+        self.future = future
+        self.queued_at = time.monotonic()
+        self.cancelled = False
+
+
+def _consume(future: asyncio.Future):
+    # Failures are logged by the worker; nobody has to await fire-and-forget actions
+    if not future.cancelled():
+        future.exception()
+
+
+class ActionDispatcher:
+    """Single queue for every outbound moderation side effect.
+
+    Actions are keyed on (kind, guild, user, tag) and coalesced: submitting
+    one that is already queued, or that was submitted less than ``cooldown``
+    seconds ago, costs no request and hands back the existing future. A ban or kick
+    also drops the same member's queued timeouts, role changes and notices.
+    A fixed pool of ``workers`` drains the queue in :data:`PRIORITIES` order,
+    so during a burst bans and timeouts go out before notices, logs, DMs and
+    presence updates. Every action saved is counted in ``stats()`` and the
+    ``dispatcher_saved_total`` metric.
+
+    Only identical keys coalesce, so automatic actions tag themselves with
+    their source (``"spam"``, ``"raid"``) and a moderator's timeout tags
+    itself with the command: a different timeout is never swallowed by one
+    that is merely cooling down.
+    """
+
+    def __init__(self, workers: int = 4, metrics=None):
+        self.workers = workers
+        self.metrics = metrics
+        self._queue: asyncio.PriorityQueue = asyncio.PriorityQueue()
+        self._sequence = itertools.count()
+        self._pending: Dict[Key, _Action] = {}
+        self._recent: Dict[Key, Tuple[float, asyncio.Future]] = {}
+        self._tasks: List[asyncio.Task] = []
+        self.executed: Counter = Counter()
+        self.saved: Counter = Counter()
+        self.failed: Counter = Counter()
+
+    def __len__(self):
+        return len(self._pending)
+
+    def _save(self, kind: str, reason: str):
+        self.saved[reason] += 1
+        if self.metrics is not None:
+            self.metrics.inc("dispatcher_saved_total", kind=kind, reason=reason)
+
+    def _prune(self, now: float):
+        if len(self._recent) > 4096:
+            self._recent = {key: entry for key, entry in self._recent.items() if entry[0] > now}
+
+    def submit(self, kind: str, guild_id: int, user_id: int, factory: Callable[[], Awaitable],
+               tag: Hashable = None, cooldown: float = 0.0) -> asyncio.Future:
+        """Queue ``factory()`` unless an equivalent action is pending or cooling down.
+
+        ``factory`` is only called when the action runs, so a coalesced
+        duplicate never even builds its request. The returned future
+        resolves with the call's result; awaiting it is optional.
+        """
+        key = (kind, guild_id, user_id, tag)
+        pending = self._pending.get(key)
+        if pending is not None:
+            self._save(kind, "duplicate")
+            return pending.future
+        now = time.monotonic()
+        recent = self._recent.get(key)
+        if recent is not None and recent[0] > now:
+            self._save(kind, "cooldown")
+            return recent[1]
+        if user_id != GUILD_WIDE:
+            for stronger, weaker in SUPERSEDES.items():
+                if kind in weaker and self._covered(stronger, guild_id, user_id, now):
+                    self._save(kind, "superseded")
+                    future = asyncio.get_running_loop().create_future()
+                    future.set_result(None)
+                    return future
+
+        future = asyncio.get_running_loop().create_future()
+        future.add_done_callback(_consume)
+        action = _Action(kind, key, factory, future)
+        self._pending[key] = action
+        if kind in SUPERSEDES and user_id != GUILD_WIDE:
+            self._cancel_weaker(kind, guild_id, user_id)
+        if cooldown > 0:
+            self._recent[key] = (now + cooldown, future)
+            self._prune(now)
+        self._queue.put_nowait((PRIORITIES[kind], next(self._sequence), action))
+        self.start()
+        return future
+
+    def _covered(self, kind: str, guild_id: int, user_id: int, now: float) -> bool:
+        """True if ``kind`` is queued or cooling down for the member"""
+        key = (kind, guild_id, user_id, None)
+        if key in self._pending:
+            return True
+        recent = self._recent.get(key)
+        return recent is not None and recent[0] > now
+
+    def _cancel_weaker(self, kind: str, guild_id: int, user_id: int):
+        for key, action in list(self._pending.items()):
+            if key[1] == guild_id and key[2] == user_id and key[0] in SUPERSEDES[kind]:
+                action.cancelled = True
+                del self._pending[key]
+                action.future.set_result(None)
+                self._save(key[0], "superseded")
+
+    async def _run(self, action: _Action):
+        try:
+            result = await action.factory()
+        except Exception as e:
+            self.failed[action.kind] += 1
+            log.warning(f"{action.kind} for {action.key[2]} in {action.key[1]} failed: {e}")
+            if not action.future.done():
+                action.future.set_exception(e)
+        else:
+            self.executed[action.kind] += 1
+            if not action.future.done():
+                action.future.set_result(result)
+
+    async def _worker(self):
+        while True:
+            _, _, action = await self._queue.get()
+            if action.cancelled:
+                continue
+            if self._pending.get(action.key) is action:
+                del self._pending[action.key]
+            if self.metrics is not None:
+                self.metrics.observe("dispatch_wait_seconds", time.monotonic() - action.queued_at, kind=action.kind)
+            await self._run(action)
+
+    def depth(self) -> int:
+        return len(self._pending)
+
+    def stats(self) -> dict:
+        return {
+            "queued": self.depth(),
+            "executed": sum(self.executed.values()),
+            "saved": sum(self.saved.values()),
+            "failed": sum(self.failed.values()),
+            "saved_by_reason": dict(self.saved),
+        }
+
+    def start(self):
+        """Start the worker pool on the running loop, if it is not running yet"""
+        if not self._tasks:
+            loop = asyncio.get_running_loop()
+            self._tasks = [loop.create_task(self._worker()) for _ in range(self.workers)]
+
+    def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        self._tasks.clear()
+        for action in self._pending.values():
+            action.future.cancel()
+        self._pending.clear()
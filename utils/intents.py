@@ -0,0 +1,57 @@
+from typing import Dict, FrozenSet, NamedTuple
+
+import discord
+
+# Gateway intents each feature of the bot relies on
+FEATURE_INTENTS: Dict[str, FrozenSet[str]] = {
+    "commands": frozenset({"guilds", "guild_messages", "message_content"}),
+    "automod": frozenset({"guilds", "guild_messages", "message_content"}),
+    "moderation": frozenset({"guilds", "moderation"}),
+    "raid_protection": frozenset({"guilds", "members"}),
+}
+
+
+class IntentProfile(NamedTuple):
+    intents: discord.Intents
+    member_cache_flags: discord.MemberCacheFlags
+    chunk_guilds_at_startup: bool
+
+    def as_options(self) -> dict:
+        """Keyword arguments for ``commands.Bot.__init__``"""
+        return self._asdict()
+
+
+def intents_for(features) -> discord.Intents:
+    """The smallest set of intents covering ``features``"""
+    names = set()
+    for feature in features:
+        names |= FEATURE_INTENTS[feature]
+    return discord.Intents(**dict.fromkeys(names, True))
+
+
+def _full() -> IntentProfile:
+    # What the bot used before profiles: every intent, every member cached up front
+    return IntentProfile(discord.Intents.all(), discord.MemberCacheFlags.all(), True)
+
+
+def _standard() -> IntentProfile:
+    # Every feature, but members are only cached as they join and are never chunked
+    intents = intents_for(FEATURE_INTENTS)
+    return IntentProfile(intents, discord.MemberCacheFlags(joined=True, voice=False), False)
+
+
+def _minimal() -> IntentProfile:
+    # Commands and auto-mod only: no member events, no member cache, raid protection is off
+    intents = intents_for(("commands", "automod", "moderation"))
+    return IntentProfile(intents, discord.MemberCacheFlags.none(), False)
+
+
+PROFILES = {"full": _full, "standard": _standard, "minimal": _minimal}
+
+
+def get_profile(name: str) -> IntentProfile:
+    """Look up an intents profile by name (full, standard or minimal)"""
+    try:
+        return PROFILES[name]()
+    except KeyError:
+        raise ValueError(f"Unknown intents profile {name!r}, expected one of {', '.join(PROFILES)}") from None
@@ -0,0 +1,179 @@
+import re
+import time
+from typing import List, NamedTuple, Optional, Tuple
+
+from .database import WriteBehindDatabase
+from .member_index import parse_duration
+
+_WORD = re.compile(r"\w+")
+
+Cursor = Tuple[float, int]
+
+
+class JournalEntry(NamedTuple):
+    id: int
+    guild_id: int
+    created_at: float
+    action: str
+    moderator_id: int
+    target_id: int
+    reason: str
+
+    @property
+    def cursor(self) -> Cursor:
+        return (self.created_at, self.id)
+
+
+class JournalQuery:
+    """Filters for :meth:`ActionJournal.query`; no options means every entry"""
+
+    def __init__(self, target_id: Optional[int] = None, moderator_id: Optional[int] = None,
+                 action: Optional[str] = None, since: Optional[float] = None, until: Optional[float] = None,
+                 search: Optional[str] = None):
+        self.target_id = target_id
+        self.moderator_id = moderator_id
+        self.action = action
+        self.since = since
+        self.until = until
+        self.search = search
+
+    @classmethod
+    def parse(cls, text: str, now: Optional[float] = None) -> "JournalQuery":
+        """Parse ``user:<@id> mod:<@id> action:<name> since:<ago> until:<ago> search:<words>``
+
+        ``action:`` names with spaces use underscores (``action:mass_ban``)
+        and ``search:`` takes the rest of the line. Raises ValueError on
+        anything it does not understand.
+        """
+        now = time.time() if now is None else now
+        options = cls()
+        text = text.strip()
+        if "search:" in text:
+            text, search = text.split("search:", 1)
+            # Quote every word so FTS5 never sees its own query syntax
+            words = _WORD.findall(search)
+            if not words:
+                raise ValueError("search: needs at least one word")
+            options.search = " ".join(f'"{word}"' for word in words)
+        for token in text.split():
+            name, _, value = token.partition(":")
+            name = name.lower()
+            if not value:
+                raise ValueError(f"unknown filter {token!r}")
+            if name in ("user", "target", "mod", "moderator"):
+                user_id = value.strip("<@!>")
+                if not user_id.isdigit():
+                    raise ValueError(f"invalid user {value!r}")
+                if name in ("user", "target"):
+                    options.target_id = int(user_id)
+                else:
+                    options.moderator_id = int(user_id)
+            elif name == "action":
+                options.action = value.replace("_", " ")
+            elif name == "since":
+                options.since = now - parse_duration(value)
+            elif name == "until":
+                options.until = now - parse_duration(value)
+            else:
+                raise ValueError(f"unknown filter {token!r}")
+        return options
+
+    def where(self, guild_id: int) -> Tuple[List[str], list]:
+        clauses, params = ["guild_id = ?"], [guild_id]
+        if self.target_id is not None:
+            clauses.append("target_id = ?")
+            params.append(self.target_id)
+        if self.moderator_id is not None:
+            clauses.append("moderator_id = ?")
+            params.append(self.moderator_id)
+        if self.action is not None:
+            clauses.append("action = ?")
+            params.append(self.action)
+        if self.since is not None:
+            clauses.append("created_at >= ?")
+            params.append(self.since)
+        if self.until is not None:
+            clauses.append("created_at <= ?")
+            params.append(self.until)
+        if self.search is not None:
+            clauses.append("id IN (SELECT rowid FROM journal_reasons WHERE journal_reasons MATCH ?)")
+            params.append(self.search)
+        return clauses, params
+
+
+class ActionJournal(WriteBehindDatabase):
+    """Every logged moderation action, queryable by member, moderator, action and time.
+
+    Entries are queued by :meth:`record` and written in one transaction per
+    flush window, like warnings are. Each filter has an index that ends in
+    (created_at, id), so a page is a short index range scan from a keyset
+    cursor whatever the table size and however deep the page. Reasons are
+    indexed by an external-content FTS5 table kept in step by a trigger.
+    """
+
+    noun = "journal entries"
+    schema = """
+        CREATE TABLE IF NOT EXISTS journal (
+            id INTEGER PRIMARY KEY,
+            guild_id INTEGER NOT NULL,
+            created_at REAL NOT NULL,
+            action TEXT NOT NULL COLLATE NOCASE,
+            moderator_id INTEGER NOT NULL,
+            target_id INTEGER NOT NULL,
+            reason TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS journal_guild ON journal (guild_id, created_at);
+        CREATE INDEX IF NOT EXISTS journal_target ON journal (guild_id, target_id, created_at);
+        CREATE INDEX IF NOT EXISTS journal_moderator ON journal (guild_id, moderator_id, created_at);
+        CREATE INDEX IF NOT EXISTS journal_action ON journal (guild_id, action, created_at);
+        CREATE VIRTUAL TABLE IF NOT EXISTS journal_reasons USING fts5(
+            reason, content='journal', content_rowid='id'
+        );
+        CREATE TRIGGER IF NOT EXISTS journal_reasons_insert AFTER INSERT ON journal BEGIN
+            INSERT INTO journal_reasons (rowid, reason) VALUES (new.id, new.reason);
+        END;
+    """
+
+    def record(self, guild_id: int, action: str, moderator_id: int, target_id: int, reason: str,
+               created_at: Optional[float] = None):
+        """Queue an entry; it is written with the next flush"""
+        self._queue.append((guild_id, created_at or time.time(), action, moderator_id, target_id, reason))
+        self._dirty.set()
+
+    async def flush(self):
+        """Write every queued entry in one transaction"""
+        if not self._queue:
+            return
+        batch, self._queue = self._queue, []
+        await self._write(batch, lambda conn: conn.executemany(
+            "INSERT INTO journal (guild_id, created_at, action, moderator_id, target_id, reason) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            batch,
+        ))
+
+    async def query(self, guild_id: int, filters: Optional[JournalQuery] = None, before: Optional[Cursor] = None,
+                    after: Optional[Cursor] = None, limit: int = 10) -> Tuple[List[JournalEntry], bool]:
+        """One page of entries, newest first, and whether more lie past it.
+
+        ``before`` pages to older entries than a cursor and ``after`` to
+        newer ones; "more" is in the direction paged.
+        """
+        await self.flush()
+        clauses, params = (filters or JournalQuery()).where(guild_id)
+        order = "DESC"
+        if before is not None:
+            clauses.append("(created_at, id) < (?, ?)")
+            params.extend(before)
+        elif after is not None:
+            clauses.append("(created_at, id) > (?, ?)")
+            params.extend(after)
+            order = "ASC"
+        sql = (
+            "SELECT id, guild_id, created_at, action, moderator_id, target_id, reason FROM journal "
+            f"WHERE {' AND '.join(clauses)} ORDER BY created_at {order}, id {order} LIMIT ?"
+        )
+        rows = await self.run(lambda conn: conn.execute(sql, (*params, limit + 1)).fetchall())
+        entries = [JournalEntry(*row) for row in rows[:limit]]
+        if order == "ASC":
+            entries.reverse()
+        return entries, len(rows) > limit
@@ -0,0 +1,113 @@
+from typing import Iterable, List, Optional, Tuple
+
+import discord
+
+from .concurrency import run_bounded
+from .database import Database
+
+# What @everyone loses in every channel while the guild is locked
+LOCKED_PERMISSIONS = {
+    "send_messages": False,
+    "send_messages_in_threads": False,
+    "create_public_threads": False,
+    "create_private_threads": False,
+    "add_reactions": False,
+    "connect": False,
+    "speak": False,
+}
+
+
+class LockdownStore(Database):
+    """Snapshots of @everyone overwrites taken before a lockdown.
+
+    A row per channel records whether an overwrite existed and its raw
+    allow/deny bits, which is everything needed to put it back exactly.
+    Snapshots are written before any channel is touched and only removed once
+    that channel has been restored, so an interrupted lockdown or unlock can
+    simply be run again.
+    """
+
+    schema = """
+        CREATE TABLE IF NOT EXISTS lockdown_snapshots (
+            guild_id INTEGER NOT NULL,
+            channel_id INTEGER NOT NULL,
+            had_overwrite INTEGER NOT NULL,
+            allow INTEGER NOT NULL,
+            deny INTEGER NOT NULL,
+            PRIMARY KEY (guild_id, channel_id)
+        );
+    """
+
+    async def save(self, guild_id: int, rows: Iterable[Tuple[int, bool, int, int]]):
+        # OR IGNORE: locking twice must not replace the original state with the locked one
+        await self.run(lambda conn: conn.executemany(
+            "INSERT OR IGNORE INTO lockdown_snapshots (guild_id, channel_id, had_overwrite, allow, deny) "
+            "VALUES (?, ?, ?, ?, ?)",
+            [(guild_id, *row) for row in rows],
+        ))
+
+    async def load(self, guild_id: int) -> List[Tuple[int, bool, int, int]]:
+        return await self.run(lambda conn: conn.execute(
+            "SELECT channel_id, had_overwrite, allow, deny FROM lockdown_snapshots WHERE guild_id = ?",
+            (guild_id,),
+        ).fetchall())
+
+    async def is_locked(self, guild_id: int) -> bool:
+        return bool(await self.run(lambda conn: conn.execute(
+            "SELECT 1 FROM lockdown_snapshots WHERE guild_id = ? LIMIT 1", (guild_id,)
+        ).fetchone()))
+
+    async def discard(self, guild_id: int, channel_ids: Iterable[int]):
+        await self.run(lambda conn: conn.executemany(
+            "DELETE FROM lockdown_snapshots WHERE guild_id = ? AND channel_id = ?",
+            [(guild_id, channel_id) for channel_id in channel_ids],
+        ))
+
+
+def snapshot(channel: discord.abc.GuildChannel) -> Tuple[int, bool, int, int]:
+    everyone = channel.guild.default_role
+    had_overwrite = everyone in channel.overwrites
+    allow, deny = channel.overwrites_for(everyone).pair()
+    return channel.id, had_overwrite, allow.value, deny.value
+
+
+async def lock_guild(guild: discord.Guild, store: LockdownStore, reason: str, limit: int = 5,
+                     progress=None) -> List[Tuple[discord.abc.GuildChannel, Exception]]:
+    """Snapshot every channel's @everyone overwrite, then deny sending everywhere"""
+    channels = [channel for channel in guild.channels if not isinstance(channel, discord.CategoryChannel)]
+    await store.save(guild.id, map(snapshot, channels))
+
+    async def lock(channel):
+        overwrite = channel.overwrites_for(guild.default_role)
+        overwrite.update(**LOCKED_PERMISSIONS)
+        await channel.set_permissions(guild.default_role, overwrite=overwrite, reason=reason)
+
+    return await run_bounded(channels, lock, limit=limit, progress=progress)
+
+
+async def unlock_guild(guild: discord.Guild, store: LockdownStore, reason: str, limit: int = 5,
+                       progress=None) -> Optional[List[Tuple[discord.abc.GuildChannel, Exception]]]:
+    """Put back the exact overwrites captured by :func:`lock_guild`; None if not locked"""
+    rows = await store.load(guild.id)
+    if not rows:
+        return None
+    restored, targets = [], []
+    for channel_id, had_overwrite, allow, deny in rows:
+        channel = guild.get_channel(channel_id)
+        if channel is None:
+            # Deleted while locked, nothing left to restore
+            restored.append(channel_id)
+        else:
+            targets.append((channel, had_overwrite, allow, deny))
+
+    async def unlock(target):
+        channel, had_overwrite, allow, deny = target
+        overwrite = None
+        if had_overwrite:
+            overwrite = discord.PermissionOverwrite.from_pair(discord.Permissions(allow), discord.Permissions(deny))
+        await channel.set_permissions(guild.default_role, overwrite=overwrite, reason=reason)
+        restored.append(channel.id)
+
+    failures = await run_bounded(targets, unlock, limit=limit, progress=progress)
+    await store.discard(guild.id, restored)
+    return [(target[0], error) for target, error in failures]
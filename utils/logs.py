@@ -0,0 +1,82 @@
+import gzip
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import shutil
+import time
+from datetime import datetime, timezone
+
+# Attributes a call site can pass through ``extra=`` to get a structured field
+STRUCTURED_FIELDS = ("guild", "action", "target", "targets", "moderator", "command")
+
+
+class JsonFormatter(logging.Formatter):
+    """Format records as one JSON object per line"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for field in STRUCTURED_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                entry[field] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class RotatingLogFileHandler(logging.handlers.RotatingFileHandler):
+    """File handler that rolls over on size or age, whichever comes first.
+
+    With ``compress`` set, rotated files are gzipped as ``<name>.N.gz``.
+    """
+
+    def __init__(self, filename: str, max_bytes: int = 10 * 2**20, interval: float = 86400.0,
+                 backup_count: int = 14, compress: bool = True):
+        super().__init__(filename, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8')
+        self.interval = interval
+        self.rollover_at = time.time() + interval
+        if compress:
+            self.namer = lambda name: name + ".gz"
+            self.rotator = self._compress
+
+    @staticmethod
+    def _compress(source: str, dest: str):
+        with open(source, 'rb') as src, gzip.open(dest, 'wb') as dst:
+            shutil.copyfileobj(src, dst)
+        os.remove(source)
+
+    def shouldRollover(self, record: logging.LogRecord) -> bool:
+        if self.interval and time.time() >= self.rollover_at:
+            return True
+        return bool(super().shouldRollover(record))
+
+    def doRollover(self):
+        super().doRollover()
+        self.rollover_at = time.time() + self.interval
+
+
+def setup_queue_logging(logger: logging.Logger, filename: str, structured: bool = True,
+                        compress: bool = True, **handler_options) -> logging.handlers.QueueListener:
+    """Attach a queue handler to ``logger`` and return the started listener.
+
+    Records are only put on an in-memory queue on the calling thread; the
+    listener's thread formats them and does every write and rollover.
+    """
+    file_handler = RotatingLogFileHandler(filename, compress=compress, **handler_options)
+    if structured:
+        file_handler.setFormatter(JsonFormatter())
+    else:
+        file_handler.setFormatter(logging.Formatter('%(asctime)s:%(levelname)s:%(name)s: %(message)s'))
+
+    log_queue = queue.SimpleQueue()
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    listener = logging.handlers.QueueListener(log_queue, file_handler, respect_handler_level=True)
+    listener.start()
+    return listener
@@ -0,0 +1,270 @@
+import asyncio
+import bisect
+import math
+import re
+from collections import Counter
+from typing import Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+import discord
+
+from .wordfilter import normalize
+
+_DURATION = re.compile(r"(\d+(?:\.\d+)?)([smhd])")
+_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def trigrams(text: str) -> FrozenSet[str]:
+    """Trigrams of folded text, padded so two-letter names still get some"""
+    text = f" {normalize(text)} "
+    return frozenset(text[i:i + 3] for i in range(len(text) - 2))
+
+
+def _names(member: discord.Member) -> Tuple[str, ...]:
+    return tuple(dict.fromkeys(name for name in (member.name, member.global_name, member.nick) if name))
+
+
+class _Entry(NamedTuple):
+    joined_at: float
+    names: str
+    grams: FrozenSet[str]
+
+
+class GuildMemberIndex:
+    """One guild's members by ID, by join time and by name trigram.
+
+    Join times are kept in a sorted list, so a join window is two bisects.
+    Each trigram of a member's folded names maps to the members that contain
+    it, so a fuzzy name search only touches the members sharing a trigram
+    with the query instead of the whole guild.
+    """
+
+    __slots__ = ("members", "joins", "grams")
+
+    def __init__(self):
+        self.members: Dict[int, _Entry] = {}
+        self.joins: List[Tuple[float, int]] = []
+        self.grams: Dict[str, Set[int]] = {}
+
+    def __len__(self):
+        return len(self.members)
+
+    def __contains__(self, user_id: int):
+        return user_id in self.members
+
+    def _insert(self, member: discord.Member) -> Tuple[float, int]:
+        self.remove(member.id)
+        names = _names(member)
+        joined = member.joined_at.timestamp() if member.joined_at else 0.0
+        grams = frozenset().union(*map(trigrams, names))
+        self.members[member.id] = _Entry(joined, "\n".join(names), grams)
+        for gram in grams:
+            self.grams.setdefault(gram, set()).add(member.id)
+        return (joined, member.id)
+
+    def add(self, member: discord.Member):
+        bisect.insort(self.joins, self._insert(member))
+
+    def add_many(self, members: Iterable[discord.Member]):
+        """Index a batch, sorting the join list once instead of once per member"""
+        self.joins.extend(map(self._insert, members))
+        self.joins.sort()
+
+    def remove(self, user_id: int):
+        entry = self.members.pop(user_id, None)
+        if entry is None:
+            return
+        i = bisect.bisect_left(self.joins, (entry.joined_at, user_id))
+        if i < len(self.joins) and self.joins[i][1] == user_id:
+            del self.joins[i]
+        for gram in entry.grams:
+            ids = self.grams[gram]
+            ids.discard(user_id)
+            if not ids:
+                del self.grams[gram]
+
+    def joined_at(self, user_id: int) -> float:
+        entry = self.members.get(user_id)
+        return entry.joined_at if entry else 0.0
+
+    def joined_between(self, after: float, before: float) -> List[int]:
+        """Members who joined in ``[after, before]`` (Unix seconds), oldest first"""
+        lo = bisect.bisect_left(self.joins, (after, 0))
+        hi = bisect.bisect_right(self.joins, (before, math.inf))
+        return [user_id for _, user_id in self.joins[lo:hi]]
+
+    def search(self, text: str, threshold: float = 0.6) -> List[int]:
+        """Members whose names share at least ``threshold`` of the query's trigrams"""
+        query = trigrams(text)
+        if not query:
+            return []
+        hits = Counter()
+        for gram in query:
+            hits.update(self.grams.get(gram, ()))
+        need = math.ceil(len(query) * threshold)
+        return [user_id for user_id, count in hits.items() if count >= need]
+
+    def matching(self, pattern: re.Pattern, user_ids: Optional[Iterable[int]] = None) -> List[int]:
+        """Members with a name ``pattern`` matches, out of ``user_ids`` or everyone indexed"""
+        members = self.members
+        if user_ids is None:
+            return [user_id for user_id, entry in members.items() if pattern.search(entry.names)]
+        return [user_id for user_id in user_ids if user_id in members and pattern.search(members[user_id].names)]
+
+
+class MemberIndex:
+    """Per-guild :class:`GuildMemberIndex` objects, built on first use.
+
+    A guild's index is filled from the member cache the first time a command
+    needs it and kept current by the member join, update and remove
+    listeners afterwards, so guilds nobody searches cost nothing. The first
+    fill runs ``chunk`` members at a time, yielding to the event loop in
+    between, so indexing a huge guild never stalls heartbeats.
+
+    The index can only hold what the member cache holds: under the
+    ``standard`` intents profile guilds are never chunked, so it covers the
+    members who joined or were seen since startup, not the whole guild.
+    """
+
+    def __init__(self, chunk: int = 1000):
+        self.chunk = chunk
+        self._guilds: Dict[int, GuildMemberIndex] = {}
+        self._building: Dict[int, asyncio.Task] = {}
+
+    def __len__(self):
+        return len(self._guilds)
+
+    async def _build(self, guild: discord.Guild, index: GuildMemberIndex):
+        members = list(guild.members)
+        try:
+            for start in range(0, len(members), self.chunk):
+                # Skip members who left while earlier chunks were indexed
+                index.add_many(member for member in members[start:start + self.chunk]
+                               if guild.get_member(member.id) is not None)
+                await asyncio.sleep(0)
+        finally:
+            self._building.pop(guild.id, None)
+
+    async def get(self, guild: discord.Guild) -> GuildMemberIndex:
+        """A guild's index, built from the member cache on first use"""
+        index = self._guilds.get(guild.id)
+        if index is None:
+            # Registered before it is filled so listeners keep it current meanwhile
+            index = self._guilds[guild.id] = GuildMemberIndex()
+            self._building[guild.id] = asyncio.get_running_loop().create_task(self._build(guild, index))
+        building = self._building.get(guild.id)
+        if building is not None:
+            await asyncio.shield(building)
+        return index
+
+    def add(self, member: discord.Member):
+        """Index a member who joined or changed names, if the guild is indexed"""
+        index = self._guilds.get(member.guild.id)
+        if index is not None:
+            index.add(member)
+
+    def remove(self, guild_id: int, user_id: int):
+        index = self._guilds.get(guild_id)
+        if index is not None:
+            index.remove(user_id)
+
+    def rename(self, user: discord.abc.User, guilds: Iterable[discord.Guild]):
+        """Re-index a user whose account name changed in every indexed guild they are in"""
+        for guild in guilds:
+            index = self._guilds.get(guild.id)
+            member = guild.get_member(user.id) if index is not None else None
+            if member is not None:
+                index.add(member)
+
+    def forget(self, guild_id: int):
+        self._guilds.pop(guild_id, None)
+        building = self._building.pop(guild_id, None)
+        if building is not None:
+            building.cancel()
+
+
+def parse_duration(text: str) -> float:
+    """Seconds in ``"90s"``, ``"30m"``, ``"1h30m"`` or ``"2d"``; raise ValueError otherwise"""
+    text = text.lower()
+    if not text or _DURATION.sub("", text):
+        raise ValueError(f"invalid duration {text!r}, use 30m, 2h or 1d")
+    return sum(float(value) * _UNITS[unit] for value, unit in _DURATION.findall(text))
+
+
+class MemberSelector:
+    """Which members a mass action targets; every option given must match"""
+
+    def __init__(self, user_ids: Optional[List[int]] = None, name: Optional[str] = None,
+                 joined: Optional[Tuple[float, float]] = None, pattern: Optional[re.Pattern] = None,
+                 dry_run: bool = False):
+        self.user_ids = user_ids or []
+        self.name = name
+        self.joined = joined
+        self.pattern = pattern
+        self.dry_run = dry_run
+
+    def __bool__(self):
+        return bool(self.user_ids or self.name or self.joined or self.pattern)
+
+    @classmethod
+    def parse(cls, text: str) -> "MemberSelector":
+        """Parse ``<ids or mentions> name:<text> joined:<ago>[..<ago>] regex:<pattern> dry``
+
+        ``joined:30m`` is the last 30 minutes and ``joined:2h..1h`` a window
+        between two times ago. ``regex:`` takes the rest of the line so
+        patterns may contain spaces. Raises ValueError on anything it does
+        not understand.
+        """
+        options = cls()
+        text = text.strip()
+        if "regex:" in text:
+            text, pattern = text.split("regex:", 1)
+            try:
+                options.pattern = re.compile(pattern.strip(), re.IGNORECASE)
+            except re.error as e:
+                raise ValueError(f"invalid regex: {e}") from None
+        for token in text.split():
+            lowered = token.lower()
+            if lowered in ("dry", "preview", "--dry-run"):
+                options.dry_run = True
+            elif lowered.startswith("name:"):
+                if len(token) < 8:
+                    raise ValueError("name: needs at least 3 characters")
+                options.name = token[5:]
+            elif lowered.startswith("joined:"):
+                start, _, end = lowered[7:].partition("..")
+                options.joined = (parse_duration(start), parse_duration(end) if end else 0.0)
+                if options.joined[1] >= options.joined[0]:
+                    raise ValueError("joined: windows go from longer ago to more recent, e.g. joined:2h..1h")
+            else:
+                user_id = token.strip("<@!>,")
+                if not user_id.isdigit():
+                    raise ValueError(f"unknown selector {token!r}")
+                options.user_ids.append(int(user_id))
+        return options
+
+    def select(self, index: GuildMemberIndex, now: float) -> List[int]:
+        """IDs to act on, cheapest lookup first and the rest as filters.
+
+        Listed IDs are kept even when they are not indexed, so members who
+        already left can still be banned.
+        """
+        if self.user_ids:
+            selected = list(dict.fromkeys(self.user_ids))
+            if self.joined or self.name or self.pattern:
+                selected = [user_id for user_id in selected if user_id in index]
+        elif self.joined:
+            selected = index.joined_between(now - self.joined[0], now - self.joined[1])
+        elif self.name:
+            selected = index.search(self.name)
+        else:
+            selected = index.matching(self.pattern)
+
+        if self.joined and (self.user_ids or self.name or self.pattern):
+            after, before = now - self.joined[0], now - self.joined[1]
+            selected = [user_id for user_id in selected if after <= index.joined_at(user_id) <= before]
+        if self.name and (self.user_ids or self.joined):
+            similar = set(index.search(self.name))
+            selected = [user_id for user_id in selected if user_id in similar]
+        if self.pattern and (self.user_ids or self.joined or self.name):
+            selected = index.matching(self.pattern, selected)
+        return sorted(selected, key=index.joined_at)
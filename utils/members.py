@@ -0,0 +1,18 @@
+from typing import Optional
+
+import discord
+
+
+async def get_or_fetch_member(guild: discord.Guild, user_id: int) -> Optional[discord.Member]:
+    """Return a member from the cache, falling back to the API when it is not cached
+
+    With a lean intents profile most members are never cached, so anything that
+    starts from a stored ID rather than a gateway event should go through here.
+    """
+    member = guild.get_member(user_id)
+    if member is not None:
+        return member
+    try:
+        return await guild.fetch_member(user_id)
+    except discord.NotFound:
+        return None
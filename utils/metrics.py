@@ -0,0 +1,167 @@
+import asyncio
+import bisect
+import os
+import time
+from typing import Dict, Optional, Tuple
+
+# Latency buckets in seconds, Prometheus style upper bounds
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    """Fixed-bucket latency histogram: one bisect and two adds per observation"""
+
+    __slots__ = ("counts", "count", "sum")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(BUCKETS, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-th observation"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(BUCKETS, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+
+class _Timer:
+    __slots__ = ("histogram", "start")
+
+    def __init__(self, histogram: Histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start)
+
+
+class _NoopTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        pass
+
+    def __exit__(self, *exc):
+        pass
+
+
+_NOOP = _NoopTimer()
+
+
+class Metrics:
+    """In-process counters and latency histograms with a Prometheus text export.
+
+    Metrics are keyed by name plus a sorted tuple of label pairs. With
+    ``enabled`` off, :meth:`timer` hands back a shared no-op context manager and
+    :meth:`observe` and :meth:`inc` return at once, so instrumented code pays
+    little more than the call itself.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.histograms: Dict[Tuple[str, Labels], Histogram] = {}
+        self.counters: Dict[Tuple[str, Labels], float] = {}
+        self.started_at = time.time()
+        self._writer: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def _key(name: str, labels: dict) -> Tuple[str, Labels]:
+        items = tuple(labels.items())
+        return name, tuple(sorted(items)) if len(items) > 1 else items
+
+    def _histogram(self, name: str, labels: dict) -> Histogram:
+        key = self._key(name, labels)
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = Histogram()
+        return histogram
+
+    def observe(self, name: str, seconds: float, **labels):
+        if self.enabled:
+            self._histogram(name, labels).observe(seconds)
+
+    def inc(self, name: str, value: float = 1, **labels):
+        if self.enabled:
+            key = self._key(name, labels)
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def timer(self, name: str, **labels):
+        """Context manager timing its body into the ``name`` histogram"""
+        if not self.enabled:
+            return _NOOP
+        return _Timer(self._histogram(name, labels))
+
+    def histogram(self, name: str, **match) -> Dict[Labels, Histogram]:
+        """Every histogram called ``name`` whose labels include ``match``"""
+        wanted = set(match.items())
+        return {labels: h for (n, labels), h in self.histograms.items() if n == name and wanted <= set(labels)}
+
+    def counter(self, name: str, **match) -> Dict[Labels, float]:
+        wanted = set(match.items())
+        return {labels: v for (n, labels), v in self.counters.items() if n == name and wanted <= set(labels)}
+
+    def render_prometheus(self, prefix: str = "modbot_") -> str:
+        def fmt(labels, extra=()):
+            pairs = [*labels, *extra]
+            if not pairs:
+                return ""
+            return "{" + ",".join(f'{k}="{str(v).replace(chr(34), "")}"' for k, v in pairs) + "}"
+
+        lines = []
+        for name in sorted({name for name, _ in self.counters}):
+            lines.append(f"# TYPE {prefix}{name} counter")
+            for (n, labels), value in self.counters.items():
+                if n == name:
+                    lines.append(f"{prefix}{name}{fmt(labels)} {value}")
+        for name in sorted({name for name, _ in self.histograms}):
+            lines.append(f"# TYPE {prefix}{name} histogram")
+            for (n, labels), histogram in self.histograms.items():
+                if n != name:
+                    continue
+                cumulative = 0
+                for bound, count in zip((*BUCKETS, "+Inf"), histogram.counts):
+                    cumulative += count
+                    lines.append(f"{prefix}{name}_bucket{fmt(labels, (('le', bound),))} {cumulative}")
+                lines.append(f"{prefix}{name}_sum{fmt(labels)} {histogram.sum}")
+                lines.append(f"{prefix}{name}_count{fmt(labels)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def write_textfile(path: str, text: str):
+        """Atomically replace ``path`` with ``text``"""
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp, path)
+
+    async def _write_forever(self, path: str, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            # Render on the loop so the dicts are not mutated mid-iteration, write off it
+            await asyncio.to_thread(self.write_textfile, path, self.render_prometheus())
+
+    def start(self, path: str, interval: float = 15.0):
+        """Write the Prometheus text file every ``interval`` seconds"""
+        if self.enabled and (self._writer is None or self._writer.done()):
+            self._writer = asyncio.get_running_loop().create_task(self._write_forever(path, interval))
+
+    def stop(self):
+        if self._writer is not None:
+            self._writer.cancel()
+            self._writer = None
@@ -0,0 +1,143 @@
+import asyncio
+import logging
+import time
+from typing import Dict, List, Optional, Tuple
+
+import discord
+
+log = logging.getLogger('mod_bot')
+
+
+class ModLogPipeline:
+    """Per-guild queue that delivers mod-log embeds in coalesced batches.
+
+    ``enqueue`` returns immediately. A worker per guild waits up to
+    ``flush_window`` seconds to gather as many as ten embeds, the most Discord
+    accepts in one message, and sends them together. The log channel ID is
+    cached so the channel list is only scanned once per guild, and 429s are
+    retried with exponential backoff. Workers exit when their queue drains.
+    """
+
+    max_embeds = 10
+
+    def __init__(self, bot: discord.Client, channel_name: str = "mod-logs",
+                 flush_window: float = 1.0, max_retries: int = 5):
+        self.bot = bot
+        self.channel_name = channel_name
+        self.flush_window = flush_window
+        self.max_retries = max_retries
+        self._queues: Dict[int, asyncio.Queue] = {}
+        self._workers: Dict[int, asyncio.Task] = {}
+        self._channels: Dict[int, int] = {}
+        # Metrics
+        self.sent_messages = 0
+        self.sent_embeds = 0
+        self.dropped_embeds = 0
+        self.last_flush_latency = 0.0
+        self.max_flush_latency = 0.0
+        self._total_flush_latency = 0.0
+
+    def enqueue(self, guild: discord.Guild, embed: discord.Embed):
+        """Queue an embed for the guild's log channel"""
+        queue = self._queues.get(guild.id)
+        if queue is None:
+            queue = self._queues[guild.id] = asyncio.Queue()
+        queue.put_nowait((time.monotonic(), embed))
+        if guild.id not in self._workers:
+            self._workers[guild.id] = asyncio.get_running_loop().create_task(self._worker(guild.id))
+
+    def depth(self, guild_id: Optional[int] = None) -> int:
+        """Embeds waiting to be sent, for one guild or all of them"""
+        if guild_id is not None:
+            queue = self._queues.get(guild_id)
+            return queue.qsize() if queue else 0
+        return sum(queue.qsize() for queue in self._queues.values())
+
+    def stats(self) -> dict:
+        return {
+            "queue_depth": self.depth(),
+            "active_guilds": len(self._workers),
+            "sent_messages": self.sent_messages,
+            "sent_embeds": self.sent_embeds,
+            "dropped_embeds": self.dropped_embeds,
+            "last_flush_latency": self.last_flush_latency,
+            "max_flush_latency": self.max_flush_latency,
+            "avg_flush_latency": self._total_flush_latency / self.sent_messages if self.sent_messages else 0.0,
+        }
+
+    async def get_channel(self, guild: discord.Guild) -> discord.TextChannel:
+        """Return the guild's log channel, creating it the first time"""
+        channel = guild.get_channel(self._channels.get(guild.id, 0))
+        if channel is None:
+            channel = discord.utils.get(guild.text_channels, name=self.channel_name)
+        if channel is None:
+            overwrites = {
+                guild.default_role: discord.PermissionOverwrite(read_messages=False),
+                guild.me: discord.PermissionOverwrite(read_messages=True)
+            }
+            channel = await guild.create_text_channel(self.channel_name, overwrites=overwrites)
+        self._channels[guild.id] = channel.id
+        return channel
+
+    async def _collect(self, queue: asyncio.Queue) -> List[Tuple[float, discord.Embed]]:
+        batch = [await queue.get()]
+        deadline = time.monotonic() + self.flush_window
+        while len(batch) < self.max_embeds:
+            if not queue.empty():
+                batch.append(queue.get_nowait())
+                continue
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _send(self, guild: discord.Guild, embeds: List[discord.Embed]):
+        delay = 1.0
+        for attempt in range(self.max_retries):
+            channel = await self.get_channel(guild)
+            try:
+                await channel.send(embeds=embeds)
+                return
+            except discord.NotFound:
+                # Channel was deleted under us, resolve it again
+                self._channels.pop(guild.id, None)
+            except discord.HTTPException as e:
+                if e.status != 429 and e.status < 500:
+                    raise
+                retry_after = e.response.headers.get("Retry-After") if e.response is not None else None
+                await asyncio.sleep(float(retry_after) if retry_after else delay)
+                delay *= 2
+        raise RuntimeError(f"gave up after {self.max_retries} attempts")
+
+    async def _worker(self, guild_id: int):
+        queue = self._queues[guild_id]
+        while True:
+            batch = await self._collect(queue)
+            guild = self.bot.get_guild(guild_id)
+            try:
+                if guild is None:
+                    raise RuntimeError("guild is no longer available")
+                await self._send(guild, [embed for _, embed in batch])
+            except Exception as e:
+                self.dropped_embeds += len(batch)
+                log.error(f"Failed to deliver {len(batch)} mod-log embed(s) in {guild_id}: {e}")
+            else:
+                latency = time.monotonic() - batch[0][0]
+                self.sent_messages += 1
+                self.sent_embeds += len(batch)
+                self.last_flush_latency = latency
+                self.max_flush_latency = max(self.max_flush_latency, latency)
+                self._total_flush_latency += latency
+            if queue.empty():
+                del self._workers[guild_id]
+                del self._queues[guild_id]
+                return
+
+    def stop(self):
+        for task in self._workers.values():
+            task.cancel()
+        self._workers.clear()
@@ -0,0 +1,129 @@
+import asyncio
+import logging
+from typing import Dict, Optional, Tuple
+
+import discord
+
+from .concurrency import run_bounded
+
+log = logging.getLogger('mod_bot')
+
+
+class MutedRoleManager:
+    """Resolves each guild's Muted role and keeps its channel overwrites applied.
+
+    The role ID is cached per guild so lookups are a dict hit instead of a
+    scan over ``guild.roles``. Channel overwrites are applied in the
+    background by a bounded pool; the command that triggered the setup gets the
+    role back straight away. Channels that already carry the overwrite are
+    skipped, so a setup interrupted by a crash or restart picks up where it
+    left off the next time the role is resolved.
+    """
+
+    permissions = {"send_messages": False, "add_reactions": False, "speak": False}
+
+    def __init__(self, role_name: str = "Muted", concurrency: int = 5):
+        self.role_name = role_name
+        self.concurrency = concurrency
+        self._role_ids: Dict[int, int] = {}
+        self._creating: Dict[int, asyncio.Task] = {}
+        self._setups: Dict[int, asyncio.Task] = {}
+        self._progress: Dict[int, Tuple[int, int]] = {}
+
+    def __contains__(self, guild_id: int) -> bool:
+        return guild_id in self._role_ids
+
+    def cached(self, guild: discord.Guild) -> Optional[discord.Role]:
+        """Return the guild's Muted role if it has already been resolved"""
+        return guild.get_role(self._role_ids.get(guild.id, 0))
+
+    def progress(self, guild_id: int) -> Optional[Tuple[int, int]]:
+        """(done, total) channels for a setup still running in the guild"""
+        return self._progress.get(guild_id)
+
+    async def get(self, guild: discord.Guild, create: bool = True) -> Optional[discord.Role]:
+        """Get or create the guild's Muted role.
+
+        Concurrent callers share one creation, so a burst of mutes during a
+        raid makes one role instead of one each.
+        """
+        role = self.cached(guild)
+        if role:
+            return role
+
+        creating = self._creating.get(guild.id)
+        if creating is None:
+            role = discord.utils.get(guild.roles, name=self.role_name)
+            if role:
+                self._resolved(guild, role)
+                return role
+            if not create:
+                return None
+            creating = self._creating[guild.id] = asyncio.get_running_loop().create_task(self._create(guild))
+        return await asyncio.shield(creating)
+
+    async def _create(self, guild: discord.Guild) -> discord.Role:
+        try:
+            role = await guild.create_role(name=self.role_name, reason="Auto-created muted role")
+            self._resolved(guild, role)
+            return role
+        finally:
+            self._creating.pop(guild.id, None)
+
+    def _resolved(self, guild: discord.Guild, role: discord.Role):
+        self._role_ids[guild.id] = role.id
+        # First time this process sees the role, finish any channels it is missing
+        self.start_setup(guild, role)
+
+    def needs_overwrite(self, channel: discord.abc.GuildChannel, role: discord.Role) -> bool:
+        overwrite = channel.overwrites_for(role)
+        return any(getattr(overwrite, name) is not value for name, value in self.permissions.items())
+
+    def start_setup(self, guild: discord.Guild, role: discord.Role):
+        """Apply the overwrite to every channel missing it, in the background"""
+        task = self._setups.get(guild.id)
+        if task and not task.done():
+            return
+        self._setups[guild.id] = asyncio.get_running_loop().create_task(self._setup(guild, role))
+
+    async def _setup(self, guild: discord.Guild, role: discord.Role):
+        channels = [channel for channel in guild.channels if self.needs_overwrite(channel, role)]
+        if not channels:
+            return
+        self._progress[guild.id] = (0, len(channels))
+
+        def report(done, total):
+            self._progress[guild.id] = (done, total)
+
+        try:
+            failures = await run_bounded(
+                channels,
+                lambda channel: channel.set_permissions(role, reason="Muted role setup", **self.permissions),
+                limit=self.concurrency,
+                progress=report
+            )
+        finally:
+            del self._progress[guild.id]
+            self._setups.pop(guild.id, None)
+        for channel, error in failures:
+            log.warning(f"Could not apply {self.role_name} overwrite in #{channel} ({guild.id}): {error}")
+        log.info(f"{self.role_name} role applied to {len(channels) - len(failures)}/{len(channels)} channels in {guild.id}")
+
+    async def patch_channel(self, channel: discord.abc.GuildChannel):
+        """Apply the overwrite to a newly created channel"""
+        role = self.cached(channel.guild)
+        if role and self.needs_overwrite(channel, role):
+            await channel.set_permissions(role, reason="Muted role setup", **self.permissions)
+
+    def forget(self, role: discord.Role):
+        """Drop the cached ID when the role is deleted"""
+        if self._role_ids.get(role.guild.id) == role.id:
+            del self._role_ids[role.guild.id]
+            task = self._setups.pop(role.guild.id, None)
+            if task:
+                task.cancel()
+
+    def stop(self):
+        for task in self._setups.values():
+            task.cancel()
+        self._setups.clear()
@@ -0,0 +1,130 @@
+import re
+from datetime import timedelta
+from typing import Callable, Optional, Set
+
+import discord
+
+from .concurrency import run_bounded
+
+# Discord refuses bulk deletes of messages older than 14 days
+BULK_DELETE_MAX_AGE = timedelta(days=14) - timedelta(minutes=1)
+LINK_PATTERN = re.compile(r"https?://|discord\.gg/", re.IGNORECASE)
+
+
+class PurgeFilter:
+    """Which messages a purge removes; no options means every message"""
+
+    def __init__(self, user_ids: Optional[Set[int]] = None, pattern: Optional[re.Pattern] = None,
+                 bots: bool = False, attachments: bool = False, links: bool = False):
+        self.user_ids = user_ids or set()
+        self.pattern = pattern
+        self.bots = bots
+        self.attachments = attachments
+        self.links = links
+
+    def __bool__(self):
+        return bool(self.user_ids or self.pattern or self.bots or self.attachments or self.links)
+
+    @classmethod
+    def parse(cls, text: str) -> "PurgeFilter":
+        """Parse ``bots attachments links user:<@id> regex:<pattern>``
+
+        ``regex:`` takes the rest of the line so patterns may contain spaces.
+        Raises ValueError on anything it does not understand.
+        """
+        options = cls()
+        text = text.strip()
+        if "regex:" in text:
+            text, pattern = text.split("regex:", 1)
+            try:
+                options.pattern = re.compile(pattern.strip(), re.IGNORECASE)
+            except re.error as e:
+                raise ValueError(f"invalid regex: {e}") from None
+        for token in text.split():
+            lowered = token.lower()
+            if lowered in ("bots", "bot"):
+                options.bots = True
+            elif lowered in ("attachments", "files", "images"):
+                options.attachments = True
+            elif lowered in ("links", "link"):
+                options.links = True
+            elif lowered.startswith("user:"):
+                user_id = token[5:].strip("<@!>")
+                if not user_id.isdigit():
+                    raise ValueError(f"invalid user {token[5:]!r}")
+                options.user_ids.add(int(user_id))
+            else:
+                raise ValueError(f"unknown filter {token!r}")
+        return options
+
+    def __call__(self, message: discord.Message) -> bool:
+        if self.user_ids and message.author.id not in self.user_ids:
+            return False
+        if self.bots and not message.author.bot:
+            return False
+        if self.attachments and not message.attachments:
+            return False
+        if self.links and not LINK_PATTERN.search(message.content):
+            return False
+        if self.pattern and not self.pattern.search(message.content):
+            return False
+        return True
+
+
+async def purge_channel(channel: discord.TextChannel, amount: int, predicate: Callable[[discord.Message], bool],
+                        *, before: Optional[discord.abc.Snowflake] = None, scan_limit: Optional[int] = None,
+                        old_limit: int = 100, progress: Optional[Callable[[int, int], None]] = None) -> dict:
+    """Delete up to ``amount`` matching messages, streaming history page by page.
+
+    Messages under 14 days old are removed with ``delete_messages`` in batches
+    of 100. Older ones can only be deleted one by one, so at most ``old_limit``
+    of them are, two at a time. Only one page of history and one pending batch
+    are ever held in memory. ``progress(deleted, scanned)`` is called after
+    every batch.
+    """
+    cutoff = discord.utils.utcnow() - BULK_DELETE_MAX_AGE
+    result = {"deleted": 0, "scanned": 0, "old_limit_reached": False}
+    batch, old = [], []
+    old_budget = old_limit
+
+    def report():
+        if progress:
+            progress(result["deleted"], result["scanned"])
+
+    async def flush_batch():
+        if batch:
+            await channel.delete_messages(batch)
+            result["deleted"] += len(batch)
+            batch.clear()
+
+    async def flush():
+        await flush_batch()
+        if old:
+            failures = await run_bounded(old, lambda message: message.delete(), limit=2)
+            result["deleted"] += len(old) - len(failures)
+            old.clear()
+
+    matched = 0
+    async for message in channel.history(limit=scan_limit or amount, before=before):
+        result["scanned"] += 1
+        if not predicate(message):
+            continue
+        if message.created_at > cutoff:
+            batch.append(message)
+        elif old_budget:
+            # History runs newest first, so everything from here on is old too
+            await flush_batch()
+            old.append(message)
+            old_budget -= 1
+        else:
+            result["old_limit_reached"] = True
+            break
+        matched += 1
+        if len(batch) == 100 or len(old) == 10:
+            await flush()
+            report()
+        if matched >= amount:
+            break
+    await flush()
+    report()
+    return result
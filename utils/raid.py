@@ -0,0 +1,133 @@
+import time
+from collections import Counter, deque
+from datetime import datetime, timezone
+from typing import Dict, List, NamedTuple, Optional
+
+import discord
+
+from .wordfilter import normalize
+
+NEW_ACCOUNT_AGE = 7 * 86400
+
+
+class JoinRecord(NamedTuple):
+    at: float
+    member_id: int
+    new_account: bool
+    default_avatar: bool
+    name_key: str
+
+
+def name_key(name: str) -> str:
+    """Cluster key for a username: letters only, folded, first eight of them"""
+    # Drop digits first, otherwise leetspeak folding turns bot1 and bot5 into boti and bots
+    name = "".join(char for char in name if not char.isdigit())
+    return "".join(char for char in normalize(name) if char.isalpha())[:8]
+
+
+class GuildJoins:
+    """Sliding window of one guild's recent joins with running feature counts"""
+
+    __slots__ = ("joins", "new_accounts", "default_avatars", "names", "raid_until")
+
+    def __init__(self):
+        self.joins: deque = deque()
+        self.new_accounts = 0
+        self.default_avatars = 0
+        self.names: Counter = Counter()
+        self.raid_until = 0.0
+
+    def push(self, record: JoinRecord):
+        self.joins.append(record)
+        self.new_accounts += record.new_account
+        self.default_avatars += record.default_avatar
+        if record.name_key:
+            self.names[record.name_key] += 1
+
+    def expire(self, cutoff: float):
+        joins = self.joins
+        while joins and joins[0].at <= cutoff:
+            record = joins.popleft()
+            self.new_accounts -= record.new_account
+            self.default_avatars -= record.default_avatar
+            if record.name_key:
+                self.names[record.name_key] -= 1
+                if not self.names[record.name_key]:
+                    del self.names[record.name_key]
+
+
+class RaidVerdict(NamedTuple):
+    started: bool
+    targets: List[int]
+    reason: str
+
+
+class RaidDetector:
+    """Flags join raids from a per-guild sliding window of member joins.
+
+    Each join costs O(1) amortized: the record is appended, expired records
+    fall off the front, and counts of new accounts, default avatars and
+    similar names are kept up to date as they go. A raid starts when the window
+    holds ``threshold`` joins, or ``cluster`` joins that share a name
+    pattern. It stays active for ``cooldown`` seconds after the last raid join,
+    and every join during that time is returned as a target too.
+    """
+
+    def __init__(self, new_account_age: float = NEW_ACCOUNT_AGE, cooldown: float = 300.0):
+        self.new_account_age = new_account_age
+        self.cooldown = cooldown
+        self._guilds: Dict[int, GuildJoins] = {}
+
+    def is_raiding(self, guild_id: int, now: Optional[float] = None) -> bool:
+        state = self._guilds.get(guild_id)
+        return state is not None and state.raid_until > (now or time.monotonic())
+
+    def stats(self, guild_id: int) -> dict:
+        state = self._guilds.get(guild_id)
+        if state is None:
+            return {"joins": 0, "new_accounts": 0, "default_avatars": 0, "largest_cluster": 0}
+        largest = max(state.names.values(), default=0)
+        return {"joins": len(state.joins), "new_accounts": state.new_accounts,
+                "default_avatars": state.default_avatars, "largest_cluster": largest}
+
+    def end_raid(self, guild_id: int):
+        state = self._guilds.get(guild_id)
+        if state is not None:
+            state.raid_until = 0.0
+
+    def record(self, member: discord.Member, threshold: int = 10, window: float = 10.0,
+               cluster: int = 5, now: Optional[float] = None) -> Optional[RaidVerdict]:
+        """Record a join; return a verdict when the member should be acted on"""
+        if now is None:
+            now = time.monotonic()
+        state = self._guilds.get(member.guild.id)
+        if state is None:
+            state = self._guilds[member.guild.id] = GuildJoins()
+
+        age = (datetime.now(timezone.utc) - member.created_at).total_seconds()
+        record = JoinRecord(now, member.id, age < self.new_account_age, member.avatar is None, name_key(member.name))
+        state.expire(now - window)
+        state.push(record)
+
+        if state.raid_until > now:
+            state.raid_until = now + self.cooldown
+            return RaidVerdict(False, [member.id], "Raid in progress")
+
+        if len(state.joins) >= threshold:
+            reason = f"{len(state.joins)} joins in {window:g}s"
+        elif record.name_key and state.names[record.name_key] >= cluster:
+            reason = f"{state.names[record.name_key]} similar names in {window:g}s"
+        else:
+            return None
+
+        state.raid_until = now + self.cooldown
+        if len(state.joins) >= threshold:
+            targets = [join.member_id for join in state.joins]
+        else:
+            targets = [join.member_id for join in state.joins if join.name_key == record.name_key]
+        if state.new_accounts or state.default_avatars:
+            reason += f" ({state.new_accounts} new accounts, {state.default_avatars} default avatars)"
+        return RaidVerdict(True, targets, reason)
+
+    def forget(self, guild_id: int):
+        self._guilds.pop(guild_id, None)
@@ -0,0 +1,82 @@
+import asyncio
+import time
+from collections import deque
+from typing import Dict, Hashable, Optional
+
+
+class SlidingWindowLimiter:
+    """Sliding-window rate limiter keyed on (guild_id, user_id).
+
+    Each key owns a deque capped at ``limit`` monotonic timestamps, so a hit is
+    O(1): append the new stamp and compare it with the oldest one still held.
+    Keys that go quiet are dropped by a background sweep so memory stays
+    proportional to the number of users active inside the window.
+    """
+
+    def __init__(self, limit: int = 5, window: float = 5.0, sweep_interval: float = 60.0):
+        self.limit = limit
+        self.window = window
+        self.sweep_interval = sweep_interval
+        self._buckets: Dict[Hashable, deque] = {}
+        # Sweeps keep keys for the longest window any caller has asked for
+        self._longest_window = window
+        self._sweeper: Optional[asyncio.Task] = None
+
+    def __len__(self):
+        return len(self._buckets)
+
+    def hit(self, key: Hashable, now: Optional[float] = None,
+            limit: Optional[int] = None, window: Optional[float] = None) -> bool:
+        """Record an event for ``key``; return True if it is over the limit.
+
+        ``limit`` and ``window`` override the defaults for this key, e.g. with
+        a guild's own spam settings.
+        """
+        if now is None:
+            now = time.monotonic()
+        limit = limit or self.limit
+        window = window or self.window
+        bucket = self._buckets.get(key)
+        if bucket is None or bucket.maxlen != limit:
+            bucket = self._buckets[key] = deque(bucket or (), maxlen=limit)
+        if window > self._longest_window:
+            self._longest_window = window
+        bucket.append(now)
+        return len(bucket) == limit and now - bucket[0] < window
+
+    def reset(self, key: Hashable):
+        """Forget every recorded event for ``key``"""
+        self._buckets.pop(key, None)
+
+    def sweep(self, now: Optional[float] = None) -> int:
+        """Drop keys whose newest event has left the window; return how many"""
+        if now is None:
+            now = time.monotonic()
+        cutoff = now - self._longest_window
+        idle = [key for key, bucket in self._buckets.items() if bucket[-1] <= cutoff]
+        for key in idle:
+            del self._buckets[key]
+        return len(idle)
+
+    async def _sweep_forever(self, chunk: int = 5000):
+        while True:
+            await asyncio.sleep(self.sweep_interval)
+            # Walk a snapshot in chunks so a big sweep never stalls the gateway
+            keys = list(self._buckets)
+            for start in range(0, len(keys), chunk):
+                cutoff = time.monotonic() - self._longest_window
+                for key in keys[start:start + chunk]:
+                    bucket = self._buckets.get(key)
+                    if bucket is not None and bucket[-1] <= cutoff:
+                        del self._buckets[key]
+                await asyncio.sleep(0)
+
+    def start(self):
+        """Start the background sweeper on the running event loop"""
+        if self._sweeper is None or self._sweeper.done():
+            self._sweeper = asyncio.get_running_loop().create_task(self._sweep_forever())
+
+    def stop(self):
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            self._sweeper = None
@@ -0,0 +1,210 @@
+import asyncio
+import heapq
+import json
+import logging
+import sqlite3
+import time
+from typing import Awaitable, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from .database import Database
+
+log = logging.getLogger('mod_bot')
+
+
+class ScheduledJob(NamedTuple):
+    id: int
+    action: str
+    guild_id: int
+    user_id: int
+    due_at: float
+    payload: dict
+
+
+Handler = Callable[[ScheduledJob], Awaitable[None]]
+
+
+class Scheduler(Database):
+    """Durable scheduler for delayed moderation actions such as unmutes.
+
+    Jobs are written to SQLite and mirrored in an in-memory min-heap ordered by
+    due time. A single background task sleeps until the earliest job is due,
+    then fires every due job in one batch and deletes them in one statement.
+    Pending jobs are reloaded from disk by :meth:`start`, so a restart no
+    longer drops them. At most one job exists per (action, guild, user);
+    scheduling again replaces it. If deleting a fired batch fails, e.g. while
+    another worker holds the database, the IDs are kept and the delete is
+    retried every ``retry_interval`` seconds.
+    """
+
+    schema = """
+        CREATE TABLE IF NOT EXISTS scheduled_jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            action TEXT NOT NULL,
+            guild_id INTEGER NOT NULL,
+            user_id INTEGER NOT NULL,
+            due_at REAL NOT NULL,
+            payload TEXT NOT NULL DEFAULT '{}'
+        );
+        CREATE UNIQUE INDEX IF NOT EXISTS scheduled_jobs_key
+            ON scheduled_jobs (action, guild_id, user_id);
+    """
+
+    def __init__(self, path: str, batch_size: int = 100, retry_interval: float = 5.0):
+        super().__init__(path)
+        self.batch_size = batch_size
+        self.retry_interval = retry_interval
+        self._handlers: Dict[str, Handler] = {}
+        self._heap: List[Tuple[float, int]] = []
+        self._jobs: Dict[int, ScheduledJob] = {}
+        self._keys: Dict[Tuple[str, int, int], int] = {}
+        # Fired jobs whose rows are still to be deleted
+        self._fired: List[int] = []
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def __len__(self):
+        return len(self._jobs)
+
+    def register(self, action: str, handler: Handler):
+        """Set the coroutine run when an ``action`` job comes due"""
+        self._handlers[action] = handler
+
+    def pending(self, action: str, guild_id: int, user_id: int) -> Optional[ScheduledJob]:
+        job_id = self._keys.get((action, guild_id, user_id))
+        return self._jobs.get(job_id)
+
+    def _track(self, job: ScheduledJob):
+        self._jobs[job.id] = job
+        self._keys[(job.action, job.guild_id, job.user_id)] = job.id
+        heapq.heappush(self._heap, (job.due_at, job.id))
+
+    def _untrack(self, job_id: int):
+        job = self._jobs.pop(job_id, None)
+        if job is not None:
+            self._keys.pop((job.action, job.guild_id, job.user_id), None)
+        # The heap entry is skipped lazily once it reaches the top
+
+    async def schedule(self, action: str, guild_id: int, user_id: int, delay: float, **payload) -> ScheduledJob:
+        """Run ``action`` for the member ``delay`` seconds from now"""
+        due_at = time.time() + delay
+
+        def insert(conn):
+            cursor = conn.execute(
+                "INSERT OR REPLACE INTO scheduled_jobs (action, guild_id, user_id, due_at, payload) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (action, guild_id, user_id, due_at, json.dumps(payload)),
+            )
+            return cursor.lastrowid
+
+        job_id = await self.run(insert)
+        old_id = self._keys.get((action, guild_id, user_id))
+        if old_id is not None:
+            self._untrack(old_id)
+        job = ScheduledJob(job_id, action, guild_id, user_id, due_at, payload)
+        self._track(job)
+        self._wakeup.set()
+        return job
+
+    async def cancel(self, action: str, guild_id: int, user_id: int) -> bool:
+        """Drop a pending job; return True if there was one"""
+        job_id = self._keys.get((action, guild_id, user_id))
+        if job_id is None:
+            return False
+        self._untrack(job_id)
+        await self.run(lambda conn: conn.execute("DELETE FROM scheduled_jobs WHERE id = ?", (job_id,)))
+        return True
+
+    def _load(self, conn) -> List[ScheduledJob]:
+        rows = conn.execute(
+            "SELECT id, action, guild_id, user_id, due_at, payload FROM scheduled_jobs"
+        ).fetchall()
+        return [ScheduledJob(*row[:5], json.loads(row[5])) for row in rows]
+
+    async def start(self, before_start: Optional[Callable[[], Awaitable[None]]] = None,
+                    owns: Optional[Callable[[int], bool]] = None):
+        """Reload pending jobs and start firing them.
+
+        ``before_start`` is awaited before the first batch fires, e.g.
+        ``bot.wait_until_ready`` so jobs that expired during downtime only run
+        once the guild cache is populated. ``owns`` limits the reload to the
+        guilds this process serves; when several processes share the database
+        each one only picks up, fires and deletes its own guilds' jobs.
+        """
+        for job in await self.run(self._load):
+            if owns is None or owns(job.guild_id):
+                self._track(job)
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run_forever(before_start))
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        self.close()
+
+    def _pop_due(self, now: float) -> List[ScheduledJob]:
+        due = []
+        while self._heap and len(due) < self.batch_size:
+            due_at, job_id = self._heap[0]
+            job = self._jobs.get(job_id)
+            if job is None or job.due_at != due_at:
+                heapq.heappop(self._heap)
+                continue
+            if due_at > now:
+                break
+            heapq.heappop(self._heap)
+            self._untrack(job_id)
+            due.append(job)
+        return due
+
+    async def _sleep_until_due(self):
+        self._wakeup.clear()
+        while self._heap:
+            due_at, job_id = self._heap[0]
+            if job_id not in self._jobs:
+                heapq.heappop(self._heap)
+                continue
+            timeout = due_at - time.time()
+            if timeout <= 0:
+                return
+            break
+        else:
+            timeout = None
+        if self._fired:
+            timeout = self.retry_interval if timeout is None else min(timeout, self.retry_interval)
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _fire(self, job: ScheduledJob):
+        handler = self._handlers.get(job.action)
+        if handler is None:
+            log.warning(f"No handler registered for scheduled action {job.action!r}")
+            return
+        try:
+            await handler(job)
+        except Exception as e:
+            log.error(f"Scheduled {job.action} for {job.user_id} in {job.guild_id} failed: {e}")
+
+    async def _delete_fired(self):
+        ids, self._fired = self._fired, []
+        try:
+            await self.run(lambda conn: conn.executemany(
+                "DELETE FROM scheduled_jobs WHERE id = ?", [(job_id,) for job_id in ids]
+            ))
+        except sqlite3.Error as e:
+            self._fired[:0] = ids
+            log.warning(f"Could not delete {len(self._fired)} fired scheduled jobs, retrying: {e}")
+
+    async def _run_forever(self, before_start):
+        if before_start is not None:
+            await before_start()
+        while True:
+            await self._sleep_until_due()
+            due = self._pop_due(time.time())
+            if due:
+                await asyncio.gather(*(self._fire(job) for job in due))
+                self._fired.extend(job.id for job in due)
+            if self._fired:
+                await self._delete_fired()
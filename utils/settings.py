@@ -0,0 +1,414 @@
+import asyncio
+import copy
+import json
+import logging
+import math
+import os
+from collections import OrderedDict
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from .wordfilter import WordFilter
+
+log = logging.getLogger('mod_bot')
+
+# Every tunable and its default; a guild file only stores what it overrides
+DEFAULTS: Dict[str, dict] = {
+    "spam": {"limit": 5, "window": 5.0, "timeout_minutes": 10},
+    "warnings": {"points": 1.0, "half_life_days": 30.0},
+    "raid": {"enabled": False, "action": "timeout", "threshold": 10, "window": 10.0, "cluster": 5},
+    "copypasta": {"enabled": False, "authors": 4, "window": 30.0, "timeout_minutes": 10},
+}
+
+# Allowed values for string settings
+CHOICES = {
+    "raid.action": ("timeout", "kick", "lock"),
+}
+
+
+class LadderStep(NamedTuple):
+    at: float
+    action: str
+    hours: float = 0.0
+
+
+# What a warning does once the member's decayed score reaches ``at``
+LADDER: Tuple[LadderStep, ...] = (
+    LadderStep(3.0, "timeout", 24.0),
+    LadderStep(5.0, "ban"),
+)
+LADDER_ACTIONS = ("timeout", "kick", "ban")
+_UNITS = {"s": 1 / 3600, "m": 1 / 60, "h": 1, "d": 24}
+# Discord's max timeout; caps every *_minutes setting
+MAX_TIMEOUT_MINUTES = 28 * 24 * 60
+# Decay between back-to-back warnings leaves a score a hair under a whole
+# step (three quick warns give 2.99999996), so steps are reached this close
+SCORE_TOLERANCE = 1e-3
+
+
+def parse_ladder(text: str) -> List[LadderStep]:
+    """Parse ``"3 timeout 24h, 5 kick, 8 ban"``; raise ValueError if a step does not fit"""
+    steps = []
+    for part in filter(None, (part.strip() for part in text.split(","))):
+        words = part.lower().split()
+        if len(words) not in (2, 3):
+            raise ValueError(f"Step {part!r} must look like `<score> <action> [duration]`")
+        try:
+            at = float(words[0])
+        except ValueError:
+            raise ValueError(f"{words[0]!r} is not a score") from None
+        if not math.isfinite(at) or at <= 0:
+            raise ValueError("Scores must be positive")
+        action = words[1]
+        if action not in LADDER_ACTIONS:
+            raise ValueError(f"Actions must be one of {', '.join(LADDER_ACTIONS)}")
+        hours = 0.0
+        if action == "timeout":
+            if len(words) != 3:
+                raise ValueError(f"Step {part!r} needs a timeout duration such as 24h")
+            try:
+                hours = float(words[2][:-1]) * _UNITS[words[2][-1]]
+            except (ValueError, KeyError):
+                raise ValueError(f"Invalid duration {words[2]!r}, use 30m, 12h or 7d") from None
+            if not 0 < hours <= 28 * 24:  # Discord's max timeout is 28 days
+                raise ValueError("Timeouts must be between 1s and 28 days")
+        steps.append(LadderStep(at, action, hours))
+    if not steps:
+        raise ValueError("The ladder needs at least one step")
+    if len({step.at for step in steps}) != len(steps):
+        raise ValueError("Each score can only have one step")
+    return sorted(steps)
+
+
+def format_ladder(steps) -> str:
+    return ", ".join(
+        f"{step.at:g} {step.action}" + (f" {step.hours:g}h" if step.action == "timeout" else "")
+        for step in steps
+    )
+
+
+def validate(key: str, value):
+    """Check an already typed ``value`` against ``key``'s default; raise ValueError if it does not fit"""
+    section, _, name = key.partition(".")
+    try:
+        default = DEFAULTS[section][name]
+    except KeyError:
+        raise ValueError(f"Unknown setting {key!r}") from None
+    if isinstance(default, bool):
+        if not isinstance(value, bool):
+            raise ValueError(f"{key} must be on or off")
+        return value
+    if isinstance(default, (int, float)):
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise ValueError(f"{key} must be a number")
+        if not math.isfinite(value) or value <= 0:
+            raise ValueError(f"{key} must be positive")
+        if isinstance(default, int) and value != int(value):
+            raise ValueError(f"{key} must be a whole number")
+        if name.endswith("_minutes") and value > MAX_TIMEOUT_MINUTES:
+            raise ValueError(f"{key} cannot be more than 28 days")
+        return type(default)(value)
+    if not isinstance(value, str) or value not in CHOICES.get(key, (value,)):
+        raise ValueError(f"{key} must be one of {', '.join(CHOICES.get(key, ()))}")
+    return value
+
+
+def parse_value(key: str, text: str):
+    """Convert ``text`` to the type of ``key``'s default; raise ValueError if it does not fit"""
+    section, _, name = key.partition(".")
+    default = DEFAULTS.get(section, {}).get(name)
+    if isinstance(default, bool):
+        if text.lower() not in ("on", "off", "true", "false", "yes", "no"):
+            raise ValueError(f"{key} must be on or off")
+        return validate(key, text.lower() in ("on", "true", "yes"))
+    if isinstance(default, (int, float)):
+        try:
+            value = type(default)(text)
+        except ValueError:
+            raise ValueError(f"{key} must be a number") from None
+        return validate(key, value)
+    return validate(key, text.lower())
+
+
+def _checked(guild_id: int, overrides: dict) -> dict:
+    """Overrides with every value that would break the hot path dropped and logged.
+
+    Files can be edited by hand, so they get the same checks as ``!config``.
+    Names a section does not define are runtime state and kept as they are.
+    """
+    clean = {}
+    for section, values in overrides.items():
+        try:
+            if section == "filter":
+                if not isinstance(values, list) or not all(isinstance(term, str) for term in values):
+                    raise ValueError("filter must be a list of strings")
+            elif section == "ladder":
+                parse_ladder(format_ladder(LadderStep(*step) for step in values))
+            elif section in DEFAULTS:
+                if not isinstance(values, dict):
+                    raise ValueError(f"{section} must be an object")
+                kept = {}
+                for name, value in values.items():
+                    if name not in DEFAULTS[section]:
+                        kept[name] = value
+                        continue
+                    try:
+                        kept[name] = validate(f"{section}.{name}", value)
+                    except ValueError as e:
+                        log.warning(f"Ignoring setting for guild {guild_id}: {e}")
+                values = kept
+        except (TypeError, ValueError) as e:
+            log.warning(f"Ignoring {section!r} settings for guild {guild_id}: {e}")
+            continue
+        if values:
+            clean[section] = values
+    return clean
+
+
+class GuildSettings:
+    """One guild's settings merged over :data:`DEFAULTS`.
+
+    Sections are plain dicts (``settings["spam"]["limit"]``) and derived
+    objects such as the compiled word filter are built once per load, so
+    reading a setting on the hot path is a couple of dict lookups.
+    """
+
+    __slots__ = ("guild_id", "overrides", "sections", "mtime", "_filter", "_ladder")
+
+    def __init__(self, guild_id: int, overrides: Optional[dict] = None, mtime: Optional[int] = None):
+        self.guild_id = guild_id
+        self.overrides = _checked(guild_id, overrides) if overrides else {}
+        self.mtime = mtime
+        self.sections = {name: {**values, **self.overrides.get(name, {})} for name, values in DEFAULTS.items()}
+        self._filter: Optional[WordFilter] = None
+        self._ladder: Optional[Tuple[LadderStep, ...]] = None
+
+    def __getitem__(self, section: str) -> dict:
+        return self.sections[section]
+
+    @property
+    def filter(self) -> WordFilter:
+        """The guild's blocked terms, compiled on first use"""
+        if self._filter is None:
+            self._filter = WordFilter(self.overrides.get("filter", ()))
+        return self._filter
+
+    @property
+    def ladder(self) -> Tuple[LadderStep, ...]:
+        """Warning escalation steps, lowest score first"""
+        if self._ladder is None:
+            steps = self.overrides.get("ladder")
+            self._ladder = tuple(sorted(LadderStep(*step) for step in steps)) if steps else LADDER
+        return self._ladder
+
+    def escalation(self, score: float) -> Optional[LadderStep]:
+        """The highest step ``score`` has reached, if any"""
+        reached = None
+        for step in self.ladder:
+            if score + SCORE_TOLERANCE < step.at:
+                break
+            reached = step
+        return reached
+
+    def next_step(self, score: float) -> Optional[LadderStep]:
+        return next((step for step in self.ladder if score + SCORE_TOLERANCE < step.at), None)
+
+
+class SettingsStore:
+    """Per-guild settings stored as ``<directory>/<guild_id>.json``.
+
+    A guild's file is read on a worker thread the first time it is needed and
+    the parsed result kept in an LRU cache of ``capacity`` guilds, so
+    thousands of mostly idle guilds cost nothing until they speak and a miss
+    never blocks the event loop. Files can be edited by hand while
+    the bot runs: a background task stats the cached guilds' files every
+    ``reload_interval`` seconds and drops entries whose file changed, and the
+    next access reloads them. Guilds without a file use the defaults.
+    """
+
+    def __init__(self, directory: str, capacity: int = 1000, reload_interval: float = 5.0):
+        self.directory = directory
+        self.capacity = capacity
+        self.reload_interval = reload_interval
+        self._cache: "OrderedDict[int, GuildSettings]" = OrderedDict()
+        self._loading: Dict[int, asyncio.Task] = {}
+        self._locks: Dict[int, asyncio.Lock] = {}
+        self._reloader: Optional[asyncio.Task] = None
+
+    def __len__(self):
+        return len(self._cache)
+
+    def path(self, guild_id: int) -> str:
+        return os.path.join(self.directory, f"{guild_id}.json")
+
+    def _mtime(self, guild_id: int) -> Optional[int]:
+        try:
+            return os.stat(self.path(guild_id)).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def _read(self, guild_id: int) -> GuildSettings:
+        mtime = self._mtime(guild_id)
+        if mtime is None:
+            return GuildSettings(guild_id)
+        try:
+            with open(self.path(guild_id), encoding="utf-8") as f:
+                return GuildSettings(guild_id, json.load(f), mtime)
+        except (OSError, ValueError) as e:
+            log.warning(f"Ignoring unreadable settings for guild {guild_id}: {e}")
+            return GuildSettings(guild_id, mtime=mtime)
+
+    def _remember(self, guild_id: int, settings: GuildSettings):
+        self._cache[guild_id] = settings
+        self._cache.move_to_end(guild_id)
+        if len(self._cache) > self.capacity:
+            self._cache.popitem(last=False)
+
+    async def _load(self, guild_id: int) -> GuildSettings:
+        try:
+            settings = await asyncio.to_thread(self._read, guild_id)
+        finally:
+            self._loading.pop(guild_id, None)
+        # A save may have landed while the file was being read
+        cached = self._cache.get(guild_id)
+        if cached is not None:
+            return cached
+        self._remember(guild_id, settings)
+        return settings
+
+    async def get(self, guild_id: int) -> GuildSettings:
+        """A guild's settings, read from disk on a cache miss"""
+        settings = self._cache.get(guild_id)
+        if settings is not None:
+            self._cache.move_to_end(guild_id)
+            return settings
+        # A burst of messages in a cold guild shares one read
+        loading = self._loading.get(guild_id)
+        if loading is None:
+            loading = self._loading[guild_id] = asyncio.get_running_loop().create_task(self._load(guild_id))
+        return await asyncio.shield(loading)
+
+    def invalidate(self, guild_id: int):
+        self._cache.pop(guild_id, None)
+
+    def _write(self, guild_id: int, overrides: dict):
+        os.makedirs(self.directory, exist_ok=True)
+        path = self.path(guild_id)
+        if not overrides:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            return
+        # Write then rename so the reloader never sees a half-written file
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(overrides, f, indent=2, sort_keys=True)
+        os.replace(tmp, path)
+
+    async def _save(self, guild_id: int, overrides: dict) -> GuildSettings:
+        await asyncio.to_thread(self._write, guild_id, overrides)
+        settings = GuildSettings(guild_id, overrides, await asyncio.to_thread(self._mtime, guild_id))
+        self._remember(guild_id, settings)
+        return settings
+
+    async def _update(self, guild_id: int, change: Callable[[dict], dict]) -> GuildSettings:
+        """Save ``change(overrides)`` for a guild, one writer per guild at a time.
+
+        The overrides are re-read under the lock, so a raid's ``set_state``
+        racing a ``!config set`` both land instead of one overwriting the other.
+        """
+        lock = self._locks.setdefault(guild_id, asyncio.Lock())
+        async with lock:
+            overrides = change(copy.deepcopy((await self.get(guild_id)).overrides))
+            return await self._save(guild_id, overrides)
+
+    async def set(self, guild_id: int, key: str, value) -> GuildSettings:
+        """Override ``section.name`` for a guild, dropping it if it equals the default"""
+        section, _, name = key.partition(".")
+
+        def change(overrides):
+            values = overrides.setdefault(section, {})
+            if value == DEFAULTS[section][name]:
+                values.pop(name, None)
+            else:
+                values[name] = value
+            if not values:
+                del overrides[section]
+            return overrides
+        return await self._update(guild_id, change)
+
+    async def reset(self, guild_id: int, key: Optional[str] = None) -> GuildSettings:
+        """Drop one override, or every tunable override when ``key`` is None.
+
+        The filter terms and runtime state are kept; ``!set_filter clear``
+        empties the filter. The warning ladder goes back to :data:`LADDER`.
+        """
+        if key is None:
+            def change(current):
+                overrides = {}
+                for section, values in current.items():
+                    if section == "ladder":
+                        continue
+                    if section not in DEFAULTS:
+                        overrides[section] = values
+                    elif any(name not in DEFAULTS[section] for name in values):
+                        overrides[section] = {n: v for n, v in values.items() if n not in DEFAULTS[section]}
+                return overrides
+            return await self._update(guild_id, change)
+        section, _, name = key.partition(".")
+        if name not in DEFAULTS.get(section, {}):
+            raise ValueError(f"Unknown setting {key!r}")
+        return await self.set(guild_id, key, DEFAULTS[section][name])
+
+    async def set_filter(self, guild_id: int, terms) -> GuildSettings:
+        def change(overrides):
+            if terms:
+                overrides["filter"] = sorted(terms)
+            else:
+                overrides.pop("filter", None)
+            return overrides
+        return await self._update(guild_id, change)
+
+    async def set_ladder(self, guild_id: int, steps) -> GuildSettings:
+        """Replace a guild's warning ladder; None or the default ladder drops the override"""
+        def change(overrides):
+            if steps and tuple(steps) != LADDER:
+                overrides["ladder"] = [list(step) for step in steps]
+            else:
+                overrides.pop("ladder", None)
+            return overrides
+        return await self._update(guild_id, change)
+
+    async def set_state(self, guild_id: int, section: str, name: str, value) -> GuildSettings:
+        """Persist runtime state kept next to a section, e.g. the pre-raid verification level"""
+        def change(overrides):
+            if value is None:
+                overrides.get(section, {}).pop(name, None)
+            else:
+                overrides.setdefault(section, {})[name] = value
+            return {key: values for key, values in overrides.items() if values}
+        return await self._update(guild_id, change)
+
+    def _changed(self, snapshot: Dict[int, Optional[int]]) -> list:
+        return [guild_id for guild_id, mtime in snapshot.items() if self._mtime(guild_id) != mtime]
+
+    async def _reload_forever(self):
+        while True:
+            await asyncio.sleep(self.reload_interval)
+            snapshot = {guild_id: settings.mtime for guild_id, settings in self._cache.items()}
+            for guild_id in await asyncio.to_thread(self._changed, snapshot):
+                cached = self._cache.get(guild_id)
+                # Skip entries replaced by a save while the stat was running
+                if cached is not None and cached.mtime == snapshot[guild_id]:
+                    log.info(f"Reloading settings for guild {guild_id}")
+                    self.invalidate(guild_id)
+
+    def start(self):
+        """Start watching cached guilds' files for changes"""
+        if self._reloader is None or self._reloader.done():
+            self._reloader = asyncio.get_running_loop().create_task(self._reload_forever())
+
+    def stop(self):
+        if self._reloader is not None:
+            self._reloader.cancel()
+            self._reloader = None
@@ -0,0 +1,75 @@
+from typing import List, NamedTuple, Optional, Sequence
+
+
+def shard_for(guild_id: int, shard_count: int) -> int:
+    """The shard Discord routes a guild's events to"""
+    return (guild_id >> 22) % shard_count
+
+
+def parse_shard_ids(text: str) -> List[int]:
+    """Parse ``"0-3,8,9"`` style shard lists as used by MODBOT_SHARD_IDS"""
+    ids = []
+    for part in filter(None, (p.strip() for p in text.split(","))):
+        start, _, end = part.partition("-")
+        ids.extend(range(int(start), int(end or start) + 1))
+    return sorted(set(ids))
+
+
+def format_shard_ids(ids: Sequence[int]) -> str:
+    """Inverse of :func:`parse_shard_ids`, collapsing consecutive runs"""
+    runs = []
+    for shard_id in sorted(ids):
+        if runs and runs[-1][1] == shard_id - 1:
+            runs[-1][1] = shard_id
+        else:
+            runs.append([shard_id, shard_id])
+    return ",".join(str(a) if a == b else f"{a}-{b}" for a, b in runs)
+
+
+def partition(shard_count: int, clusters: int) -> List[List[int]]:
+    """Split ``shard_count`` shards into ``clusters`` contiguous, even ranges"""
+    clusters = max(1, min(clusters, shard_count))
+    size, extra = divmod(shard_count, clusters)
+    ranges, start = [], 0
+    for n in range(clusters):
+        end = start + size + (n < extra)
+        ranges.append(list(range(start, end)))
+        start = end
+    return ranges
+
+
+class ShardConfig(NamedTuple):
+    """Which shards this process runs; all of them when ``shard_ids`` is None"""
+
+    cluster: Optional[str] = None
+    shard_ids: Optional[List[int]] = None
+    shard_count: Optional[int] = None
+
+    @classmethod
+    def from_env(cls, env) -> "ShardConfig":
+        """Read MODBOT_CLUSTER, MODBOT_SHARD_IDS and MODBOT_SHARD_COUNT"""
+        count = env.get("MODBOT_SHARD_COUNT")
+        ids = env.get("MODBOT_SHARD_IDS")
+        if ids and not count:
+            raise ValueError("MODBOT_SHARD_IDS needs MODBOT_SHARD_COUNT")
+        shard_ids = parse_shard_ids(ids) if ids else None
+        if shard_ids and shard_ids[-1] >= int(count):
+            raise ValueError(f"Shard {shard_ids[-1]} is out of range for {count} shards")
+        return cls(env.get("MODBOT_CLUSTER") or None, shard_ids, int(count) if count else None)
+
+    def as_options(self) -> dict:
+        """Keyword arguments for ``commands.AutoShardedBot``"""
+        return {"shard_ids": self.shard_ids, "shard_count": self.shard_count}
+
+    def owns(self, guild_id: int) -> bool:
+        """True if this process receives the guild's gateway events"""
+        if self.shard_ids is None:
+            return True
+        return shard_for(guild_id, self.shard_count) in self.shard_ids
+
+    def suffix(self, filename: str) -> str:
+        """``mod_logs.log`` becomes ``mod_logs.<cluster>.log`` inside a cluster"""
+        if self.cluster is None:
+            return filename
+        stem, dot, ext = filename.rpartition(".")
+        return f"{stem}.{self.cluster}.{ext}" if dot else f"{filename}.{self.cluster}"
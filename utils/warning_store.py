@@ -0,0 +1,195 @@
+import time
+from collections import Counter, OrderedDict
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from .database import WriteBehindDatabase
+
+
+def decayed(value: float, updated_at: float, half_life: float, now: float) -> float:
+    """``value`` recorded at ``updated_at``, halved every ``half_life`` seconds since"""
+    if half_life <= 0 or now <= updated_at:
+        return value
+    return value * 0.5 ** ((now - updated_at) / half_life)
+
+
+def _evict(cache: OrderedDict, size: int, pinned: Callable[[Any], Any]):
+    """Drop the least recently used entries of ``cache`` down to ``size``.
+
+    Pinned entries met on the way are moved to the back rather than
+    evicted, so each call only looks at the entries it drops or skips.
+    """
+    for _ in range(len(cache)):
+        if len(cache) <= size:
+            break
+        old = next(iter(cache))
+        if pinned(old):
+            cache.move_to_end(old)
+        else:
+            del cache[old]
+
+
+class WarningRecord(NamedTuple):
+    guild_id: int
+    user_id: int
+    moderator_id: int
+    reason: str
+    created_at: float
+
+
+class WarningStore(WriteBehindDatabase):
+    """Per-guild warning history with a hot read cache and write-behind batching.
+
+    Reads are served from an LRU cache of (guild_id, user_id) -> records and
+    only touch SQLite on a miss. New warnings land in the cache immediately
+    and are queued; a background task writes the queue in one transaction per
+    flush window, so a burst of warns costs a single disk write. Keys with
+    unflushed records are never evicted, which keeps the cache authoritative.
+
+    Each member also has a warning score stored as (value, updated_at). The
+    score decays exponentially, so it is brought up to date with one ``pow``
+    whenever it is read or added to and old warnings fade without any sweep
+    over the table. Members who were warned before scores existed get theirs
+    rebuilt from their history the first time it is read.
+    """
+
+    noun = "warnings"
+    schema = """
+        CREATE TABLE IF NOT EXISTS warnings (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            guild_id INTEGER NOT NULL,
+            user_id INTEGER NOT NULL,
+            moderator_id INTEGER NOT NULL,
+            reason TEXT NOT NULL,
+            created_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS warnings_guild_user ON warnings (guild_id, user_id);
+        CREATE TABLE IF NOT EXISTS warning_scores (
+            guild_id INTEGER NOT NULL,
+            user_id INTEGER NOT NULL,
+            value REAL NOT NULL,
+            updated_at REAL NOT NULL,
+            PRIMARY KEY (guild_id, user_id)
+        );
+    """
+
+    def __init__(self, path: str, cache_size: int = 10_000, flush_interval: float = 1.0):
+        super().__init__(path, flush_interval)
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[Tuple[int, int], List[WarningRecord]]" = OrderedDict()
+        self._unflushed: Counter = Counter()
+        self._scores: "OrderedDict[Tuple[int, int], Tuple[float, float]]" = OrderedDict()
+        self._score_queue: Dict[Tuple[int, int], Tuple[float, float]] = {}
+
+    def _remember(self, key, records):
+        self._cache[key] = records
+        self._cache.move_to_end(key)
+        _evict(self._cache, self.cache_size, lambda old: self._unflushed[old])
+
+    async def get(self, guild_id: int, user_id: int) -> List[WarningRecord]:
+        """Every warning a member has received in a guild, oldest first"""
+        key = (guild_id, user_id)
+        records = self._cache.get(key)
+        if records is not None:
+            self._cache.move_to_end(key)
+            return records
+
+        rows = await self.run(lambda conn: conn.execute(
+            "SELECT guild_id, user_id, moderator_id, reason, created_at FROM warnings "
+            "WHERE guild_id = ? AND user_id = ? ORDER BY id",
+            key,
+        ).fetchall())
+        # Another caller may have filled the key while we were on the thread
+        records = self._cache.get(key)
+        if records is None:
+            records = [WarningRecord(*row) for row in rows]
+            self._remember(key, records)
+        return records
+
+    async def count(self, guild_id: int, user_id: int) -> int:
+        return len(await self.get(guild_id, user_id))
+
+    def _remember_score(self, key, score):
+        self._scores[key] = score
+        self._scores.move_to_end(key)
+        _evict(self._scores, self.cache_size, self._score_queue.__contains__)
+
+    async def _stored_score(self, key, half_life: float, points: float, now: float) -> Tuple[float, float]:
+        score = self._scores.get(key)
+        if score is not None:
+            self._scores.move_to_end(key)
+            return score
+        row = await self.run(lambda conn: conn.execute(
+            "SELECT value, updated_at FROM warning_scores WHERE guild_id = ? AND user_id = ?",
+            key,
+        ).fetchone())
+        score = self._scores.get(key)
+        if score is not None:
+            return score
+        if row is not None:
+            score = tuple(row)
+        else:
+            # Warned before scores were kept: replay the history once
+            records = await self.get(*key)
+            score = (sum(decayed(points, r.created_at, half_life, now) for r in records), now)
+        self._remember_score(key, score)
+        return score
+
+    async def score(self, guild_id: int, user_id: int, half_life: float,
+                    points: float = 1.0, now: Optional[float] = None) -> float:
+        """A member's warning score decayed to ``now``.
+
+        ``half_life`` is in seconds; ``points`` is only used to rebuild the
+        score of a member warned before scores were kept.
+        """
+        now = time.time() if now is None else now
+        value, updated_at = await self._stored_score((guild_id, user_id), half_life, points, now)
+        return decayed(value, updated_at, half_life, now)
+
+    async def add(self, guild_id: int, user_id: int, moderator_id: int, reason: str,
+                  points: float = 1.0, half_life: float = 0.0) -> Tuple[List[WarningRecord], float]:
+        """Record a warning worth ``points``; return the updated history and score"""
+        key = (guild_id, user_id)
+        records = await self.get(guild_id, user_id)
+        now = time.time()
+        # Rebuild a legacy score before the new warning joins the history
+        value, updated_at = await self._stored_score(key, half_life, points, now)
+        score = decayed(value, updated_at, half_life, now) + points
+        self._remember_score(key, (score, now))
+        self._score_queue[key] = (score, now)
+
+        record = WarningRecord(guild_id, user_id, moderator_id, reason, now)
+        records.append(record)
+        self._queue.append(record)
+        self._unflushed[key] += 1
+        self._dirty.set()
+        return records, score
+
+    async def flush(self):
+        """Write every queued warning and score in one transaction"""
+        if not self._queue and not self._score_queue:
+            return
+        batch, self._queue = self._queue, []
+        scores = dict(self._score_queue)
+
+        def write(conn):
+            conn.executemany(
+                "INSERT INTO warnings (guild_id, user_id, moderator_id, reason, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                batch,
+            )
+            conn.executemany(
+                "INSERT OR REPLACE INTO warning_scores (guild_id, user_id, value, updated_at) "
+                "VALUES (?, ?, ?, ?)",
+                [(*key, value, updated_at) for key, (value, updated_at) in scores.items()],
+            )
+
+        await self._write(batch, write)
+        # Queued scores pin their cache entry until they are on disk
+        for key, score in scores.items():
+            if self._score_queue.get(key) == score:
+                del self._score_queue[key]
+        for record in batch:
+            key = (record.guild_id, record.user_id)
+            self._unflushed[key] -= 1
+            if not self._unflushed[key]:
+                del self._unflushed[key]
@@ -0,0 +1,95 @@
+import re
+import unicodedata
+from typing import Iterable, Optional
+
+# Invisible characters people slip between letters to dodge filters
+_ZERO_WIDTH = dict.fromkeys(map(ord, "­᠎​‌‍⁠⁡⁢⁣⁤﻿"))
+
+# Look-alike letters NFKC leaves alone (Cyrillic, Greek)
+_LOOKALIKES = {
+    "а": "a", "в": "b", "е": "e", "ё": "e", "к": "k", "м": "m", "н": "h", "о": "o", "р": "p",
+    "с": "c", "т": "t", "у": "y", "х": "x", "і": "i", "ј": "j", "ѕ": "s", "ԁ": "d", "ɡ": "g",
+    "α": "a", "β": "b", "ε": "e", "η": "n", "ι": "i", "κ": "k", "ν": "v", "ο": "o", "ρ": "p",
+    "τ": "t", "υ": "u", "χ": "x", "ω": "w",
+}
+# Common leetspeak, only folded in words that also hold a letter so plain
+# numbers like "455" or "$5" are left alone
+_LEETSPEAK = {
+    "0": "o", "1": "i", "3": "e", "4": "a", "5": "s", "7": "t", "8": "b", "9": "g",
+    "@": "a", "$": "s", "|": "l",
+}
+_TRANSLATION = {**_ZERO_WIDTH, **{ord(k): v for k, v in _LOOKALIKES.items()}}
+_LEET_TRANSLATION = {ord(k): v for k, v in _LEETSPEAK.items()}
+_LEET_CHAR = re.compile("[" + re.escape("".join(_LEETSPEAK)) + "]")
+
+
+def _fold_leetspeak(word: str) -> str:
+    for char in word:
+        if char.isalpha():
+            return word.translate(_LEET_TRANSLATION)
+    return word
+
+
+def normalize(text: str) -> str:
+    """Fold text to the form filter terms are matched against"""
+    text = text.translate(_ZERO_WIDTH)
+    text = unicodedata.normalize("NFKC", text).casefold().translate(_TRANSLATION)
+    words = text.split()
+    if _LEET_CHAR.search(text):
+        words = map(_fold_leetspeak, words)
+    return " ".join(words)
+
+
+def _trie_pattern(node: dict) -> Optional[str]:
+    """Regex for a trie node so shared prefixes are only ever tried once"""
+    terminal = "" in node
+    singles, branches = [], []
+    for char in sorted(key for key in node if key):
+        sub = _trie_pattern(node[char])
+        if sub is None:
+            singles.append(re.escape(char))
+        else:
+            branches.append(re.escape(char) + sub)
+    if singles:
+        branches.append(singles[0] if len(singles) == 1 else "[" + "".join(singles) + "]")
+    if not branches:
+        return None
+    if len(branches) == 1 and not terminal:
+        return branches[0]
+    pattern = "(?:" + "|".join(branches) + ")"
+    return pattern + "?" if terminal else pattern
+
+
+class WordFilter:
+    """A guild's blocked terms compiled into a single regex.
+
+    Terms are normalized and merged into a trie before compiling, so the
+    regex engine follows one branch per character no matter how many terms
+    there are. Messages go through the same normalization (zero-width
+    stripping, NFKC, case folding, look-alikes and leetspeak in words that
+    hold a letter) before matching. Terms only match on word boundaries.
+    """
+
+    def __init__(self, terms: Iterable[str] = ()):
+        self.terms = frozenset(filter(None, (normalize(term).strip() for term in terms)))
+        trie: dict = {}
+        for term in self.terms:
+            node = trie
+            for char in term:
+                node = node.setdefault(char, {})
+            node[""] = True
+        body = _trie_pattern(trie)
+        self._regex = re.compile(rf"(?<!\w){body}(?!\w)") if body else None
+
+    def __len__(self):
+        return len(self.terms)
+
+    def __bool__(self):
+        return self._regex is not None
+
+    def search(self, text: str) -> Optional[str]:
+        """Return the first blocked term found in ``text``, if any"""
+        if self._regex is None:
+            return None
+        match = self._regex.search(normalize(text))
+        return match.group() if match else None